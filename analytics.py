@@ -0,0 +1,306 @@
+"""
+Reportes del inventario calculados con NumPy: valor y unidades por
+categoría y por subárbol de categorías, percentiles y distribución de
+precios y alertas de stock bajo, sin recorrer los productos en Python.
+
+Los datos salen de las columnas del Store (ColumnStore: precio, stock y
+categoría de cada fila). InventoryAnalytics guarda una copia en arreglos
+de NumPy y antes de cada reporte copia solo las filas que cambiaron desde
+el anterior (ColumnStore.changes): un cambio de stock no obliga a rearmar
+los arreglos. Los totales por subárbol usan la numeración Euler del árbol
+de categorías: el subárbol de una categoría es un tramo contiguo del
+recorrido, así que con las sumas acumuladas en ese orden cada subárbol
+sale con una resta.
+
+numpy es opcional (requirements-optional.txt): el resto de la tienda no
+lo usa. Sin numpy, crear un InventoryAnalytics (o llamar a
+Store.analytics()) lanza ImportError.
+
+    analytics = store.analytics()
+    analytics.summary()
+    analytics.by_category()
+    analytics.by_subtree()
+    analytics.subtree("DC Comics")
+    analytics.low_stock_alerts()
+"""
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: solo lo necesita este módulo
+    np = None
+
+from store import LOW_STOCK_THRESHOLD
+
+PERCENTILES = (50, 90, 99)
+
+
+def _group_order(groups, values, size):
+    """
+    Orden de las filas por (grupo, valor). Más rápido que np.lexsort: se
+    ordena por valor y después, de forma estable, por grupo; con menos de
+    2**15 grupos la clave entra en int16 y NumPy usa radix sort.
+    """
+    order = np.argsort(values)
+    key = groups[order]
+    if size < 2 ** 15:
+        key = key.astype(np.int16)
+    return order[np.argsort(key, kind="stable")]
+
+
+def _grouped_percentiles(groups, values, size, percentiles):
+    """
+    Percentiles de values dentro de cada grupo (0..size-1), todos a la vez:
+    con las filas ordenadas por (grupo, valor), en cada grupo se interpola
+    entre los dos valores vecinos, igual que np.percentile. Retorna
+    {percentil: arreglo con un valor por grupo (nan si está vacío)}.
+    """
+    counts = np.bincount(groups, minlength=size)
+    if not len(values):
+        return {q: np.full(size, np.nan) for q in percentiles}
+    ordered = values[_group_order(groups, values, size)]
+    starts = np.cumsum(counts) - counts
+    last = len(ordered) - 1
+    result = {}
+    for q in percentiles:
+        position = starts + np.maximum(counts - 1, 0) * (q / 100)
+        low = np.minimum(np.floor(position).astype(np.intp), last)
+        high = np.minimum(low + 1, np.minimum(starts + counts - 1, last))
+        fraction = position - low
+        interpolated = ordered[low] + (ordered[high] - ordered[low]) * fraction
+        result[q] = np.where(counts > 0, interpolated, np.nan)
+    return result
+
+
+def _number(value):
+    """Valor de NumPy a número de Python (None si es nan)"""
+    value = value.item()
+    return None if value != value else value
+
+
+class InventoryAnalytics:
+    """
+    Reportes vectorizados sobre un ColumnStore y el árbol de categorías.
+    lock es el que protege las columnas (Store._index_lock): se toma solo
+    mientras se copian los cambios. sync, si se pasa, se llama con ese lock
+    tomado antes de copiar (Store._sync_stock: marca las filas cuyo stock
+    cambió con el lock de cada producto). Debe haber un solo
+    InventoryAnalytics por ColumnStore, porque changes() entrega cada
+    cambio una sola vez.
+    """
+
+    def __init__(self, columns, tree, lock=None, sync=None):
+        if np is None:
+            raise ImportError("Los reportes del inventario necesitan numpy: "
+                              "pip install -r requirements-optional.txt")
+        self.columns = columns
+        self.tree = tree
+        self.lock = lock or threading.Lock()
+        self.sync = sync
+        # Un reporte a la vez sobre las copias
+        self._report_lock = threading.Lock()
+
+        # Grupo de cada fila: id de categoría + 1, 0 para las filas libres
+        # (así np.bincount los acepta sin filtrar nada antes)
+        self._prices = None
+        self._stocks = None
+        self._groups = None
+        self._codes = []
+        self._names = []
+
+    # SINCRONIZACIÓN CON LAS COLUMNAS
+
+    def refresh(self):
+        """
+        Copia a los arreglos las filas nuevas y las que cambiaron desde la
+        llamada anterior (la primera vez, todas). Retorna cuántas copió.
+        """
+        columns = self.columns
+        with self.lock:
+            if self.sync is not None:
+                self.sync()
+            changed = columns.changes()
+            size = len(columns.prices)
+            if changed is None or self._prices is None:
+                # np.array copia el buffer del array de C y lo suelta enseguida
+                # (un array con buffers exportados no puede crecer)
+                self._prices = np.array(columns.prices, dtype=np.float64)
+                self._stocks = np.array(columns.stocks, dtype=np.int64)
+                self._groups = np.array(columns.categories, dtype=np.int64) + 1
+                self._codes = list(columns.codes)
+                copied = size
+            else:
+                old_size = len(self._prices)
+                if size > old_size:
+                    self._prices = np.concatenate(
+                        (self._prices, np.array(columns.prices[old_size:], dtype=np.float64)))
+                    self._stocks = np.concatenate(
+                        (self._stocks, np.array(columns.stocks[old_size:], dtype=np.int64)))
+                    self._groups = np.concatenate(
+                        (self._groups, np.array(columns.categories[old_size:], dtype=np.int64) + 1))
+                    self._codes.extend(columns.codes[old_size:])
+                rows = [row for row in changed if row < old_size]
+                if rows:
+                    index = np.array(rows, dtype=np.intp)
+                    self._prices[index] = [columns.prices[row] for row in rows]
+                    self._stocks[index] = [columns.stocks[row] for row in rows]
+                    self._groups[index] = [columns.categories[row] + 1 for row in rows]
+                    for row in rows:
+                        self._codes[row] = columns.codes[row]
+                copied = len(rows) + size - old_size
+            self._names = list(columns.category_names)
+        return copied
+
+    def _tree_layout(self):
+        """
+        Categorías del árbol en orden Euler, el último índice del subárbol
+        de cada una y la posición Euler de cada grupo (-1 para las filas
+        libres y las categorías que no están en el árbol).
+        """
+        order = [name for name, _ in self.tree.categories()]
+        exits = np.array([self.tree.interval(name)[1] for name in order], dtype=np.intp)
+        position = {name: i for i, name in enumerate(order)}
+        entry_of_group = np.array([-1] + [position.get(name, -1) for name in self._names],
+                                  dtype=np.intp)
+        return order, exits, entry_of_group
+
+    def _totals(self, threshold):
+        """Productos, unidades, valor y stock bajo por grupo (el 0 son las filas libres)"""
+        groups, prices, stocks = self._groups, self._prices, self._stocks
+        size = len(self._names) + 1
+        return {
+            "products": np.bincount(groups, minlength=size),
+            "units": np.bincount(groups, weights=stocks, minlength=size),
+            "value": np.bincount(groups, weights=prices * stocks, minlength=size),
+            "low_stock": np.bincount(groups[stocks <= threshold], minlength=size),
+        }
+
+    def _subtree_mask(self, category):
+        """Filas cuya categoría está en el subárbol de category"""
+        interval = self.tree.interval(category)
+        if interval is None:
+            return np.zeros(len(self._groups), dtype=bool)
+        _, _, entry_of_group = self._tree_layout()
+        positions = entry_of_group[self._groups]
+        return (positions >= interval[0]) & (positions <= interval[1])
+
+    @staticmethod
+    def _row(totals, index):
+        return {"products": int(totals["products"][index]), "units": int(totals["units"][index]),
+                "value": float(totals["value"][index]),
+                "low_stock": int(totals["low_stock"][index])}
+
+    # REPORTES
+
+    def summary(self, percentiles=PERCENTILES):
+        """Totales del inventario y percentiles del precio"""
+        with self._report_lock:
+            self.refresh()
+            # Las filas libres tienen precio y stock 0: no cambian las sumas
+            prices = self._prices[self._groups > 0]
+            result = {
+                "products": len(prices),
+                "units": int(self._stocks.sum()),
+                "value": float(self._prices @ self._stocks),
+                "min_price": float(prices.min()) if len(prices) else None,
+                "max_price": float(prices.max()) if len(prices) else None,
+                "mean_price": float(prices.mean()) if len(prices) else None,
+            }
+            values = np.percentile(prices, percentiles) if len(prices) else [None] * len(percentiles)
+            for q, value in zip(percentiles, values):
+                result[f"p{q}_price"] = None if value is None else float(value)
+            return result
+
+    def by_category(self, threshold=LOW_STOCK_THRESHOLD, percentiles=PERCENTILES):
+        """
+        Por categoría (sin subcategorías): productos, unidades, valor,
+        productos con stock <= threshold y percentiles del precio.
+        """
+        with self._report_lock:
+            self.refresh()
+            totals = self._totals(threshold)
+            quantiles = _grouped_percentiles(self._groups, self._prices, len(self._names) + 1,
+                                             percentiles)
+            result = {}
+            for group in np.flatnonzero(totals["products"][1:]) + 1:
+                row = self._row(totals, group)
+                for q in percentiles:
+                    row[f"p{q}_price"] = _number(quantiles[q][group])
+                result[self._names[group - 1]] = row
+            return result
+
+    def by_subtree(self, threshold=LOW_STOCK_THRESHOLD):
+        """
+        Por cada categoría del árbol, totales de su subárbol (ella y todas
+        sus subcategorías): productos, unidades, valor y productos con stock
+        <= threshold. Cada suma sale de las sumas acumuladas en orden Euler.
+        """
+        with self._report_lock:
+            self.refresh()
+            order, exits, entry_of_group = self._tree_layout()
+            if not order:
+                return {}
+            in_tree = entry_of_group >= 0
+            totals = {}
+            for name, per_group in self._totals(threshold).items():
+                per_position = np.zeros(len(order))
+                per_position[entry_of_group[in_tree]] = per_group[in_tree]
+                prefix = np.concatenate(([0.0], np.cumsum(per_position)))
+                totals[name] = prefix[exits + 1] - prefix[:-1]
+            return {name: self._row(totals, i) for i, name in enumerate(order)}
+
+    def subtree(self, category, threshold=LOW_STOCK_THRESHOLD, percentiles=PERCENTILES,
+                bins=10):
+        """
+        Reporte de un subárbol: totales, percentiles y distribución del
+        precio (bins intervalos iguales entre el mínimo y el máximo).
+        """
+        with self._report_lock:
+            self.refresh()
+            mask = self._subtree_mask(category)
+            prices, stocks = self._prices[mask], self._stocks[mask]
+            result = {
+                "category": category,
+                "products": len(prices),
+                "units": int(stocks.sum()),
+                "value": float(prices @ stocks),
+                "low_stock": int((stocks <= threshold).sum()),
+                "distribution": [],
+            }
+            if len(prices):
+                for q, value in zip(percentiles, np.percentile(prices, percentiles)):
+                    result[f"p{q}_price"] = float(value)
+                counts, edges = np.histogram(prices, bins=bins)
+                result["distribution"] = [(float(edges[i]), float(edges[i + 1]), int(count))
+                                          for i, count in enumerate(counts)]
+            return result
+
+    def low_stock_alerts(self, threshold=LOW_STOCK_THRESHOLD, category=None, limit=None):
+        """
+        Productos con stock <= threshold agrupados por categoría:
+        {categoría: [(código, stock), ...]}, cada lista del menor stock al
+        mayor y primero las categorías con el stock más bajo. Con category,
+        solo los de ese subárbol; con limit, los limit más urgentes.
+        """
+        with self._report_lock:
+            self.refresh()
+            mask = (self._groups > 0) & (self._stocks <= threshold)
+            if category is not None:
+                mask &= self._subtree_mask(category)
+            rows = np.flatnonzero(mask)
+            if limit is not None:
+                rows = rows[np.argsort(self._stocks[rows], kind="stable")[:limit]]
+            groups = self._groups[rows]
+            order = _group_order(groups, self._stocks[rows], len(self._names) + 1)
+            rows, groups = rows[order], groups[order]
+
+            codes = self._codes
+            alerts = list(zip([codes[row] for row in rows.tolist()], self._stocks[rows].tolist()))
+            bounds = [0, *(np.flatnonzero(np.diff(groups)) + 1).tolist(), len(rows)]
+            result = {self._names[groups[start] - 1]: alerts[start:end]
+                      for start, end in zip(bounds, bounds[1:]) if start < end}
+            return dict(sorted(result.items(), key=lambda item: (item[1][0][1], item[0])))
+
+    def __str__(self):
+        rows = 0 if self._prices is None else len(self._prices)
+        return f"InventoryAnalytics({rows} filas, {len(self._names)} categorías)"
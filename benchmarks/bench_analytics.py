@@ -0,0 +1,123 @@
+"""
+Reportes del inventario con NumPy (analytics.py) sobre catálogos
+sintéticos de millones de filas, contra los mismos cálculos con ciclos de
+Python sobre las columnas (sin armar objetos Product, que con millones de
+filas ni siquiera entran en memoria cómodamente).
+
+También se mide la actualización incremental: después de cambiar el
+stock de CHANGES productos, el reporte siguiente solo copia esas filas.
+
+Las filas se cargan directo en un ColumnStore (sin Store: sus índices
+ordenados tardarían minutos con millones de productos). Necesita numpy.
+"""
+import random
+
+from analytics import InventoryAnalytics
+from benchmarks.common import synthetic_categories, timed, size_from_argv, print_table
+from store import LOW_STOCK_THRESHOLD
+from structures.columns import ColumnStore
+from structures.tree import Tree
+
+CHANGES = 1000
+
+
+def build(n, seed=42):
+    rng = random.Random(seed)
+    tree = Tree()
+    for name, parent in synthetic_categories(fanout=4, depth=4):
+        tree.add(name, parent)
+    names = list(tree.nodes)
+    columns = ColumnStore()
+    for i in range(n):
+        columns.set(f"P{i:08d}", rng.randrange(1500, 9000, 50), rng.randrange(0, 40),
+                    names[i % len(names)])
+    return columns, tree
+
+
+def python_by_category(columns):
+    """Lo mismo que by_category con ciclos de Python"""
+    groups = {}
+    for price, stock, category in zip(columns.prices, columns.stocks, columns.categories):
+        if category >= 0:
+            groups.setdefault(category, []).append((price, stock))
+    result = {}
+    for category, rows in groups.items():
+        prices = sorted(price for price, _ in rows)
+        result[columns.category_names[category]] = {
+            "products": len(rows),
+            "units": sum(stock for _, stock in rows),
+            "value": sum(price * stock for price, stock in rows),
+            "low_stock": sum(1 for _, stock in rows if stock <= LOW_STOCK_THRESHOLD),
+            "p50_price": prices[len(prices) // 2],
+        }
+    return result
+
+
+def python_by_subtree(columns, tree):
+    """Totales por subárbol recorriendo las columnas y sumando cada subárbol"""
+    per_category = {}
+    for price, stock, category in zip(columns.prices, columns.stocks, columns.categories):
+        if category >= 0:
+            totals = per_category.setdefault(columns.category_names[category], [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += stock
+            totals[2] += price * stock
+    result = {}
+    for name in tree.nodes:
+        subtree = [per_category.get(c, [0, 0, 0.0]) for c in tree.list_subcategories(name)]
+        result[name] = [sum(values) for values in zip(*subtree)]
+    return result
+
+
+def python_summary(columns):
+    """Totales y percentiles del precio (ordenando los precios)"""
+    prices = sorted(price for price, category in zip(columns.prices, columns.categories)
+                    if category >= 0)
+    return {"units": sum(columns.stocks),
+            "value": sum(map(float.__mul__, columns.prices, map(float, columns.stocks))),
+            "percentiles": [prices[int(q / 100 * (len(prices) - 1))] for q in (50, 90, 99)]}
+
+
+def python_low_stock(columns):
+    """Alertas de stock bajo por categoría, del menor stock al mayor"""
+    alerts = {}
+    for code, stock, category in zip(columns.codes, columns.stocks, columns.categories):
+        if code is not None and stock <= LOW_STOCK_THRESHOLD:
+            alerts.setdefault(columns.category_names[category], []).append((code, stock))
+    for products in alerts.values():
+        products.sort(key=lambda item: item[1])
+    return alerts
+
+
+def run(n):
+    (columns, tree), build_time = timed(build, n)
+    analytics = InventoryAnalytics(columns, tree)
+    _, first_refresh = timed(analytics.refresh)
+
+    rows = []
+    for name, python, vectorized in (
+            ("por categoría", lambda: python_by_category(columns), analytics.by_category),
+            ("por subárbol", lambda: python_by_subtree(columns, tree), analytics.by_subtree),
+            ("resumen", lambda: python_summary(columns), analytics.summary),
+            ("alertas de stock", lambda: python_low_stock(columns), analytics.low_stock_alerts)):
+        _, python_time = timed(python)
+        _, numpy_time = timed(vectorized)
+        rows.append([name, f"{python_time * 1e3:,.0f}", f"{numpy_time * 1e3:,.1f}",
+                     f"{python_time / numpy_time:,.0f}x"])
+
+    rng = random.Random(1)
+    codes = rng.sample(range(n), CHANGES)
+    for i in codes:
+        columns.set_stock(f"P{i:08d}", rng.randrange(0, 40))
+    copied, incremental = timed(analytics.refresh)
+
+    print(f"Catálogo de {n:,} filas y {len(tree.nodes)} categorías "
+          f"(carga de las columnas: {build_time:.1f} s)\n")
+    print_table(rows, ["reporte", "Python (ms)", "NumPy (ms)", "mejora"])
+    print(f"\nPrimera copia a NumPy: {first_refresh * 1e3:,.1f} ms ({n:,} filas)")
+    print(f"Actualización después de {CHANGES} cambios de stock: "
+          f"{incremental * 1e3:,.2f} ms ({copied} filas copiadas)")
+
+
+if __name__ == "__main__":
+    run(size_from_argv(2000000))
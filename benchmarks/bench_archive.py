@@ -0,0 +1,125 @@
+"""
+Archivo histórico de pedidos (persistence/archive.py): velocidad de carga
+(append de a un pedido contra append_many por lotes) y consultas con los
+índices de cada día contra recorrer todo el archivo.
+
+Los pedidos sintéticos se reparten en DAYS días. Las consultas se miden
+con el archivo recién abierto (los índices se leen de disco en la primera
+consulta) y otra vez con los índices ya en memoria. El recorrido completo
+con iter_orders mide también el pico de memoria (tracemalloc), que no
+debería crecer con el tamaño del archivo.
+"""
+import random
+import tempfile
+import tracemalloc
+from collections import Counter
+
+from benchmarks.common import synthetic_codes, synthetic_orders, timed, size_from_argv, \
+    print_table
+from persistence.archive import OrderArchive
+from store import Order, Product
+
+DAYS = 30
+BATCH = 1000
+QUERIES = 50
+START = 1790000000  # 2026-09-20 UTC
+
+
+def build_orders(n, seed=42):
+    codes = synthetic_codes(2000, seed)
+    rng = random.Random(seed)
+    products = {code: Product(code, code, rng.randrange(1500, 9000, 50), 10, "X")
+                for code in codes}
+    orders = [Order(i + 1, customer, [products[code] for code in order_codes], tier)
+              for i, (customer, order_codes, tier) in enumerate(synthetic_orders(codes, n, seed))]
+    return orders, codes
+
+
+def ingest_one_by_one(directory, orders):
+    archive = OrderArchive(directory)
+    per_day = len(orders) // DAYS + 1
+    for i, order in enumerate(orders):
+        archive.append(order, START + (i // per_day) * 86400 + i % per_day)
+    archive.close()
+
+
+def ingest_batches(directory, orders):
+    archive = OrderArchive(directory)
+    per_day = len(orders) // DAYS + 1
+    for start in range(0, len(orders), BATCH):
+        batch = orders[start:start + BATCH]
+        archive.append_many(batch, START + (start // per_day) * 86400 + start % per_day)
+    archive.close()
+
+
+def scan_customer(archive, customer):
+    return [order for order in archive.iter_orders() if order.customer == customer]
+
+
+def scan_product(archive, code):
+    return [order for order in archive.iter_orders()
+            if any(item[0] == code for item in order.items)]
+
+
+def scan_best_sellers(archive, limit=10):
+    units = Counter()
+    for order in archive.iter_orders():
+        for code, quantity, _ in order.items:
+            units[code] += quantity
+    return units.most_common(limit)
+
+
+def stream_peak(archive):
+    """Pico de memoria de un recorrido completo (tracemalloc lo hace más lento: no se cronometra)"""
+    tracemalloc.start()
+    for _ in archive.iter_orders():
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def run(n):
+    orders, codes = build_orders(n)
+    rng = random.Random(1)
+    customers = [f"cliente{rng.randrange(5000)}" for _ in range(QUERIES)]
+    products = rng.sample(codes, QUERIES)
+
+    with tempfile.TemporaryDirectory() as one, tempfile.TemporaryDirectory() as directory:
+        _, one_time = timed(ingest_one_by_one, one, orders)
+        _, batch_time = timed(ingest_batches, directory, orders)
+        ingest = [["append", f"{n / one_time:,.0f}"],
+                  [f"append_many ({BATCH})", f"{n / batch_time:,.0f}"]]
+
+        archive = OrderArchive(directory)
+        count, stream_time = timed(lambda: sum(1 for _ in archive.iter_orders()))
+        peak = stream_peak(archive)
+        rows = []
+        for name, method, scanned, keys in (
+                ("pedidos de un cliente", "customer_orders", scan_customer, customers),
+                ("pedidos con un producto", "product_orders", scan_product, products)):
+            _, scan_time = timed(lambda: [scanned(archive, key) for key in keys[:3]])
+            # Archivo recién abierto: la primera consulta lee los índices
+            indexed = getattr(OrderArchive(directory), method)
+            _, cold_time = timed(indexed, keys[0])
+            _, warm_time = timed(lambda: [indexed(key) for key in keys])
+            rows.append([name, f"{scan_time / 3 * 1e3:,.1f}", f"{cold_time * 1e3:,.1f}",
+                         f"{warm_time / len(keys) * 1e3:,.2f}"])
+        _, scan_time = timed(scan_best_sellers, archive)
+        cold = OrderArchive(directory)
+        _, cold_time = timed(cold.best_sellers)
+        _, warm_time = timed(cold.best_sellers)
+        rows.append(["más vendidos", f"{scan_time * 1e3:,.1f}", f"{cold_time * 1e3:,.1f}",
+                     f"{warm_time * 1e3:,.2f}"])
+
+    print(f"{n:,} pedidos en {DAYS} días\n")
+    print_table(ingest, ["carga", "pedidos/s"])
+    print()
+    print_table(rows, ["consulta", "recorriendo (ms)", "índices de disco (ms)",
+                       "índices en memoria (ms)"])
+    print(f"\niter_orders: {count / stream_time:,.0f} pedidos/s, "
+          f"pico de memoria {peak / 1024:,.0f} KiB")
+
+
+if __name__ == "__main__":
+    run(size_from_argv(200000))
@@ -0,0 +1,66 @@
+"""
+Importación masiva de pedidos: create_order uno por uno contra
+create_orders_bulk, sobre el catálogo real con stock
+de sobra. También se mide la importación desde un archivo JSONL.
+El camino uno por uno se mide con menos pedidos y se compara por pedido/s.
+"""
+import json
+import os
+import random
+import tempfile
+
+from benchmarks.common import quiet_store, timed, size_from_argv, print_table
+from persistence.loader import iter_order_records
+
+
+def order_records(codes, n, seed=42):
+    """Genera n registros (cliente, [códigos]) con 1 a 3 códigos cada uno"""
+    rng = random.Random(seed)
+    for i in range(n):
+        yield f"cliente{i % 5000}", rng.sample(codes, rng.randint(1, 3))
+
+
+def stocked_store():
+    store = quiet_store()
+    for product in store.products.list_all():
+        store.update_product(product.code, new_stock=10 ** 9)
+    return store
+
+
+def one_by_one(store, records):
+    for customer, codes in records:
+        store.create_order(customer, codes)
+
+
+def run(n):
+    codes = [p.code for p in quiet_store().products.list_all()]
+    single_n = min(n, 100000)
+    rows = []
+
+    store = stocked_store()
+    _, seconds = timed(one_by_one, store, list(order_records(codes, single_n)))
+    rows.append(["create_order", single_n, f"{seconds:.2f}", f"{single_n / seconds:,.0f}"])
+
+    store = stocked_store()
+    records = list(order_records(codes, n))
+    summary, seconds = timed(store.create_orders_bulk, records)
+    assert summary["created"] == n
+    rows.append(["create_orders_bulk", n, f"{seconds:.2f}", f"{n / seconds:,.0f}"])
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "orders.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            for customer, order_codes in records:
+                file.write(json.dumps({"customer": customer, "codes": order_codes}) + "\n")
+        del records
+        store = stocked_store()
+        summary, seconds = timed(store.create_orders_bulk, iter_order_records(path))
+        rows.append(["bulk desde JSONL", summary["created"], f"{seconds:.2f}",
+                     f"{summary['created'] / seconds:,.0f}"])
+
+    print(f"Creación de pedidos (catálogo de {len(codes)} productos)\n")
+    print_table(rows, ["método", "pedidos", "segundos", "pedidos/s"])
+
+
+if __name__ == "__main__":
+    run(size_from_argv(1000000))
@@ -0,0 +1,61 @@
+"""
+Cachés de lectura del Store: búsquedas de productos con códigos "calientes"
+(distribución tipo Zipf) y consultas por categoría, por rango de precio y
+de stock bajo, con los cachés activos y desactivados (cache_size=0).
+La última fila mezcla lecturas con actualizaciones de stock, que invalidan.
+"""
+import random
+
+from benchmarks.common import synthetic_store, timed, size_from_argv, print_table
+
+
+def build_store(n, cache_size):
+    return synthetic_store(n, cache_size=cache_size, query_cache_size=cache_size and 256)
+
+
+def zipf_codes(codes, n, seed=42, s=1.1):
+    """n códigos donde unos pocos se repiten mucho (productos más buscados)"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** s for rank in range(len(codes))]
+    return rng.choices(codes, weights=weights, k=n)
+
+
+def run(n, lookups=200000, queries=200):
+    rows = []
+    stats = None
+    for cache_size in (0, 10000):
+        store = build_store(n, cache_size)
+        codes = zipf_codes([p.code for p in store.products.list_all()], lookups)
+
+        _, find_time = timed(lambda: [store.find_product(c) for c in codes])
+        _, tree_time = timed(lambda: [store.products_in_category_tree("DC Comics")
+                                      for _ in range(queries)])
+        _, price_time = timed(lambda: [store.products_by_price_range(3000, 3200)
+                                       for _ in range(queries)])
+
+        def mixed():
+            for i, code in enumerate(codes[:queries * 10]):
+                if i % 10 == 0:
+                    store.update_product(code, new_stock=i % 40)
+                store.low_stock_products()
+        _, mixed_time = timed(mixed)
+
+        rows.append(["sin caché" if cache_size == 0 else "con caché",
+                     f"{lookups / find_time:,.0f}",
+                     f"{tree_time / queries * 1e3:.2f}",
+                     f"{price_time / queries * 1e3:.2f}",
+                     f"{mixed_time / (queries * 10) * 1e6:.0f}"])
+        if cache_size:
+            stats = store.cache_stats()
+
+    print(f"Catálogo de {n} productos\n")
+    print_table(rows, ["", "find_product/s", "árbol DC (ms)", "precio (ms)",
+                       "stock bajo + 10% updates (us)"])
+    print()
+    print_table([[name, s["hits"], s["misses"], f"{s['hit_rate']:.1%}", s["evictions"],
+                  s["invalidations"]] for name, s in stats.items()],
+                ["caché", "aciertos", "fallos", "% aciertos", "descartes", "invalidaciones"])
+
+
+if __name__ == "__main__":
+    run(size_from_argv(100000))
@@ -0,0 +1,61 @@
+"""
+Catálogo paginado: costo de pedir una página (20 productos) al principio,
+en el medio y al final del catálogo, con list_all() + slice (como antes)
+y con Store.catalog_page por número de página y por cursor. También
+compara recorrer la tabla con list_all() contra el iterador.
+"""
+import time
+
+from store import Product
+from benchmarks.common import synthetic_products, quiet_store, timed, size_from_argv, print_table
+
+PAGE = 20
+
+
+def per_call(func, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def walk_with_cursor(store, sort, pages):
+    cursor = None
+    for _ in range(pages):
+        cursor = store.catalog_page(sort, PAGE, cursor)["next"]
+
+
+def run(n):
+    store = quiet_store()
+    products = [Product(*row) for row in synthetic_products(n)]
+    for product in products:
+        store.products.insert(product.code, product)
+    store._index_many(products)
+    del products
+
+    last = (n - 1) // PAGE + 1
+    rows = []
+    for label, page in [("primera", 1), ("media", last // 2), ("última", last)]:
+        offset = (page - 1) * PAGE
+        rows.append([
+            label,
+            f"{per_call(lambda: store.products.list_all()[offset:offset + PAGE], 5):,.0f}",
+            f"{per_call(lambda: store.catalog_page('code', PAGE, page=page)):,.1f}",
+            f"{per_call(lambda: store.catalog_page('price', PAGE, page=page)):,.1f}",
+            f"{per_call(lambda: store.catalog_page('name', PAGE, page=page, descending=True)):,.1f}",
+        ])
+
+    print(f"Catálogo de {n} productos, páginas de {PAGE} (us por página)\n")
+    print_table(rows, ["página", "list_all + slice", "code", "price", "name desc"])
+
+    pages = min(last, 1000)
+    _, seconds = timed(walk_with_cursor, store, "price", pages)
+    print(f"\n{pages} páginas seguidas por cursor (price): {seconds / pages * 1e6:.1f} us por página")
+
+    _, list_time = timed(lambda: sum(1 for _ in store.products.list_all()))
+    _, iter_time = timed(lambda: sum(1 for _ in store.products))
+    print(f"Recorrer la tabla: list_all {list_time:.3f} s, iterador {iter_time:.3f} s (sin lista)")
+
+
+if __name__ == "__main__":
+    run(size_from_argv(200000))
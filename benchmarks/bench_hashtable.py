@@ -0,0 +1,62 @@
+"""
+Compara los motores de HashTable (chaining, direccionamiento abierto y
+persistente)
+en memoria ocupada por la estructura y tiempo de búsqueda.
+"""
+import tracemalloc
+
+from structures.hashtable import HashTable
+from benchmarks.common import synthetic_codes, timed, size_from_argv, print_table
+
+
+def build(storage, codes):
+    table = HashTable(storage=storage)
+    for code in codes:
+        table.insert(code, code)
+    return table
+
+
+def lookup_all(table, codes):
+    found = 0
+    for code in codes:
+        if table.search(code) is not None:
+            found += 1
+    return found
+
+
+def run(n):
+    codes = synthetic_codes(n)
+    missing = [code + "X" for code in codes[: n // 10]]
+    rows = []
+
+    for storage in ("chaining", "open", "persistent"):
+        # La memoria se mide en una construcción aparte porque
+        # tracemalloc hace mucho más lenta cada asignación
+        tracemalloc.start()
+        table = build(storage, codes)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del table
+
+        table, build_time = timed(build, storage, codes)
+
+        found, hit_time = timed(lookup_all, table, codes)
+        _, miss_time = timed(lookup_all, table, missing)
+        assert found == n
+
+        rows.append([
+            storage,
+            f"{memory / 1024 / 1024:.1f} MB",
+            f"{memory / n:.0f} B",
+            f"{build_time:.3f} s",
+            f"{hit_time / n * 1e6:.2f} us",
+            f"{miss_time / max(1, len(missing)) * 1e6:.2f} us",
+        ])
+
+    print(f"HashTable con {n} claves\n")
+    print_table(rows, ["motor", "memoria", "por clave", "inserción",
+                       "búsqueda (hit)", "búsqueda (miss)"])
+
+
+if __name__ == "__main__":
+    run(size_from_argv(200000))
@@ -0,0 +1,57 @@
+"""
+Compara los índices secundarios del Store (categoría, precio y stock)
+contra recorrer el inventario completo con list_all().
+El catálogo se carga como en el arranque: los índices ordenados se arman
+al final con una sola ordenación (SortedIndex.add_many).
+"""
+
+from benchmarks.common import synthetic_store, timed, size_from_argv, print_table
+
+
+def scan_category(store, category):
+    return [p for p in store.products.list_all() if p.category == category]
+
+
+def scan_price(store, low, high):
+    return sorted((p for p in store.products.list_all() if low <= p.price <= high),
+                  key=lambda p: (p.price, p.code))
+
+
+def scan_low_stock(store, threshold):
+    return [p for p in store.products.list_all() if p.stock <= threshold]
+
+
+def run(n):
+    store, load_time = timed(synthetic_store, n)
+    print(f"Catálogo sintético de {len(store.products)} productos (carga + índices: {load_time:.1f} s)\n")
+
+    queries = [
+        ("categoría 'Batman'",
+         lambda: store.products_by_category("Batman"),
+         lambda: scan_category(store, "Batman")),
+        ("precio $3000-$3100",
+         lambda: store.products_by_price_range(3000, 3100),
+         lambda: scan_price(store, 3000, 3100)),
+        ("stock <= 0",
+         lambda: store.low_stock_products(0),
+         lambda: scan_low_stock(store, 0)),
+    ]
+
+    rows = []
+    for label, indexed, scan in queries:
+        indexed_result, indexed_time = timed(indexed)
+        scan_result, scan_time = timed(scan)
+        assert len(indexed_result) == len(scan_result)
+        rows.append([label, len(indexed_result), f"{indexed_time * 1000:.1f} ms",
+                     f"{scan_time * 1000:.1f} ms", f"{scan_time / indexed_time:.1f}x"])
+
+    print_table(rows, ["consulta", "resultados", "índice", "recorrido", "mejora"])
+
+    # Costo de mantener los índices en una actualización
+    codes = store.price_index.range_codes(3000, 3000)[:1000]
+    _, update_time = timed(lambda: [store.update_product(c, new_price=3001) for c in codes])
+    print(f"\nupdate_product (con índices): {update_time / max(1, len(codes)) * 1e6:.1f} us por producto")
+
+
+if __name__ == "__main__":
+    run(size_from_argv(1000000))
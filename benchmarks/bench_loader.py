@@ -0,0 +1,80 @@
+"""
+Compara la carga del catálogo con json.load (cargador anterior) contra
+la carga incremental de persistence.loader, en JSON y en JSON Lines.
+Cada modo corre en un proceso aparte para medir su pico de memoria (RSS).
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import synthetic_products, size_from_argv, print_table
+
+MODES = ["json.load", "stream-json", "stream-jsonl"]
+
+
+def write_catalogs(directory, n):
+    json_path = os.path.join(directory, "catalog.json")
+    jsonl_path = os.path.join(directory, "catalog.jsonl")
+    keys = ["code", "name", "price", "stock", "category"]
+
+    with open(json_path, "w", encoding="utf-8") as json_file, \
+            open(jsonl_path, "w", encoding="utf-8") as jsonl_file:
+        json_file.write('{\n  "products": [\n')
+        for i, row in enumerate(synthetic_products(n)):
+            record = json.dumps(dict(zip(keys, row)), ensure_ascii=False)
+            json_file.write(("    " if i == 0 else ",\n    ") + record)
+            jsonl_file.write(record + "\n")
+        json_file.write("\n  ]\n}\n")
+    return json_path, jsonl_path
+
+
+def child(mode, path):
+    """Carga el catálogo con el modo indicado e imprime las métricas en JSON"""
+    from store import Product
+    from structures.hashtable import HashTable
+    from persistence.loader import iter_products
+
+    table = HashTable()
+    start = time.perf_counter()
+    if mode == "json.load":
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        items = data["products"]
+    else:
+        items = iter_products(path)
+    for item in items:
+        table.insert(item["code"], Product(item["code"], item["name"], item["price"],
+                                           item["stock"], item["category"]))
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"count": len(table), "seconds": elapsed, "peak_rss_kb": peak_kb}))
+
+
+def run(n):
+    with tempfile.TemporaryDirectory() as directory:
+        json_path, jsonl_path = write_catalogs(directory, n)
+        size_mb = os.path.getsize(json_path) / 1024 / 1024
+        print(f"Catálogo sintético: {n} productos ({size_mb:.1f} MB en JSON)\n")
+
+        rows = []
+        for mode in MODES:
+            path = jsonl_path if mode == "stream-jsonl" else json_path
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_loader", "--child", mode, path],
+                capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            rows.append([mode, result["count"], f"{result['seconds']:.2f} s",
+                         f"{result['peak_rss_kb'] / 1024:.1f} MB"])
+
+    print_table(rows, ["modo", "productos", "tiempo", "pico RSS"])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        run(size_from_argv(300000))
@@ -0,0 +1,102 @@
+"""
+Memoria por producto con __slots__ frente a la clase con __dict__
+anterior, y estadísticas del inventario sobre las columnas de
+precio/stock frente a un recorrido de list_all().
+
+Dentro del Store un Product no guarda precio ni stock: es una vista sobre
+su fila de ColumnStore. Por eso se mide el objeto más su fila.
+"""
+import tracemalloc
+
+from store import Product
+from structures.columns import ColumnStore
+from structures.hashtable import HashTable
+from benchmarks.common import synthetic_products, synthetic_store, timed, size_from_argv, \
+    print_table
+
+
+class DictProduct:
+    """Product tal como era antes de __slots__ (con __dict__ por instancia)"""
+
+    def __init__(self, code, name, price, stock, category):
+        self.code = code
+        self.name = name
+        self.price = price
+        self.stock = stock
+        self.category = category
+
+
+def create(cls, row, columns):
+    item = cls(*row)
+    if columns is not None:
+        columns.attach(item)
+    return item
+
+
+def measure(cls, rows, columnar=False):
+    """
+    Bytes asignados al crear un objeto por fila (los campos ya existen);
+    columnar: cada objeto pasa a ser vista de su fila en un ColumnStore
+    """
+    tracemalloc.start()
+    columns = ColumnStore() if columnar else None
+    objects = [create(cls, row, columns) for row in rows]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects, columns
+    return memory
+
+
+def measure_catalog(cls, storage, rows, columnar=False):
+    """Bytes de los objetos (y sus filas) más la tabla hash que los contiene"""
+    tracemalloc.start()
+    table = HashTable(storage=storage)
+    columns = ColumnStore() if columnar else None
+    for row in rows:
+        table.insert(row[0], create(cls, row, columns))
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del table, columns
+    return memory
+
+
+def loop_value(store):
+    return sum(p.price * p.stock for p in store.products.list_all())
+
+
+def run(n):
+    rows = list(synthetic_products(n))
+    dict_memory = measure(DictProduct, rows)
+    slots_memory = measure(Product, rows, columnar=True)
+
+    print(f"Memoria de {n} productos (sin contar los textos compartidos)\n")
+    print_table([
+        ["__dict__", f"{dict_memory / n:.0f} B"],
+        ["__slots__ + columnas", f"{slots_memory / n:.0f} B"],
+        ["reducción", f"{dict_memory / slots_memory:.1f}x"],
+    ], ["clase", "por producto"])
+
+    legacy = measure_catalog(DictProduct, "chaining", rows)
+    compact = measure_catalog(Product, "open", rows, columnar=True)
+    print("\nProducto + HashTable\n")
+    print_table([
+        ["__dict__ + chaining", f"{legacy / n:.0f} B"],
+        ["__slots__ + columnas + open", f"{compact / n:.0f} B"],
+        ["reducción", f"{legacy / compact:.1f}x"],
+    ], ["modo", "por producto"])
+
+    store = synthetic_store(n)
+
+    stats, column_time = timed(store.inventory_stats)
+    value, loop_time = timed(loop_value, store)
+    assert stats["value"] == value
+
+    print("\nValor total del inventario\n")
+    print_table([
+        ["columnas", f"{column_time * 1000:.1f} ms"],
+        ["list_all()", f"{loop_time * 1000:.1f} ms"],
+    ], ["método", "tiempo"])
+
+
+if __name__ == "__main__":
+    run(size_from_argv(200000))
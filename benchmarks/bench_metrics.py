@@ -0,0 +1,33 @@
+"""
+Costo de la instrumentación: las mismas operaciones del Store sin métricas
+(metrics=None, sin ningún envoltorio) y con Metrics() activo.
+"""
+from benchmarks.common import (synthetic_store, synthetic_orders, timed, size_from_argv,
+                               print_table)
+from metrics import Metrics
+
+
+def run(n):
+    rows = []
+    for label, metrics in (("sin métricas", None), ("con métricas", Metrics())):
+        store = synthetic_store(n, stock=10 ** 9, metrics=metrics)
+        codes = [p.code for p in store.products.list_all()]
+        orders = synthetic_orders(codes, n // 10)
+
+        _, find_time = timed(lambda: [store.find_product(c) for c in codes])
+        _, order_time = timed(lambda: [store.create_order(c, o, t) for c, o, t in orders])
+        _, process_time = timed(lambda: [store.process_next_order() for _ in orders])
+        rows.append([label,
+                     f"{find_time / len(codes) * 1e6:.2f}",
+                     f"{order_time / len(orders) * 1e6:.1f}",
+                     f"{process_time / len(orders) * 1e6:.1f}"])
+        if metrics is not None:
+            _, export_time = timed(metrics.to_prometheus)
+
+    print(f"Catálogo de {n} productos, {n // 10} pedidos\n")
+    print_table(rows, ["", "find_product (us)", "create_order (us)", "process_next_order (us)"])
+    print(f"\nExportar en formato Prometheus: {export_time * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    run(size_from_argv(50000))
@@ -0,0 +1,124 @@
+"""
+Lecturas consistentes con escrituras concurrentes: un hilo escritor agrega
+y borra claves sin parar mientras otros hilos recorren la tabla completa
+(reportes) y buscan claves sueltas.
+
+El escritor agrega la clave siguiente (K{hi}) o borra la más vieja (K{lo}),
+así en cada versión las claves forman un rango continuo: un recorrido con
+huecos o repetidos es una lectura inconsistente (rota).
+
+Casos:
+    - chaining + lock: lectores y escritor comparten un lock global
+    - chaining sin lock: recorre la tabla mientras cambia (el problema)
+    - persistent: los lectores usan snapshot() sin locks
+"""
+import random
+import threading
+import time
+
+from benchmarks.common import size_from_argv, print_table
+from structures.hashtable import HashTable
+
+DURATION = 3.0
+SCANNERS = 2
+INSERT_RATIO = 0.7  # la tabla crece: también se miden los rehash
+
+
+class _NoLock:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def consistent(values):
+    """Las claves de una versión son un rango continuo sin repetidos"""
+    if not values:
+        return True
+    return len(set(values)) == len(values) == max(values) - min(values) + 1
+
+
+def run_case(n, storage, lock, use_snapshot):
+    table = HashTable(storage=storage)
+    for i in range(n):
+        table.insert(f"K{i}", i)
+    bounds = [0, n]  # [lo, hi)
+    stop = threading.Event()
+    results = {"writes": 0, "write_latencies": [], "reads": 0, "scans": 0, "torn": 0}
+
+    def writer():
+        rng = random.Random(1)
+        latencies = results["write_latencies"]
+        while not stop.is_set():
+            start = time.perf_counter()
+            with lock:
+                lo, hi = bounds
+                if rng.random() < INSERT_RATIO or hi - lo < 2:
+                    table.insert(f"K{hi}", hi)
+                    bounds[1] = hi + 1
+                else:
+                    table.delete(f"K{lo}")
+                    bounds[0] = lo + 1
+            latencies.append(time.perf_counter() - start)
+            results["writes"] += 1
+
+    def scanner():
+        while not stop.is_set():
+            try:
+                if use_snapshot:
+                    values = [value for _, value in table.snapshot().iter_items()]
+                else:
+                    with lock:
+                        values = [value for _, value in table.iter_items()]
+                ok = consistent(values)
+            except (TypeError, IndexError):
+                # Sin lock el rehash puede cambiar la tabla a mitad del recorrido
+                ok = False
+            results["scans"] += 1
+            results["torn"] += not ok
+
+    def reader():
+        rng = random.Random(2)
+        while not stop.is_set():
+            lo, hi = bounds
+            code = f"K{rng.randrange(lo, hi)}"
+            with (_NoLock() if use_snapshot else lock):
+                table.search(code)
+            results["reads"] += 1
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+    threads += [threading.Thread(target=scanner) for _ in range(SCANNERS)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def run(n):
+    cases = [("chaining + lock", "chaining", threading.Lock(), False),
+             ("chaining sin lock", "chaining", _NoLock(), False),
+             ("persistent", "persistent", _NoLock(), True)]
+    rows = []
+    for name, storage, lock, use_snapshot in cases:
+        results = run_case(n, storage, lock, use_snapshot)
+        latencies = sorted(results["write_latencies"])
+        p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+        rows.append([name,
+                     f"{results['writes'] / DURATION:,.0f}",
+                     f"{results['reads'] / DURATION:,.0f}",
+                     f"{results['scans'] / DURATION:.1f}",
+                     results["torn"],
+                     f"{p99 * 1e3:.2f}",
+                     f"{(latencies[-1] if latencies else 0) * 1e3:.1f}"])
+
+    print(f"Tabla de {n} claves, 1 escritor, 1 lector, {SCANNERS} recorridos, {DURATION:.0f} s\n")
+    print_table(rows, ["caso", "escrituras/s", "búsquedas/s", "recorridos/s",
+                       "rotos", "escritura p99 ms", "escritura máx ms"])
+
+
+if __name__ == "__main__":
+    run(size_from_argv(100000))
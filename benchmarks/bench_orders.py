@@ -0,0 +1,75 @@
+"""
+Generador de carga para el procesamiento concurrente de pedidos:
+varios hilos productores crean pedidos y un OrderWorkerPool los procesa.
+Mide pedidos por segundo y latencia (creación -> procesado) según la
+cantidad de workers.
+"""
+import random
+import threading
+import time
+
+from workers import OrderWorkerPool
+from benchmarks.common import quiet_store, size_from_argv, print_table
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run_once(n_orders, workers, producers=4, seed=42):
+    store = quiet_store()
+    products = store.products.list_all()
+    for product in products:
+        store.update_product(product.code, new_stock=10 ** 9)  # Sin rechazos
+
+    started = {}
+    finished = {}
+    done = threading.Event()
+
+    def on_done(order):
+        finished[order.order_number] = time.perf_counter()
+        if len(finished) == n_orders:
+            done.set()
+
+    def produce(count, rng):
+        for _ in range(count):
+            items = rng.sample(products, rng.randint(1, 3))
+            start = time.perf_counter()
+            order = store.submit_order("cliente", items)
+            started[order.order_number] = start
+
+    rngs = [random.Random(seed + i) for i in range(producers)]
+    per_producer = n_orders // producers
+    threads = [threading.Thread(target=produce, args=(per_producer, rng)) for rng in rngs]
+    n_orders = per_producer * producers
+
+    pool = OrderWorkerPool(store, workers=workers, on_done=on_done).start()
+    begin = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.wait()
+    elapsed = time.perf_counter() - begin
+    pool.stop()
+
+    latencies = [(finished[n] - started[n]) * 1000 for n in finished]
+    return n_orders / elapsed, percentile(latencies, 50), percentile(latencies, 99)
+
+
+def run(n):
+    rows = []
+    for workers in (1, 2, 4, 8):
+        throughput, p50, p99 = run_once(n, workers)
+        rows.append([workers, f"{throughput:,.0f}", f"{p50:.2f} ms", f"{p99:.2f} ms"])
+
+    print(f"{n} pedidos, 4 productores\n")
+    print_table(rows, ["workers", "pedidos/s", "p50", "p99"])
+
+
+if __name__ == "__main__":
+    run(size_from_argv(20000))
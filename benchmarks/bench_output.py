@@ -0,0 +1,58 @@
+"""
+Costo de la salida en las búsquedas y los pedidos: el Store sin eventos
+(NullSink), con un BufferedSink o un LeveledSink en nivel DEBUG, y con
+la presentación de consola de main.py (como antes, un print por código)
+escribiendo a /dev/null.
+"""
+import contextlib
+import io
+import os
+import random
+
+import main
+from events import NullSink, BufferedSink, LeveledSink, DEBUG
+from benchmarks.common import quiet_store, timed, size_from_argv, print_table
+
+
+def searches(store, codes, render):
+    for code in codes:
+        product = store.search_product(code)
+        if render:
+            main.show_product(product, code)
+
+
+def orders(store, batches, render):
+    for codes in batches:
+        result = store.create_order("cliente", codes)
+        if render:
+            main.show_order_result("cliente", result)
+
+
+def run(n, seed=42):
+    rng = random.Random(seed)
+    catalog = [p.code for p in quiet_store().products.list_all()]
+    codes = [rng.choice(catalog + ["NOEXISTE"]) for _ in range(n)]
+    batches = [rng.sample(catalog, 3) for _ in range(n // 3)]
+
+    setups = [
+        ("sin salida (NullSink)", NullSink, False),
+        ("BufferedSink DEBUG", lambda: BufferedSink(level=DEBUG), False),
+        ("LeveledSink DEBUG", lambda: LeveledSink(level=DEBUG, stream=io.StringIO()), False),
+        ("consola (main.py)", NullSink, True),
+    ]
+    rows = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, sink, render in setups:
+            store = quiet_store(events=sink())
+            for product in store.products.list_all():
+                store.update_product(product.code, new_stock=10 ** 9)
+            _, search_time = timed(searches, store, codes, render)
+            _, order_time = timed(orders, store, batches, render)
+            rows.append([name, f"{n / search_time:,.0f}", f"{len(batches) / order_time:,.0f}"])
+
+    print(f"{n} búsquedas y {len(batches)} pedidos de 3 productos\n")
+    print_table(rows, ["salida", "búsquedas/s", "pedidos/s"])
+
+
+if __name__ == "__main__":
+    run(size_from_argv(300000))
@@ -0,0 +1,94 @@
+"""
+Cola de pedidos con prioridad por nivel bajo carga mixta: un productor crea
+pedidos a un ritmo fijo algo mayor del que los workers atienden (cada
+pedido simula un tiempo de servicio), así la cola crece durante la prueba,
+y se mide la espera de cada pedido en la cola, de su creación hasta que un
+worker lo toma, por nivel.
+
+Se comparan tres casos sobre la misma secuencia de pedidos:
+    - FIFO: todos los pedidos como "normal" (el orden de llegada de antes)
+    - niveles: cada pedido con su nivel
+    - niveles + escalado: además, un hilo adelanta los que esperan demasiado
+"""
+import threading
+import time
+
+from benchmarks.common import (quiet_store, synthetic_orders, synthetic_store,
+                               size_from_argv, print_table)
+from store import ORDER_TIERS
+from workers import OrderWorkerPool
+
+SERVICE_SECONDS = 0.0005
+WORKERS = 4
+# Pedidos por segundo que crea el productor. Sin ritmo fijo el productor
+# se queda con el GIL y los workers casi no avanzan hasta que termina.
+ARRIVAL_RATE = 7000
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def run_case(stream, use_tiers, escalate_after=None):
+    """Procesa stream y retorna (segundos, {nivel: [esperas]})"""
+    store = synthetic_store(0, stock=10 ** 9)
+    tier_of = {}
+    waits = {tier: [] for tier in ORDER_TIERS}
+    waits_lock = threading.Lock()
+
+    def on_done(order):
+        wait = time.monotonic() - order.created
+        with waits_lock:
+            waits[tier_of[order.order_number]].append(wait)
+        time.sleep(SERVICE_SECONDS)
+
+    stop = threading.Event()
+
+    def escalator():
+        while not stop.wait(escalate_after / 4):
+            store.escalate_orders(escalate_after)
+
+    start = time.perf_counter()
+    with OrderWorkerPool(store, workers=WORKERS, on_done=on_done, poll_interval=0.01):
+        if escalate_after is not None:
+            thread = threading.Thread(target=escalator, daemon=True)
+            thread.start()
+        for i, (customer, codes, tier) in enumerate(stream):
+            # El nivel real se anota antes de que un worker pueda tomar el pedido
+            tier_of[store.order_counter] = tier
+            store.create_order(customer, codes, tier if use_tiers else "normal")
+            ahead = i / ARRIVAL_RATE - (time.perf_counter() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+        if escalate_after is not None:
+            stop.set()
+            thread.join()
+    return time.perf_counter() - start, waits
+
+
+def run(n):
+    codes = [p.code for p in quiet_store().products.list_all()]
+    stream = synthetic_orders(codes, n)
+    cases = [("FIFO", False, None),
+             ("niveles", True, None),
+             ("niveles + escalado 1s", True, 1.0)]
+
+    rows = []
+    for name, use_tiers, escalate_after in cases:
+        seconds, waits = run_case(stream, use_tiers, escalate_after)
+        for tier in ORDER_TIERS:
+            values = waits[tier]
+            rows.append([name, tier, len(values),
+                         f"{percentile(values, 0.5) * 1000:.1f}",
+                         f"{percentile(values, 0.99) * 1000:.1f}",
+                         f"{max(values, default=0) * 1000:.1f}"])
+        rows.append([name, "total", n, "", "", f"{n / seconds:,.0f} pedidos/s"])
+
+    print(f"Espera en la cola por nivel ({n} pedidos a {ARRIVAL_RATE}/s, {WORKERS} workers, "
+          f"{SERVICE_SECONDS * 1e6:.0f} µs de servicio)\n")
+    print_table(rows, ["cola", "nivel", "pedidos", "p50 ms", "p99 ms", "máx ms"])
+
+
+if __name__ == "__main__":
+    run(size_from_argv(20000))
@@ -0,0 +1,49 @@
+"""
+Contención en la reserva de stock: varios hilos crean pedidos a la vez
+sobre un solo producto (un lanzamiento muy esperado) o repartidos entre
+todo el catálogo, con lock striping (64 locks) y con un único lock.
+"""
+import random
+import threading
+import time
+
+from benchmarks.common import quiet_store, size_from_argv, print_table
+
+
+def run_once(stripes, hot, n_orders, threads=8, seed=42):
+    store = quiet_store(stock_stripes=stripes)
+    products = store.products.list_all()
+    for product in products:
+        store.update_product(product.code, new_stock=10 ** 9)
+
+    per_thread = n_orders // threads
+
+    def produce(rng):
+        for _ in range(per_thread):
+            product = products[0] if hot else rng.choice(products)
+            store.submit_order("cliente", [product])
+
+    workers = [threading.Thread(target=produce, args=(random.Random(seed + i),))
+               for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return per_thread * threads / elapsed
+
+
+def run(n):
+    rows = []
+    for hot in (True, False):
+        for stripes in (1, 64):
+            throughput = run_once(stripes, hot, n)
+            rows.append(["un producto" if hot else "uniforme", stripes, f"{throughput:,.0f}"])
+
+    print(f"{n} reservas desde 8 hilos\n")
+    print_table(rows, ["productos", "locks", "reservas/s"])
+
+
+if __name__ == "__main__":
+    run(size_from_argv(40000))
@@ -0,0 +1,90 @@
+"""
+Latencia de la búsqueda por texto (TextIndex) sobre un catálogo sintético
+con nombres armados a partir de un vocabulario de palabras de cómics:
+palabra exacta, dos palabras, prefijo (autocompletar), con errores de
+tipeo y por código. También mide armar el índice y actualizarlo.
+"""
+import random
+import time
+
+from store import Product
+from structures.text_index import TextIndex
+from benchmarks.common import CATEGORIES, synthetic_codes, size_from_argv, print_table
+
+WORDS = ["año", "uno", "noche", "muerte", "guerra", "secreta", "corte", "búhos",
+         "legado", "renacimiento", "oscuro", "caballero", "regreso", "última",
+         "cacería", "invasión", "crisis", "infinita", "identidad", "tierra",
+         "sombra", "ciudad", "futuro", "pasado", "imperio", "leyenda", "hijo",
+         "rojo", "azul", "eterno", "silencio", "familia", "asilo", "broma",
+         "máscara", "dios", "diosa", "venganza", "reinado", "origen"]
+
+
+def synthetic_catalog(n, seed=42):
+    """Productos con nombres tipo "Batman: Noche de Búhos Vol. 12" """
+    rng = random.Random(seed)
+    # Palabras inventadas para que el vocabulario crezca con el catálogo
+    extra = ["".join(rng.choice("bcdfglmnprstv") + rng.choice("aeiou") for _ in range(3))
+             for _ in range(max(100, n // 20))]
+    for i, code in enumerate(synthetic_codes(n, seed)):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        words = rng.sample(WORDS, 2) + [rng.choice(extra)]
+        name = f"{category}: {' '.join(words).title()} Vol. {i % 50}"
+        yield Product(code, name, rng.randrange(1500, 9000, 50), rng.randrange(0, 40), category)
+
+
+def typo(word, rng):
+    """Invierte dos letras vecinas o cambia una letra"""
+    i = rng.randrange(len(word) - 1)
+    if rng.random() < 0.5:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice("aeiou") + word[i + 1:]
+
+
+def latency(index, queries):
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2] * 1e6, times[int(len(times) * 0.99)] * 1e6
+
+
+def run(n, queries=500, seed=7):
+    products = list(synthetic_catalog(n))
+    index = TextIndex()
+    start = time.perf_counter()
+    for p in products:
+        index.add(p.code, [(p.code, 3), (p.name, 2), (p.category, 1)], p)
+    build = time.perf_counter() - start
+    print(f"{n} productos, {len(index.postings)} palabras distintas "
+          f"(índice armado en {build:.1f} s)\n")
+
+    rng = random.Random(seed)
+    sample = [rng.choice(products) for _ in range(queries)]
+    words = [p.name.split(": ")[1].split(" Vol")[0].split() for p in sample]
+    cases = [
+        ("una palabra", [w[0] for w in words]),
+        ("dos palabras", [f"{w[0]} {w[2]}" for w in words]),
+        ("prefijo", [w[2][:3] for w in words]),
+        ("con error", [typo(w[2].lower(), rng) for w in words]),
+        ("sin acentos", ["busho", "ano", "ultima", "cacería", "invasion"] * (queries // 5)),
+        ("código", [p.code for p in sample]),
+    ]
+
+    rows = []
+    for name, case in cases:
+        p50, p99 = latency(index, case)
+        rows.append([name, f"{p50:,.0f}", f"{p99:,.0f}"])
+    print_table(rows, ["consulta", "p50 (us)", "p99 (us)"])
+
+    start = time.perf_counter()
+    for p in sample:
+        index.remove(p.code)
+        index.add(p.code, [(p.code, 3), (p.name, 2), (p.category, 1)], p)
+    update = (time.perf_counter() - start) / len(sample) * 1e6
+    print(f"\nActualizar un producto (quitar + agregar): {update:.0f} us")
+
+
+if __name__ == "__main__":
+    run(size_from_argv(200000))
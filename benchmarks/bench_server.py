@@ -0,0 +1,122 @@
+"""
+Cliente de carga local para server.py: abre varias conexiones keep-alive,
+envía solicitudes en pipeline (varias sin esperar respuesta) y reporta
+throughput y percentiles de latencia. El servidor corre en un hilo aparte
+con su propio event loop, y un pool de workers va vaciando la cola.
+
+    python -m benchmarks.bench_server [solicitudes] [conexiones] [pipeline]
+"""
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+
+from server import StoreServer
+from workers import OrderWorkerPool
+from benchmarks.common import quiet_store, print_table
+from benchmarks.bench_orders import percentile
+
+
+def start_server(store):
+    """Levanta el servidor en un hilo y retorna (servidor, loop)"""
+    ready = threading.Event()
+    holder = {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        server = StoreServer(store, port=0)
+        loop.run_until_complete(server.start())
+        holder["server"], holder["loop"] = server, loop
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return holder["server"], holder["loop"]
+
+
+def build_request(method, path, body=None):
+    data = b"" if body is None else json.dumps(body).encode("utf-8")
+    head = (f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(data)}\r\nContent-Type: application/json\r\n\r\n")
+    return head.encode("latin-1") + data
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    if length:
+        await reader.readexactly(length)
+    return status
+
+
+async def client(port, requests, pipeline, latencies, statuses):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for start in range(0, len(requests), pipeline):
+        batch = requests[start:start + pipeline]
+        sent_at = time.perf_counter()
+        writer.write(b"".join(batch))
+        await writer.drain()
+        for _ in batch:
+            status = await read_response(reader)
+            latencies.append((time.perf_counter() - sent_at) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+    writer.close()
+
+
+async def load(port, codes, total, connections, pipeline, seed=42):
+    rng = random.Random(seed)
+    per_connection = total // connections
+    plans = []
+    for _ in range(connections):
+        plan = []
+        for _ in range(per_connection):
+            if rng.random() < 0.7:
+                plan.append(build_request("GET", f"/products/{rng.choice(codes)}"))
+            else:
+                plan.append(build_request("POST", "/orders",
+                                          {"customer": "cliente", "codes": rng.sample(codes, 2)}))
+        plans.append(plan)
+
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, plan, pipeline, latencies, statuses) for plan in plans))
+    return time.perf_counter() - start, latencies, statuses
+
+
+def run(total, connections, pipeline):
+    store = quiet_store(order_queue_size=5000)
+    codes = [p.code for p in store.products.list_all()]
+    for code in codes:
+        store.update_product(code, new_stock=10 ** 9)
+
+    server, loop = start_server(store)
+    pool = OrderWorkerPool(store, workers=2).start()
+    try:
+        elapsed, latencies, statuses = asyncio.run(
+            load(server.port, codes, total, connections, pipeline))
+    finally:
+        pool.stop(drain=False)
+        loop.call_soon_threadsafe(loop.stop)
+
+    print(f"{len(latencies)} solicitudes, {connections} conexiones, pipeline {pipeline}\n")
+    print_table([[f"{len(latencies) / elapsed:,.0f}",
+                  f"{percentile(latencies, 50):.2f} ms",
+                  f"{percentile(latencies, 90):.2f} ms",
+                  f"{percentile(latencies, 99):.2f} ms"]],
+                ["solicitudes/s", "p50", "p90", "p99"])
+    print("\nRespuestas por código:", dict(sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    total, connections, pipeline = (args + [20000, 16, 4][len(args):])[:3]
+    run(total, connections, pipeline)
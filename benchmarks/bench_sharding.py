@@ -0,0 +1,71 @@
+"""
+Catálogo repartido en procesos (ShardedCatalog) con 1 a N shards contra la
+HashTable del Store en el mismo proceso:
+    - carga: repartir y cargar todo el catálogo
+    - find_product: una búsqueda por pedido (mide el costo del pipe)
+    - find_many: búsquedas en lotes de BATCH códigos, en paralelo por shard
+    - categoría: productos de cada categoría (scatter/gather a todos)
+
+La escala con los shards depende de los núcleos libres: con uno solo los
+shards se turnan y solo se ve el costo de la comunicación.
+"""
+import os
+import random
+import sys
+
+from benchmarks.common import synthetic_store, synthetic_products, CATEGORIES, timed, print_table
+from sharding import ShardedCatalog
+
+BATCH = 1000
+SINGLE_LOOKUPS = 5000
+
+
+def measure(label, load, find_one, find_many, by_category, codes, sample):
+    _, load_time = timed(load)
+    _, single_time = timed(lambda: [find_one(code) for code in sample])
+    batches = [codes[i:i + BATCH] for i in range(0, len(codes), BATCH)]
+    _, many_time = timed(lambda: [find_many(batch) for batch in batches])
+    _, category_time = timed(lambda: [by_category(c) for c in CATEGORIES])
+    return [label,
+            f"{load_time:.2f}",
+            f"{single_time / len(sample) * 1e6:.1f}",
+            f"{len(codes) / many_time:,.0f}",
+            f"{category_time / len(CATEGORIES) * 1e3:.1f}"]
+
+
+def run(n, max_shards):
+    rows = list(synthetic_products(n))
+    codes = [row[0] for row in rows]
+    random.Random(7).shuffle(codes)
+    sample = codes[:SINGLE_LOOKUPS]
+
+    store = None
+
+    def load_store():
+        nonlocal store
+        store = synthetic_store(n)
+
+    results = [measure("en proceso", load_store,
+                       lambda code: store.products.search(code),
+                       lambda batch: [store.products.search(code) for code in batch],
+                       lambda category: store.products_by_category(category),
+                       codes, sample)]
+
+    for shards in range(1, max_shards + 1):
+        catalog = ShardedCatalog(shards)
+        try:
+            results.append(measure(f"{shards} shard(s)", lambda: catalog.load(rows),
+                                   catalog.find_product, catalog.find_many,
+                                   catalog.products_by_category, codes, sample))
+        finally:
+            catalog.close()
+
+    print(f"Catálogo de {n} productos, {os.cpu_count()} núcleo(s)\n")
+    print_table(results, ["", "carga (s)", "find_product (us)",
+                          f"find_many x{BATCH} (búsq/s)", "categoría (ms)"])
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    max_shards = int(sys.argv[2]) if len(sys.argv) > 2 else max(4, os.cpu_count() or 1)
+    run(size, max_shards)
@@ -0,0 +1,43 @@
+"""
+Compara el arranque en frío (catálogo JSON) contra el arranque desde el
+snapshot binario, midiendo por separado el parseo y el Store completo.
+"""
+import json
+import os
+import tempfile
+
+from persistence.snapshot import read_snapshot
+from benchmarks.bench_loader import write_catalogs
+from benchmarks.common import quiet_store, timed, size_from_argv, print_table
+
+
+def parse_json(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def run(n):
+    with tempfile.TemporaryDirectory() as directory:
+        json_path, _ = write_catalogs(directory, n)
+        snapshot_path = os.path.join(directory, "store.snap")
+
+        store, cold_time = timed(lambda: quiet_store(catalog_path=json_path))
+        _, save_time = timed(store.save_snapshot, snapshot_path)
+
+        _, json_parse = timed(parse_json, json_path)
+        _, snapshot_parse = timed(read_snapshot, snapshot_path)
+        warm, warm_time = timed(lambda: quiet_store(snapshot_path=snapshot_path))
+        assert len(warm.products) == len(store.products)
+
+        json_mb = os.path.getsize(json_path) / 1024 / 1024
+        snapshot_mb = os.path.getsize(snapshot_path) / 1024 / 1024
+
+    print(f"Store con {n} productos (guardar snapshot: {save_time:.2f} s)\n")
+    print_table([
+        ["JSON", f"{json_mb:.1f} MB", f"{json_parse:.2f} s", f"{cold_time:.2f} s"],
+        ["snapshot", f"{snapshot_mb:.1f} MB", f"{snapshot_parse:.2f} s", f"{warm_time:.2f} s"],
+    ], ["origen", "tamaño", "solo parseo", "Store completo"])
+
+
+if __name__ == "__main__":
+    run(size_from_argv(200000))
@@ -0,0 +1,51 @@
+"""
+Mutaciones por segundo del Store con el write-ahead log activo, para
+cada política de fsync, comparado contra el Store sin log. Con varios
+hilos, "batch" comparte cada fsync entre los cambios que esperan a la vez.
+"""
+import os
+import tempfile
+import threading
+
+from benchmarks.common import quiet_store, timed, size_from_argv, print_table
+
+
+THREADS = 8
+
+
+def mutate(store, n, threads=1):
+    codes = [p.code for p in store.products.list_all()]
+
+    def writer(start):
+        for i in range(start, n, threads):
+            store.update_product(codes[i % len(codes)], new_stock=i % 50)
+
+    workers = [threading.Thread(target=writer, args=(start,)) for start in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    store.close()
+
+
+def run(n):
+    rows = []
+    for policy in (None, "none", "batch", "always"):
+        row = [policy or "sin log"]
+        for threads in (1, THREADS):
+            with tempfile.TemporaryDirectory() as directory:
+                if policy is None:
+                    store = quiet_store()
+                else:
+                    store = quiet_store(wal_path=os.path.join(directory, "store.log"),
+                                        fsync=policy)
+                _, elapsed = timed(mutate, store, n, threads)
+                row.append(f"{n / elapsed:,.0f}")
+        rows.append(row)
+
+    print(f"{n} llamadas a update_product\n")
+    print_table(rows, ["fsync", "mutaciones/s (1 hilo)", f"mutaciones/s ({THREADS} hilos)"])
+
+
+if __name__ == "__main__":
+    run(size_from_argv(20000))
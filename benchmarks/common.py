@@ -0,0 +1,118 @@
+"""
+Utilidades compartidas por los benchmarks.
+Se ejecutan desde la raíz del repositorio, por ejemplo:
+    python -m benchmarks.bench_hashtable 100000
+"""
+import random
+import sys
+import time
+
+PREFIXES = ["BAT", "SUP", "WON", "FLA", "JUS", "SPI", "XMN", "AVE",
+            "IRO", "CAP", "DEA", "SHO", "SEI", "IND", "TAB", "MAR"]
+
+
+def synthetic_codes(n, seed=42):
+    """Genera n códigos de producto únicos con el formato del catálogo"""
+    rng = random.Random(seed)
+    codes = [f"{PREFIXES[i % len(PREFIXES)]}{i // len(PREFIXES):06d}" for i in range(n)]
+    rng.shuffle(codes)
+    return codes
+
+CATEGORIES = ["Batman", "Superman", "Wonder Woman", "Flash", "Justice League",
+              "Spider-Man", "X-Men", "Avengers", "Iron Man", "Captain America",
+              "Deadpool", "Shonen", "Seinen", "Independientes"]
+
+
+def synthetic_products(n, seed=42):
+    """
+    Genera n tuplas (code, name, price, stock, category) reproducibles,
+    con precios y stocks parecidos a los del catálogo real.
+    """
+    rng = random.Random(seed)
+    for i, code in enumerate(synthetic_codes(n, seed)):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        yield (code, f"{category} Vol. {i}", rng.randrange(1500, 9000, 50),
+               rng.randrange(0, 40), category)
+
+
+def synthetic_categories(fanout=4, depth=4):
+    """
+    Pares (nombre, padre) en preorden de un árbol de categorías completo
+    con fanout hijos por nodo y depth niveles debajo de la raíz.
+    """
+    pairs = [("Comics", None)]
+    level = ["Comics"]
+    for depth_index in range(1, depth + 1):
+        next_level = []
+        for parent in level:
+            for i in range(fanout):
+                name = f"{parent}/{i}" if depth_index > 1 else f"C{i}"
+                pairs.append((name, parent))
+                next_level.append(name)
+        level = next_level
+    return pairs
+
+
+# Proporción de pedidos de cada nivel de servicio en los flujos sintéticos
+TIER_MIX = {"express": 0.1, "preventa": 0.1, "normal": 0.6, "mayorista": 0.2}
+
+
+def synthetic_orders(codes, n, seed=42, tier_mix=TIER_MIX):
+    """
+    Genera n pedidos (cliente, [códigos], nivel) reproducibles, con 1 a 3
+    códigos cada uno y los niveles en la proporción de tier_mix.
+    """
+    rng = random.Random(seed)
+    tiers = rng.choices(list(tier_mix), weights=list(tier_mix.values()), k=n)
+    return [(f"cliente{i % 5000}", rng.sample(codes, rng.randint(1, 3)), tier)
+            for i, tier in enumerate(tiers)]
+
+
+def synthetic_store(n, seed=42, stock=None, **kwargs):
+    """
+    Crea un Store sin sink de eventos con n productos sintéticos además del
+    catálogo real. Con stock, todos los productos quedan con ese stock.
+    """
+    from store import Product
+    store = quiet_store(**kwargs)
+    products = []
+    for code, name, price, product_stock, category in synthetic_products(n, seed):
+        product = Product(code, name, price, product_stock if stock is None else stock,
+                          category)
+        store.products.insert(code, product)
+        products.append(product)
+    store._index_many(products)
+    if stock is not None:
+        for product in store.products.list_all():
+            if product.stock != stock:
+                store.update_product(product.code, new_stock=stock)
+    return store
+
+
+def quiet_store(**kwargs):
+    """Crea un Store sin sink de eventos (sin mensajes de carga ni de operaciones)"""
+    from store import Store
+    return Store(**kwargs)
+
+
+def timed(func, *args):
+    """Ejecuta func y retorna (resultado, segundos)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def size_from_argv(default):
+    """Lee el tamaño del benchmark del primer argumento, si lo hay"""
+    if len(sys.argv) > 1:
+        return int(sys.argv[1])
+    return default
+
+
+def print_table(rows, headers):
+    """Imprime una tabla simple de resultados"""
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
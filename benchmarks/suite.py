@@ -0,0 +1,466 @@
+"""
+Suite de benchmarks de las estructuras y del Store, con resultados en JSON
+para comparar versiones.
+
+Cada benchmark prepara sus datos sintéticos (reproducibles con --seed),
+mide solo la operación y se repite --repeat veces quedándose con el mejor
+tiempo (el menos afectado por otros procesos). Durante la medición el
+recolector de basura está desactivado, como en timeit.
+
+    python -m benchmarks.suite                          corre todo (tamaño 100000)
+    python -m benchmarks.suite --size 20000 --only hashtable,queue
+    python -m benchmarks.suite --json antes.json        guarda los resultados
+    python -m benchmarks.suite --compare antes.json     corre y compara
+    python -m benchmarks.suite --compare antes.json despues.json
+
+Al comparar, un benchmark es una regresión si sus operaciones por segundo
+bajan más que --threshold (10% por defecto); en ese caso el programa
+termina con código 1, para usarlo en integración continua.
+
+Los micro benchmarks hacen size operaciones sobre una estructura; los del
+Store usan un catálogo sintético de size productos y size // 10 pedidos.
+"""
+import argparse
+import atexit
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import (synthetic_codes, synthetic_products, synthetic_categories,
+                               synthetic_orders, synthetic_store, print_table)
+from structures.hashtable import HashTable
+from structures.queue import Queue
+from structures.priority_queue import PriorityQueue
+from structures.stack import Stack
+from structures.tree import Tree
+
+# nombre -> función(size, seed) que retorna (preparar, operación, cantidad de operaciones).
+# preparar() arma el estado de cada repetición (sin medir) y operación(estado) es lo medido.
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+# ESTRUCTURAS
+
+def _filled_table(storage, codes):
+    table = HashTable(storage=storage)
+    for code in codes:
+        table.insert(code, code)
+    return table
+
+
+def _register_hashtable(storage):
+    @benchmark(f"hashtable.insert[{storage}]")
+    def insert(size, seed):
+        codes = synthetic_codes(size, seed)
+
+        def run(table):
+            for code in codes:
+                table.insert(code, code)
+        return lambda: HashTable(storage=storage), run, size
+
+    @benchmark(f"hashtable.search_hit[{storage}]")
+    def search_hit(size, seed):
+        codes = synthetic_codes(size, seed)
+        table = _filled_table(storage, codes)
+        random.Random(seed).shuffle(codes)
+
+        def run(table):
+            search = table.search
+            for code in codes:
+                search(code)
+        return lambda: table, run, size
+
+    @benchmark(f"hashtable.search_miss[{storage}]")
+    def search_miss(size, seed):
+        codes = synthetic_codes(size, seed)
+        table = _filled_table(storage, codes)
+        missing = [code + "X" for code in codes]
+
+        def run(table):
+            search = table.search
+            for code in missing:
+                search(code)
+        return lambda: table, run, size
+
+    @benchmark(f"hashtable.delete[{storage}]")
+    def delete(size, seed):
+        codes = synthetic_codes(size, seed)
+
+        def run(table):
+            for code in codes:
+                table.delete(code)
+        return lambda: _filled_table(storage, codes), run, size
+
+
+for _storage in ("chaining", "open", "persistent"):
+    _register_hashtable(_storage)
+
+
+@benchmark("queue.enqueue_dequeue")
+def queue_enqueue_dequeue(size, seed):
+    def run(queue):
+        for i in range(size):
+            queue.enqueue(i)
+        while not queue.is_empty():
+            queue.dequeue()
+    return Queue, run, 2 * size
+
+
+@benchmark("queue.steady")
+def queue_steady(size, seed):
+    """Cola con 100 elementos: cada operación encola uno y desencola otro"""
+    def setup():
+        queue = Queue()
+        for i in range(100):
+            queue.enqueue(i)
+        return queue
+
+    def run(queue):
+        for i in range(size):
+            queue.enqueue(i)
+            queue.dequeue()
+    return setup, run, 2 * size
+
+
+@benchmark("queue.batch")
+def queue_batch(size, seed):
+    items = list(range(1000))
+
+    def run(queue):
+        for _ in range(size // len(items)):
+            queue.enqueue_many(items)
+        while not queue.is_empty():
+            queue.dequeue_many(len(items))
+    return Queue, run, 2 * (size // len(items)) * len(items)
+
+
+@benchmark("priority_queue.enqueue_dequeue")
+def priority_queue_enqueue_dequeue(size, seed):
+    rng = random.Random(seed)
+    items = [(rng.randrange(4), i) for i in range(size)]
+
+    def run(queue):
+        for item in items:
+            queue.enqueue(item)
+        while not queue.is_empty():
+            queue.dequeue()
+    return lambda: PriorityQueue(key=lambda item: item[0]), run, 2 * size
+
+
+@benchmark("priority_queue.update")
+def priority_queue_update(size, seed):
+    rng = random.Random(seed)
+    items = [(rng.randrange(4), i) for i in range(size)]
+
+    def setup():
+        queue = PriorityQueue(key=lambda item: item[0])
+        for item in items:
+            queue.enqueue(item)
+        return queue
+
+    def run(queue):
+        # Todos suben a la prioridad 0 (como el escalado de pedidos)
+        for item in items:
+            queue.update(item, 0)
+    return setup, run, size
+
+
+@benchmark("stack.history_churn")
+def stack_history_churn(size, seed):
+    """Historial acotado: se apila cada producto visto y cada 10 se lista el historial"""
+    codes = synthetic_codes(size, seed)
+
+    def run(stack):
+        for i, code in enumerate(codes):
+            stack.push(code)
+            if i % 10 == 0:
+                list(stack)
+    return lambda: Stack(capacity=5), run, size
+
+
+def _category_tree():
+    tree = Tree()
+    for name, parent in synthetic_categories(fanout=8, depth=4):
+        tree.add(name, parent)
+    return tree
+
+
+@benchmark("tree.build")
+def tree_build(size, seed):
+    categories = synthetic_categories(fanout=8, depth=4)
+
+    def run(_):
+        tree = Tree()
+        for name, parent in categories:
+            tree.add(name, parent)
+        tree.interval(categories[0][0])  # arma la numeración Euler
+    return lambda: None, run, len(categories)
+
+
+@benchmark("tree.is_under")
+def tree_is_under(size, seed):
+    tree = _category_tree()
+    names = list(tree.nodes)
+    rng = random.Random(seed)
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(size)]
+
+    def run(tree):
+        for name, ancestor in pairs:
+            tree.is_under(name, ancestor)
+    return lambda: tree, run, size
+
+
+@benchmark("tree.subtree")
+def tree_subtree(size, seed):
+    tree = _category_tree()
+    # Categorías de los primeros niveles: subárboles de 73 a 4681 nodos
+    names = [name for name in tree.nodes if name.count("/") <= 1]
+    rng = random.Random(seed)
+    queries = [rng.choice(names) for _ in range(max(1, size // 100))]
+
+    def run(tree):
+        for name in queries:
+            tree.list_subcategories(name)
+    return lambda: tree, run, len(queries)
+
+
+# FLUJOS DEL STORE
+
+@benchmark("store.load")
+def store_load(size, seed):
+    """Carga completa de un catálogo JSONL de size productos (lectura e índices)"""
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, True)
+    path = os.path.join(directory, "catalog.jsonl")
+    with open(path, "w", encoding="utf-8") as file:
+        for code, name, price, stock, category in synthetic_products(size, seed):
+            file.write(json.dumps({"code": code, "name": name, "price": price,
+                                   "stock": stock, "category": category}) + "\n")
+
+    def run(_):
+        from store import Store
+        Store(catalog_path=path)
+    return lambda: None, run, size
+
+
+@benchmark("store.find_product")
+def store_find_product(size, seed):
+    store = synthetic_store(size, seed)
+    codes = [p.code for p in store.products.list_all()]
+    rng = random.Random(seed)
+    lookups = [rng.choice(codes) for _ in range(size)]
+
+    def run(store):
+        for code in lookups:
+            store.find_product(code)
+    return lambda: store, run, size
+
+
+def _order_stream(size, seed):
+    codes = [code for code, *_ in synthetic_products(size, seed)]
+    return synthetic_orders(codes, max(1, size // 10), seed)
+
+
+@benchmark("store.create_order")
+def store_create_order(size, seed):
+    orders = _order_stream(size, seed)
+
+    def run(store):
+        for customer, codes, tier in orders:
+            store.create_order(customer, codes, tier)
+    return lambda: synthetic_store(size, seed, stock=10 ** 9), run, len(orders)
+
+
+@benchmark("store.create_orders_bulk")
+def store_create_orders_bulk(size, seed):
+    orders = _order_stream(size, seed)
+
+    def run(store):
+        store.create_orders_bulk(orders)
+    return lambda: synthetic_store(size, seed, stock=10 ** 9), run, len(orders)
+
+
+@benchmark("store.process_next_order")
+def store_process_next_order(size, seed):
+    orders = _order_stream(size, seed)
+
+    def setup():
+        store = synthetic_store(size, seed, stock=10 ** 9)
+        store.create_orders_bulk(orders)
+        return store
+
+    def run(store):
+        while store.process_next_order() is not None:
+            pass
+    return setup, run, len(orders)
+
+
+@benchmark("store.category_tree")
+def store_category_tree(size, seed):
+    """Productos de un subárbol de categorías, sin caché de consultas"""
+    store = synthetic_store(size, seed, query_cache_size=0)
+    queries = ["DC Comics", "Marvel", "Manga", "Batman"] * max(1, size // 10000)
+
+    def run(store):
+        for category in queries:
+            store.products_in_category_tree(category)
+    return lambda: store, run, len(queries)
+
+
+# MEDICIÓN
+
+def measure(setup, run, repeat):
+    """Tiempos de repeat ejecuciones de run, cada una sobre un estado nuevo"""
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        gc.collect()
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(state)
+            times.append(time.perf_counter() - start)
+        finally:
+            if enabled:
+                gc.enable()
+    return times
+
+
+def git_commit():
+    """Commit actual del repositorio (None si no es un repositorio git)"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(size=100000, repeat=3, seed=42, only=None, progress=None):
+    """
+    Corre los benchmarks (los que contienen alguno de los textos de only)
+    y retorna el resultado como diccionario listo para JSON.
+    """
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if only and not any(part in name for part in only):
+            continue
+        setup, run, ops = factory(size, seed)
+        times = measure(setup, run, repeat)
+        best = min(times)
+        results[name] = {
+            "ops": ops,
+            "seconds": round(best, 6),
+            "ops_per_sec": round(ops / best, 1) if best else None,
+            "us_per_op": round(best / ops * 1e6, 4),
+            "runs": [round(t, 6) for t in times],
+        }
+        if progress is not None:
+            progress(name, results[name])
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "size": size,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(old, new, threshold=0.10):
+    """
+    Compara dos resultados de run_suite por operaciones por segundo.
+    Retorna (filas para print_table, nombres de las regresiones).
+    """
+    rows = []
+    regressions = []
+    for name, result in new["results"].items():
+        before = old["results"].get(name)
+        if before is None or not before["ops_per_sec"] or not result["ops_per_sec"]:
+            rows.append([name, "-", f"{result['ops_per_sec']:,.0f}", "nuevo", ""])
+            continue
+        ratio = result["ops_per_sec"] / before["ops_per_sec"]
+        status = ""
+        if ratio < 1 - threshold:
+            status = "REGRESIÓN"
+            regressions.append(name)
+        elif ratio > 1 + threshold:
+            status = "mejora"
+        rows.append([name, f"{before['ops_per_sec']:,.0f}", f"{result['ops_per_sec']:,.0f}",
+                     f"{(ratio - 1) * 100:+.1f}%", status])
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de estructuras y del Store")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="nombres separados por coma (coincidencia parcial)")
+    parser.add_argument("--json", help="archivo donde guardar los resultados")
+    parser.add_argument("--compare", nargs="+", metavar="JSON",
+                        help="resultados anteriores; con dos archivos compara sin correr")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--list", action="store_true", help="lista los benchmarks y sale")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare admite uno o dos archivos")
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[1], encoding="utf-8") as file:
+            current = json.load(file)
+    else:
+        only = args.only.split(",") if args.only else None
+
+        def progress(name, result):
+            print(f"  {name:<40} {result['ops_per_sec']:>14,.0f} op/s "
+                  f"{result['us_per_op']:>10.3f} µs/op", file=sys.stderr)
+
+        current = run_suite(args.size, args.repeat, args.seed, only, progress)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(current, file, indent=2)
+            file.write("\n")
+    elif not args.compare:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as file:
+            baseline = json.load(file)
+        rows, regressions = compare(baseline, current, args.threshold)
+        print(f"\nComparación con {args.compare[0]} "
+              f"(commit {baseline['meta'].get('commit')} -> {current['meta'].get('commit')})\n")
+        print_table(rows, ["benchmark", "antes op/s", "ahora op/s", "cambio", ""])
+        if regressions:
+            print(f"\n✗ {len(regressions)} regresiones de más de {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Eventos del Store: en lugar de mostrar mensajes, el Store emite eventos
+a un "sink" que decide qué hacer con ellos. Por defecto no se hace nada
+(NullSink), así el Store se puede usar como librería sin costo de E/S.
+- BufferedSink guarda los eventos en memoria (acotado) para revisarlos
+- LeveledSink escribe los mensajes a partir de cierto nivel (la consola)
+"""
+import sys
+import threading
+from collections import deque
+
+DEBUG = 10     # Cada operación (búsquedas, pedidos, cambios de productos)
+INFO = 20      # Carga del catálogo, snapshots, recuperación del log
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+
+class Event:
+    """
+    Un evento con nivel, nombre y datos. El mensaje se arma recién cuando
+    alguien lo pide, a partir de la plantilla y los datos.
+    """
+    __slots__ = ("level", "name", "template", "data")
+
+    def __init__(self, level, name, template, data):
+        self.level = level
+        self.name = name
+        self.template = template
+        self.data = data
+
+    @property
+    def message(self):
+        return self.template.format(**self.data)
+
+    def __str__(self):
+        return f"{LEVEL_NAMES.get(self.level, self.level)} {self.name}: {self.message}"
+
+
+class NullSink:
+    """Descarta todo: con nivel infinito el Store ni siquiera arma los eventos"""
+    level = float("inf")
+
+    def emit(self, event):
+        pass
+
+
+class BufferedSink:
+    """Guarda los últimos maxlen eventos con nivel >= level"""
+
+    def __init__(self, level=DEBUG, maxlen=10000):
+        self.level = level
+        self.events = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def emit(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def drain(self):
+        """Retorna los eventos guardados y vacía el buffer"""
+        with self._lock:
+            events = list(self.events)
+            self.events.clear()
+        return events
+
+    def __len__(self):
+        return len(self.events)
+
+
+class LeveledSink:
+    """Escribe el mensaje de cada evento con nivel >= level en un stream"""
+
+    def __init__(self, level=INFO, stream=None):
+        self.level = level
+        self.stream = stream
+
+    def emit(self, event):
+        # sys.stdout se busca en cada evento para respetar redirecciones
+        print(event.message, file=self.stream or sys.stdout)
+
+
+if __name__ == "__main__":
+    print("=== Prueba de eventos ===\n")
+
+    console = LeveledSink(level=INFO)
+    for level, template in [(DEBUG, "no se muestra"), (INFO, "✓ {count} productos cargados"),
+                            (ERROR, "Error: {error}")]:
+        if level >= console.level:
+            console.emit(Event(level, "demo", template, {"count": 43, "error": "sin archivo"}))
+
+    buffer = BufferedSink(maxlen=2)
+    for i in range(3):
+        buffer.emit(Event(DEBUG, "order_created", "Pedido #{number}", {"number": i}))
+    print(f"\nEn el buffer: {[str(e) for e in buffer.drain()]}")
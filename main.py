@@ -1,251 +1,189 @@
-from structures.hashtable import HashTable
-from structures.queue import Queue
-from structures.stack import Stack
-from structures.tree import Tree, TreeNode
-import os, json
-
-script_directory = os.path.dirname(os.path.abspath(__file__))
-
-
-class Product:
-    def __init__(self, code, name, price, stock, category):
-        self.code = code
-        self.name = name
-        self.price = price
-        self.stock = stock
-        self.category = category
-    
-    def __str__(self):
-        return f"[{self.code}] {self.name} - ${self.price} (Stock: {self.stock})"
-
-
-class Order:
-    def __init__(self, order_number, customer, products):
-        self.order_number = order_number
-        self.customer = customer
-        self.products = products
-    
-    def __str__(self):
-        return f"Pedido #{self.order_number} - Cliente: {self.customer}"
-
-
-class Store:
-    def __init__(self):
-        # Hash table para productos (búsqueda rápida por código)
-        self.products = HashTable()
-        
-        # Cola para procesar pedidos en orden
-        self.order_queue = Queue()
-        
-        # Pila para historial de productos vistos (últimos 5)
-        self.view_history = Stack()
-        
-        # Árbol para categorías jerárquicas
-        self.category_tree = Tree()
-        
-        # Contador para números de pedido
-        self.order_counter = 1
-        
-        # Inicializar datos
-        self._initialize_data()
-    
-    def _initialize_data(self):
-        # Crear categorías
-        self.category_tree.add("Comics")
-        self.category_tree.add("DC Comics", "Comics")
-        self.category_tree.add("Marvel", "Comics")
-        self.category_tree.add("Manga", "Comics")
-        self.category_tree.add("Independientes", "Comics")
-        
-        # Subcategorías
-        self.category_tree.add("Batman", "DC Comics")
-        self.category_tree.add("Superman", "DC Comics")
-        self.category_tree.add("Wonder Woman", "DC Comics")
-        self.category_tree.add("Flash", "DC Comics")
-        self.category_tree.add("Justice League", "DC Comics")
-        
-        self.category_tree.add("Spider-Man", "Marvel")
-        self.category_tree.add("X-Men", "Marvel")
-        self.category_tree.add("Avengers", "Marvel")
-        self.category_tree.add("Iron Man", "Marvel")
-        self.category_tree.add("Captain America", "Marvel")
-        self.category_tree.add("Deadpool", "Marvel")
-        
-        self.category_tree.add("Shonen", "Manga")
-        self.category_tree.add("Seinen", "Manga")
-        
-        self._load_products()
-    
-    def _load_products(self):
-        possible_files = ["products.json", "1761138984441_products.json"]
-        file_path = "products/products.json"
-        
-        for filename in possible_files:
-            if os.path.exists(filename):
-                file_path = "products/" + filename
-                break
-        
-        try:
-            with open("products/products.json", 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                
-                # Iterar sobre los productos y agregarlos a la HashTable
-                for product_data in data['products']:
-                    product = Product(
-                        product_data['code'],
-                        product_data['name'],
-                        product_data['price'],
-                        product_data['stock'],
-                        product_data['category']
-                    )
-                    self.products.insert(product.code, product)
-                print(f"✓ {len(data['products'])} productos cargados desde {file_path}")
-        except Exception as e:
-            print(f"Error al cargar productos: {e}")
-
-
-    
-    def add_product(self, code, name, price, stock, category):
-        """Agrega un nuevo producto al inventario"""
-        product = Product(code, name, price, stock, category)
-        self.products.insert(code, product)
-        print(f"✓ Producto agregado exitosamente")
-    
-    def search_product(self, code):
-        """Busca un producto por su código único (O(1) con hash table)"""
-        product = self.products.search(code)
-        if product:
-            self.add_to_history(product)
-            print(f"\n✓ Producto encontrado:")
-            print(f"  {product}")
-            return product
-        else:
-            print(f"✗ Producto con código '{code}' no encontrado")
-            return None
-    
-    def update_product(self, code, new_price=None, new_stock=None):
-        """Actualiza información de un producto existente"""
-        product = self.products.search(code)
-        if product:
-            if new_price is not None:
-                product.price = new_price
-            if new_stock is not None:
-                product.stock = new_stock
-            print(f"✓ Producto actualizado exitosamente")
-        else:
-            print(f"✗ Producto no encontrado")
-    
-    def delete_product(self, code):
-        """Elimina un producto del inventario"""
-        if self.products.delete(code):
-            print(f"✓ Producto eliminado exitosamente")
-        else:
-            print(f"✗ Producto no encontrado")
-    
-    def list_products(self):
-        """Muestra todos los productos del inventario"""
-        products = self.products.list_all()
-        if products:
-            print(f"\n{'='*70}")
-            print(f"TOTAL: {len(products)} productos")
-            print(f"{'='*70}")
-            for prod in products:
-                print(f"  {prod}")
-            print(f"{'='*70}")
-        else:
-            print("✗ No hay productos en el inventario")
-    
-    # PROCESAMIENTO DE PEDIDOS
-    
-    def create_order(self, customer, product_codes):
-        """Crea un nuevo pedido y lo agrega a la cola"""
-        order_products = []
-        not_found = []
-        
-        print(f"\nBuscando productos...")
-        for code in product_codes:
-            print(f"  Buscando código: {code}")
-            prod = self.products.search(code)
-            if prod:
-                order_products.append(prod)
-                print(f"    ✓ Encontrado: {prod.name}")
-            else:
-                not_found.append(code)
-                print(f"    ✗ No encontrado: {code}")
-        
-        if not_found:
-            print(f"\n⚠ Códigos no encontrados: {', '.join(not_found)}")
-        
-        if order_products:
-            order = Order(self.order_counter, customer, order_products)
-            self.order_queue.enqueue(order)
-            print(f"\n✓ Pedido #{self.order_counter} creado exitosamente")
-            print(f"  Cliente: {customer}")
-            print(f"  Productos: {len(order_products)}")
-            self.order_counter += 1
+from store import Store, Product, Order, OutOfStockError, LOW_STOCK_THRESHOLD
+from store import ORDER_TIERS, DEFAULT_TIER
+from events import LeveledSink, INFO
+from persistence.loader import iter_order_records
+
+# Interfaz de consola: el Store retorna resultados y acá se muestran.
+# Product, Order, Store y OutOfStockError se re-exportan para el código que
+# los importaba desde main.
+
+
+# PRESENTACIÓN
+
+def show_product(product, code):
+    """Muestra el resultado de buscar un producto"""
+    if product:
+        print(f"\n✓ Producto encontrado:")
+        print(f"  {product}")
+    else:
+        print(f"✗ Producto con código '{code}' no encontrado")
+
+
+def show_catalog_page(result, page, page_size):
+    """Muestra una página del catálogo (resultado de Store.catalog_page)"""
+    pages = max(1, -(-result["total"] // page_size))
+    print(f"\n{'='*70}")
+    print(f"TOTAL: {result['total']} productos - Página {page} de {pages}")
+    print(f"{'='*70}")
+    for prod in result["products"]:
+        print(f"  {prod}")
+    if not result["products"]:
+        print("✗ No hay productos en el inventario")
+    print(f"{'='*70}")
+
+
+def browse_catalog(store, page_size=20):
+    """Recorre el catálogo de a una página, con el orden elegido"""
+    sort = input("Ordenar por (code/name/price/stock) [code]: ").strip().lower() or "code"
+    if sort not in store.sort_indexes:
+        print("✗ Orden inválido")
+        return
+    descending = input("¿Descendente? (S/N) [N]: ").strip().upper() == "S"
+
+    # Cursor con el que empieza cada página vista, para poder volver
+    cursors = [None]
+    while True:
+        result = store.catalog_page(sort, page_size, cursors[-1], descending=descending)
+        show_catalog_page(result, len(cursors), page_size)
+        choice = input("[Enter] Siguiente  [A] Anterior  [Q] Salir: ").strip().upper()
+        if choice == "Q":
+            break
+        if choice == "A":
+            if len(cursors) > 1:
+                cursors.pop()
+        elif result["next"] is not None:
+            cursors.append(result["next"])
         else:
-            print("\n✗ No se pudo crear el pedido: ningún producto válido")
-    
-    def process_next_order(self):
-        """Procesa el siguiente pedido en la cola (FIFO)"""
-        order = self.order_queue.dequeue()
-        if order:
-            print(f"\n{'='*70}")
-            print(f"PROCESANDO: {order}")
-            print(f"{'='*70}")
-            print(f"Productos en el pedido:")
-            for prod in order.products:
-                print(f"  - {prod}")
-            print(f"{'='*70}")
+            print("(Última página)")
+            break
+
+
+def show_search_results(query, results):
+    """Muestra el resultado de Store.search_products"""
+    if not results:
+        print(f"✗ Ningún producto coincide con '{query}'")
+        return
+    print(f"\n✓ {len(results)} productos encontrados:")
+    for prod, _ in results:
+        print(f"  {prod}")
+
+
+def show_order_result(customer, result):
+    """Muestra el resultado de Store.create_order"""
+    print(f"\nBuscando productos...")
+    for code, prod in result["lookups"]:
+        print(f"  Buscando código: {code}")
+        if prod:
+            print(f"    ✓ Encontrado: {prod.name}")
         else:
-            print("✗ No hay pedidos pendientes")
-    
-    def view_pending_orders(self):
-        """Muestra todos los pedidos en cola"""
-        print(f"\n{'='*70}")
-        print(f"PEDIDOS PENDIENTES: {self.order_queue.size()}")
-        print(f"{'='*70}")
-        self.order_queue.display()
-        print(f"{'='*70}")
-    
-    # HISTORIAL DE PRODUCTOS VISTOS
-    
-    def add_to_history(self, product):
-        """Agrega un producto al historial (máximo 5)"""
-        if self.view_history.size() >= 5:
-            self.view_history.items.pop(0)
-        self.view_history.push(product)
-    
-    def view_history_list(self):
-        """Muestra los últimos productos vistos"""
-        print(f"\n{'='*70}")
-        print(f"HISTORIAL DE BÚSQUEDAS (últimos {self.view_history.size()})")
-        print(f"{'='*70}")
-        self.view_history.display()
-        print(f"{'='*70}")
-    
-    # CATEGORÍAS JERÁRQUICAS
-    
-    def create_category(self, name, parent=None):
-        """Crea una nueva categoría en el árbol"""
-        self.category_tree.add(name, parent)
-        print(f"✓ Categoría '{name}' creada")
-    
-    def show_categories(self):
-        """Muestra todas las categorías en forma jerárquica"""
+            print(f"    ✗ No encontrado: {code}")
+
+    if result["not_found"]:
+        print(f"\n⚠ Códigos no encontrados: {', '.join(result['not_found'])}")
+
+    order = result["order"]
+    if order is not None:
+        print(f"\n✓ Pedido #{order.order_number} creado exitosamente")
+        print(f"  Cliente: {customer}")
+        print(f"  Productos: {len(order.products)}")
+        print(f"  Nivel: {order.tier}")
+        print(f"  Stock reservado")
+    elif result["error"] == "sin_stock":
+        print(f"\n✗ No se pudo crear el pedido: sin stock suficiente de {result['out_of_stock']}")
+    elif result["error"] == "cola_llena":
+        print("\n✗ No se pudo crear el pedido: la cola de pedidos está llena")
+    else:
+        print("\n✗ No se pudo crear el pedido: ningún producto válido")
+
+
+def show_processed_order(order):
+    """Muestra el pedido recién procesado"""
+    if order:
         print(f"\n{'='*70}")
-        print(f"ESTRUCTURA DE CATEGORÍAS")
+        print(f"PROCESANDO: {order}")
         print(f"{'='*70}")
-        self.category_tree.display()
+        print(f"Productos en el pedido:")
+        for prod in order.products:
+            print(f"  - {prod}")
         print(f"{'='*70}")
+        print("✓ Pedido completado")
+    else:
+        print("✗ No hay pedidos pendientes")
+
+
+def show_pending_orders(orders):
+    """Muestra los pedidos pendientes en orden de cola"""
+    print(f"\n{'='*70}")
+    print(f"PEDIDOS PENDIENTES: {len(orders)}")
+    print(f"{'='*70}")
+    for i, order in enumerate(orders, 1):
+        print(f"  {i}. {order}")
+    if not orders:
+        print("  (Cola vacía)")
+    print(f"{'='*70}")
+
+
+def show_history(store):
+    """Muestra los últimos productos vistos"""
+    print(f"\n{'='*70}")
+    print(f"HISTORIAL DE BÚSQUEDAS (últimos {store.view_history.size()})")
+    print(f"{'='*70}")
+    store.view_history.display()
+    print(f"{'='*70}")
+
+
+def show_categories(store):
+    """Muestra todas las categorías en forma jerárquica"""
+    print(f"\n{'='*70}")
+    print(f"ESTRUCTURA DE CATEGORÍAS")
+    print(f"{'='*70}")
+    store.category_tree.display()
+    print(f"{'='*70}")
+
+
+def show_inventory_report(report, alerts):
+    """Muestra el reporte de un subárbol de categorías y sus alertas de stock"""
+    print(f"\n{'='*70}")
+    print(f"REPORTE: {report['category']}")
+    print(f"{'='*70}")
+    print(f"Productos: {report['products']}  Unidades: {report['units']}  "
+          f"Valor: ${report['value']:,.0f}")
+    if report["products"]:
+        print(f"Precio p50: ${report['p50_price']:,.0f}  p90: ${report['p90_price']:,.0f}  "
+              f"p99: ${report['p99_price']:,.0f}")
+        print("Distribución de precios:")
+        largest = max(count for _, _, count in report["distribution"])
+        for low, high, count in report["distribution"]:
+            bar = "█" * round(30 * count / largest) if largest else ""
+            print(f"  ${low:>9,.0f} - ${high:>9,.0f}  {bar} {count}")
+    print(f"Stock bajo (<= {LOW_STOCK_THRESHOLD}): {report['low_stock']}")
+    for category, products in alerts.items():
+        codes = ", ".join(f"{code} ({stock})" for code, stock in products)
+        print(f"  ⚠ {category}: {codes}")
+    print(f"{'='*70}")
+
+
+def show_import_summary(summary):
+    """Muestra el resumen de Store.create_orders_bulk"""
+    print(f"✓ {summary['created']} pedidos creados de {summary['records']} registros")
+    if summary["created"]:
+        print(f"  Números: #{summary['first_order']} a #{summary['last_order']}")
+    if summary["out_of_stock"]:
+        print(f"  ✗ Rechazados por falta de stock: {summary['out_of_stock']}")
+    if summary["empty"]:
+        print(f"  ✗ Sin productos válidos: {summary['empty']}")
+    if summary["not_found"]:
+        codes = ", ".join(sorted(summary["not_found"]))
+        print(f"  ⚠ Códigos no encontrados: {codes}")
 
 
 # PROGRAMA PRINCIPAL
 
 def main_menu():
     """Menú principal del sistema"""
-    store = Store()
-    
+    # Los avisos de carga y recuperación se muestran en la consola
+    store = Store(events=LeveledSink(level=INFO))
+
     while True:
         print("\n" + "="*50)
         print("TIENDA NADIE SE SALVA SOLO - Sistema de Gestión")
@@ -260,22 +198,25 @@ def main_menu():
         print("[8] Ver pedidos pendientes")
         print("[9] Historial de búsquedas")
         print("[10] Ver categorías")
+        print("[11] Cancelar pedido")
+        print("[12] Importar pedidos (CSV o JSONL)")
+        print("[13] Buscar por nombre")
+        print("[14] Reporte de inventario")
         print("[0] Salir")
         print("="*50)
-        
+
         option = input("Opción: ").strip()
-        
+
         if option == "1":
             print("\n--- BUSCAR PRODUCTO ---")
             code = input("Código: ").strip().upper()
-            store.search_product(code)
+            show_product(store.search_product(code), code)
             input("\nPresione Enter para continuar...")
-        
+
         elif option == "2":
             print("\n--- CATÁLOGO DE PRODUCTOS ---")
-            store.list_products()
-            input("\nPresione Enter para continuar...")
-        
+            browse_catalog(store)
+
         elif option == "3":
             print("\n--- AGREGAR PRODUCTO ---")
             code = input("Código: ").strip().upper()
@@ -285,10 +226,11 @@ def main_menu():
                 stock = int(input("Stock: "))
                 category = input("Categoría: ").strip()
                 store.add_product(code, name, price, stock, category)
+                print(f"✓ Producto agregado exitosamente")
             except ValueError:
                 print("✗ Error: precio o stock inválido")
             input("\nPresione Enter para continuar...")
-        
+
         elif option == "4":
             print("\n--- ACTUALIZAR PRODUCTO ---")
             code = input("Código: ").strip().upper()
@@ -297,57 +239,119 @@ def main_menu():
             try:
                 new_price = float(price_input) if price_input else None
                 new_stock = int(stock_input) if stock_input else None
-                store.update_product(code, new_price, new_stock)
+                if store.update_product(code, new_price, new_stock):
+                    print(f"✓ Producto actualizado exitosamente")
+                else:
+                    print(f"✗ Producto no encontrado")
             except ValueError:
                 print("✗ Error: valor inválido")
             input("\nPresione Enter para continuar...")
-        
+
         elif option == "5":
             print("\n--- ELIMINAR PRODUCTO ---")
             code = input("Código: ").strip().upper()
             confirm = input("¿Confirmar eliminación? (S/N): ").strip().upper()
             if confirm == 'S':
-                store.delete_product(code)
+                if store.delete_product(code):
+                    print(f"✓ Producto eliminado exitosamente")
+                else:
+                    print(f"✗ Producto no encontrado")
             else:
                 print("Operación cancelada")
             input("\nPresione Enter para continuar...")
-        
+
         elif option == "6":
             print("\n--- CREAR PEDIDO ---")
             customer = input("Cliente: ").strip()
             codes_input = input("Códigos (separados por coma): ").strip().upper()
             codes = [c.strip() for c in codes_input.split(",")]
-            store.create_order(customer, codes)
+            tiers = "/".join(ORDER_TIERS)
+            tier = input(f"Nivel ({tiers}) [{DEFAULT_TIER}]: ").strip().lower() or DEFAULT_TIER
+            if tier in ORDER_TIERS:
+                try:
+                    show_order_result(customer, store.create_order(customer, codes, tier))
+                except ValueError as e:
+                    print(f"✗ {e}")
+            else:
+                print("✗ Nivel inválido")
             input("\nPresione Enter para continuar...")
-        
+
         elif option == "7":
             print("\n--- PROCESAR PEDIDO ---")
-            store.process_next_order()
+            tier = input("Solo hasta el nivel (Enter para cualquiera): ").strip().lower() or None
+            if tier is None or tier in ORDER_TIERS:
+                show_processed_order(store.process_next_order(tier))
+            else:
+                print("✗ Nivel inválido")
             input("\nPresione Enter para continuar...")
-        
+
         elif option == "8":
             print("\n--- PEDIDOS PENDIENTES ---")
-            store.view_pending_orders()
+            show_pending_orders(store.pending_order_list())
             input("\nPresione Enter para continuar...")
-        
+
         elif option == "9":
             print("\n--- HISTORIAL DE BÚSQUEDAS ---")
-            store.view_history_list()
+            show_history(store)
             input("\nPresione Enter para continuar...")
-        
+
         elif option == "10":
             print("\n--- CATEGORÍAS ---")
-            store.show_categories()
+            show_categories(store)
             input("\nPresione Enter para continuar...")
-        
+
+        elif option == "11":
+            print("\n--- CANCELAR PEDIDO ---")
+            try:
+                number = int(input("Número de pedido: ").strip())
+                if store.cancel_order(number):
+                    print(f"✓ Pedido #{number} cancelado: stock liberado")
+                else:
+                    print("✗ Pedido no encontrado o ya procesado")
+            except ValueError:
+                print("✗ Error: número inválido")
+            input("\nPresione Enter para continuar...")
+
+        elif option == "12":
+            print("\n--- IMPORTAR PEDIDOS ---")
+            path = input("Archivo: ").strip()
+            try:
+                show_import_summary(store.create_orders_bulk(iter_order_records(path)))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"✗ Error al importar: {e}")
+            input("\nPresione Enter para continuar...")
+
+        elif option == "13":
+            print("\n--- BUSCAR POR NOMBRE ---")
+            query = input("Buscar: ").strip()
+            show_search_results(query, store.search_products(query))
+            input("\nPresione Enter para continuar...")
+
+        elif option == "14":
+            print("\n--- REPORTE DE INVENTARIO ---")
+            root = store.category_tree.root
+            default = root.name if root else ""
+            category = input(f"Categoría [{default}]: ").strip() or default
+            try:
+                analytics = store.analytics()
+                if store.category_tree.search(category) is None:
+                    print(f"✗ Categoría '{category}' no encontrada")
+                else:
+                    show_inventory_report(analytics.subtree(category),
+                                          analytics.low_stock_alerts(category=category))
+            except ImportError as e:
+                print(f"✗ {e}")
+            input("\nPresione Enter para continuar...")
+
         elif option == "0":
+            store.close()
             print("\n✓ Sistema cerrado")
             break
-        
+
         else:
             print("\n✗ Opción inválida")
             input("Presione Enter para continuar...")
 
 
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    main_menu()
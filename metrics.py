@@ -0,0 +1,329 @@
+"""
+Instrumentación opcional: contadores, histogramas de latencia y tamaños,
+y valores instantáneos (gauges) del Store y sus estructuras.
+
+Sin un Metrics no se instrumenta nada: Store(metrics=None) no tiene
+ningún costo extra. Con Store(metrics=Metrics()) cada método público del
+Store se envuelve (solo en esa instancia) para contar llamadas, errores
+y medir su latencia, y se registran:
+    - hashtable_probe_length: largo de la cadena o del sondeo de cada búsqueda
+    - order_wait_seconds: espera de cada pedido en la cola, por nivel
+    - tree_subtree_size: categorías recorridas por cada consulta de subárbol
+    - order_queue_depth, hashtable_* (gauges leídos al exportar)
+
+El resultado se exporta como JSON (snapshot/to_json) o en el formato de
+texto de Prometheus (to_prometheus); write() elige según la extensión.
+
+profile_methods corre métodos elegidos bajo cProfile ("cpu") o
+tracemalloc ("memory") y guarda el resultado en profile_dir; profiled()
+hace lo mismo para cualquier bloque de código.
+"""
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Límites superiores de los buckets de cada tipo de histograma
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 3, 4, 5, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+
+class Histogram:
+    """Cantidad de observaciones por bucket, más su suma, mínimo y máximo"""
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # el último es +Inf
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Cuantil aproximado: el límite del bucket donde cae (el máximo si es +Inf)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": {str(bound): count for bound, count
+                        in zip(self.bounds + ("+Inf",), self.counts)},
+        }
+
+
+# Un solo bloque perfilado a la vez: cProfile y tracemalloc no se anidan
+_profiling = threading.Lock()
+
+
+@contextmanager
+def profiled(path, kind="cpu", top=25):
+    """
+    Corre el bloque bajo cProfile (kind="cpu", guarda un .prof para pstats
+    o snakeviz) o tracemalloc (kind="memory", guarda las top líneas que más
+    memoria asignaron) y escribe el resultado en path.
+    Si ya hay otro bloque perfilándose (otro hilo, o una llamada anidada),
+    este corre sin perfilar y no se escribe nada.
+    """
+    if kind not in ("cpu", "memory"):
+        raise ValueError(f"Tipo de perfil desconocido: {kind}")
+    if not _profiling.acquire(blocking=False):
+        yield
+        return
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if kind == "cpu":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                profiler.dump_stats(path)
+            return
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        try:
+            yield
+        finally:
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started:
+                tracemalloc.stop()
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(f"memoria actual {current} B, pico {peak} B\n")
+                for stat in after.compare_to(before, "lineno")[:top]:
+                    file.write(f"{stat}\n")
+    finally:
+        _profiling.release()
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Metrics:
+    """
+    Registro de métricas seguro para varios hilos. Cada serie es un nombre
+    más etiquetas (por ejemplo method="create_order").
+    profile_methods: {nombre de método: "cpu" o "memory"} para perfilar
+    esos métodos del Store en cada llamada.
+    sample_every: las mediciones por operación de las estructuras (largo
+    de sondeo de cada búsqueda) se toman en 1 de cada sample_every
+    operaciones, porque medir cuesta tanto como la búsqueda misma.
+    """
+
+    def __init__(self, profile_methods=None, profile_dir="profiles", sample_every=8):
+        self.counters = {}     # (nombre, etiquetas) -> valor
+        self.histograms = {}   # (nombre, etiquetas) -> Histogram
+        self.gauges = {}       # nombre -> función que retorna {etiquetas: valor} o un valor
+        self.help = {}
+        self.profile_methods = dict(profile_methods or {})
+        self.profile_dir = profile_dir
+        self.sample_every = max(1, sample_every)
+        self._profile_runs = 0
+        self._lock = threading.Lock()
+
+    # REGISTRO
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def gauge(self, name, read, help=None):
+        """
+        Registra un gauge que se lee al exportar: read() retorna un número
+        o un diccionario {(("etiqueta", "valor"), ...): número}.
+        """
+        self.gauges[name] = read
+        if help:
+            self.help[name] = help
+
+    def describe(self, name, help):
+        self.help[name] = help
+
+    # INSTRUMENTACIÓN
+
+    def instrument(self, obj, methods, prefix):
+        """
+        Reemplaza en la instancia obj cada método de methods por uno que
+        cuenta llamadas (<prefix>_calls_total), errores (<prefix>_errors_total)
+        y mide la latencia (<prefix>_latency_seconds), con la etiqueta method.
+        """
+        for name in methods:
+            setattr(obj, name, self._timed(getattr(obj, name), name, prefix))
+        self.describe(f"{prefix}_calls_total", "Llamadas por método")
+        self.describe(f"{prefix}_errors_total", "Llamadas que lanzaron una excepción")
+        self.describe(f"{prefix}_latency_seconds", "Latencia por método")
+
+    def _timed(self, method, name, prefix):
+        labels = (("method", name),)
+        calls, errors = (f"{prefix}_calls_total", labels), (f"{prefix}_errors_total", labels)
+        latency = (f"{prefix}_latency_seconds", labels)
+        profile = self.profile_methods.get(name)
+        counters, lock = self.counters, self._lock
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                if profile is not None:
+                    with profiled(self._profile_path(name, profile), profile):
+                        return method(*args, **kwargs)
+                return method(*args, **kwargs)
+            except BaseException:
+                with lock:
+                    counters[errors] = counters.get(errors, 0) + 1
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                # Claves armadas de antemano y un solo lock por llamada
+                with lock:
+                    counters[calls] = counters.get(calls, 0) + 1
+                    histogram = self.histograms.get(latency)
+                    if histogram is None:
+                        histogram = self.histograms[latency] = Histogram(LATENCY_BUCKETS)
+                    histogram.observe(elapsed)
+        return wrapper
+
+    # PERFILADO
+
+    def _profile_path(self, name, kind):
+        with self._lock:
+            self._profile_runs += 1
+            run = self._profile_runs
+        extension = "prof" if kind == "cpu" else "txt"
+        return os.path.join(self.profile_dir, f"{name}-{run}.{extension}")
+
+    # EXPORTACIÓN
+
+    def _read_gauges(self):
+        values = {}
+        for name, read in list(self.gauges.items()):
+            result = read()
+            if isinstance(result, dict):
+                values[name] = result
+            else:
+                values[name] = {(): result}
+        return values
+
+    def snapshot(self):
+        """Estado actual de todas las métricas como diccionario (listo para JSON)"""
+        gauges = self._read_gauges()
+        with self._lock:
+            counters = [(name, labels, value) for (name, labels), value in self.counters.items()]
+            histograms = [(name, labels, histogram.to_dict())
+                          for (name, labels), histogram in self.histograms.items()]
+        result = {"counters": {}, "histograms": {}, "gauges": {}}
+        for name, labels, value in sorted(counters):
+            result["counters"].setdefault(name, []).append({"labels": dict(labels),
+                                                            "value": value})
+        for name, labels, data in sorted(histograms, key=lambda h: (h[0], h[1])):
+            result["histograms"].setdefault(name, []).append({"labels": dict(labels), **data})
+        for name, series in sorted(gauges.items()):
+            result["gauges"][name] = [{"labels": dict(labels), "value": value}
+                                      for labels, value in series.items()]
+        return result
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent, ensure_ascii=False)
+
+    def to_prometheus(self):
+        """Métricas en el formato de texto de Prometheus (versión 0.0.4)"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def header(name, kind):
+            if name in self.help:
+                lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, series in snapshot["counters"].items():
+            header(name, "counter")
+            for item in series:
+                lines.append(f"{name}{_format_labels(item['labels'])} {item['value']}")
+        for name, series in snapshot["gauges"].items():
+            header(name, "gauge")
+            for item in series:
+                lines.append(f"{name}{_format_labels(item['labels'])} {item['value']}")
+        for name, series in snapshot["histograms"].items():
+            header(name, "histogram")
+            for item in series:
+                cumulative = 0
+                for bound, count in item["buckets"].items():
+                    cumulative += count
+                    labels = dict(item["labels"], le=bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels)} {cumulative}")
+                labels = _format_labels(item["labels"])
+                lines.append(f"{name}_sum{labels} {item['sum']}")
+                lines.append(f"{name}_count{labels} {item['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Guarda las métricas: Prometheus si path termina en .prom, si no JSON"""
+        text = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+        return path
+
+    def reset(self):
+        """Descarta contadores e histogramas (los gauges se siguen leyendo)"""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def __str__(self):
+        return f"Metrics({len(self.counters)} contadores, {len(self.histograms)} histogramas)"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
@@ -0,0 +1,464 @@
+"""
+Archivo histórico de pedidos completados, particionado por día.
+
+Cada día (UTC) es un segmento propio donde los pedidos solo se agregan al
+final, en orden de finalización:
+    <directorio>/AAAA-MM-DD.orders
+
+Formato de cada registro (little endian):
+    largo u32 | crc32 u32 | contenido
+    contenido: número u32 | finalizado f64 (epoch) | nivel u8 |
+               largo del cliente u16 | cantidad de ítems u16 | cliente |
+               ítems: largo del código u8 | cantidad u16 | precio f64 | código
+
+Los largos y cantidades limitan lo que entra en un registro (MAX_*):
+check_order los verifica antes de aceptar el pedido.
+
+Como en el WAL, un registro cortado o con checksum inválido marca el final
+del segmento (se descarta al reabrirlo).
+
+Índices: al cerrar un día se escribe AAAA-MM-DD.idx con la posición de
+cada pedido por cliente y por producto, y las unidades y la recaudación
+de cada producto. Las consultas por cliente o producto leen solo esos
+registros (seek) y los más vendidos de un rango se suman desde los
+índices, sin leer ningún pedido. El índice se puede reconstruir desde el
+segmento, así que si falta o no coincide con él se rearma al consultarlo.
+El día en curso se indexa en memoria y las consultas lo leen con el lock
+tomado, copiando lo que necesitan (cada append lo modifica).
+
+iter_orders recorre un rango de días leyendo de a bloques: la memoria no
+depende del tamaño del archivo.
+"""
+import itertools
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import date, datetime, timezone
+
+from persistence.binary import HEADER, U32, U64, FormatError, Reader, pack_texts, pack_array
+from structures.cache import LRUCache
+
+RECORD = struct.Struct("<II")
+ORDER = struct.Struct("<IdBHH")
+ITEM = struct.Struct("<BHd")
+
+SEGMENT_SUFFIX = ".orders"
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"TCAI"
+INDEX_VERSION = 1
+READ_CHUNK = 64 * 1024
+
+# Límites del registro: bytes del cliente (u16), productos distintos por
+# pedido (u16), bytes de un código (u8) y unidades de un producto (u16)
+MAX_CUSTOMER = 0xFFFF
+MAX_ITEMS = 0xFFFF
+MAX_CODE = 0xFF
+MAX_QUANTITY = 0xFFFF
+
+# Niveles de servicio en el orden de store.ORDER_TIERS (el registro guarda la posición)
+TIERS = ("express", "preventa", "normal", "mayorista")
+
+
+class ArchivedOrder:
+    """Pedido completado tal como quedó en el archivo"""
+    __slots__ = ("order_number", "customer", "tier", "completed", "items")
+
+    def __init__(self, order_number, customer, tier, completed, items):
+        self.order_number = order_number
+        self.customer = customer
+        self.tier = tier
+        self.completed = completed  # epoch (segundos)
+        self.items = items          # [(código, cantidad, precio unitario)]
+
+    @property
+    def total(self):
+        return sum(quantity * price for _, quantity, price in self.items)
+
+    def __str__(self):
+        when = datetime.fromtimestamp(self.completed, timezone.utc).strftime("%Y-%m-%d %H:%M")
+        return f"Pedido #{self.order_number} - Cliente: {self.customer} ({when} UTC)"
+
+
+def day_of(timestamp):
+    """Partición (AAAA-MM-DD, UTC) de un instante"""
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+def _as_day(value):
+    """Normaliza un límite de rango: date, datetime, "AAAA-MM-DD" o None"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc).date() if value.tzinfo else value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Fecha inválida: {value!r}")
+
+
+def order_items(order):
+    """Ítems de un Order: [(código, cantidad, precio)], agrupando los repetidos"""
+    quantities, prices = {}, {}
+    for product in order.products:
+        quantities[product.code] = quantities.get(product.code, 0) + 1
+        prices[product.code] = product.price
+    return [(code, quantity, prices[code]) for code, quantity in quantities.items()]
+
+
+def check_order(customer, codes):
+    """
+    ValueError si un pedido de customer con esos códigos (uno por unidad)
+    no entra en un registro del archivo
+    """
+    if len(customer.encode("utf-8")) > MAX_CUSTOMER:
+        raise ValueError(f"Nombre de cliente demasiado largo (máximo {MAX_CUSTOMER} bytes)")
+    quantities = Counter(codes)
+    if len(quantities) > MAX_ITEMS:
+        raise ValueError(f"Demasiados productos distintos en el pedido (máximo {MAX_ITEMS})")
+    for code, quantity in quantities.items():
+        if len(code.encode("utf-8")) > MAX_CODE:
+            raise ValueError(f"Código demasiado largo (máximo {MAX_CODE} bytes): {code[:20]}...")
+        if quantity > MAX_QUANTITY:
+            raise ValueError(f"Demasiadas unidades de {code} (máximo {MAX_QUANTITY})")
+
+
+def encode_order(number, customer, tier, completed, items):
+    """
+    Registro binario de un pedido (con su largo y checksum). ValueError si
+    no entra en el formato (ver check_order)
+    """
+    customer = customer.encode("utf-8")
+    try:
+        parts = [ORDER.pack(number, completed, TIERS.index(tier), len(customer), len(items)),
+                 customer]
+        for code, quantity, price in items:
+            data = code.encode("utf-8")
+            parts.append(ITEM.pack(len(data), quantity, price))
+            parts.append(data)
+    except struct.error as e:
+        raise ValueError(f"El pedido #{number} no entra en el archivo: {e}") from e
+    payload = b"".join(parts)
+    return RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_order(payload):
+    number, completed, tier, customer_length, count = ORDER.unpack_from(payload, 0)
+    pos = ORDER.size
+    customer = str(payload[pos:pos + customer_length], "utf-8")
+    pos += customer_length
+    items = []
+    for _ in range(count):
+        length, quantity, price = ITEM.unpack_from(payload, pos)
+        pos += ITEM.size
+        code = str(payload[pos:pos + length], "utf-8")
+        pos += length
+        items.append((code, quantity, int(price) if price.is_integer() else price))
+    return ArchivedOrder(number, customer, TIERS[tier], completed, items)
+
+
+def scan_segment(path, start=0):
+    """
+    Recorre los registros válidos de un segmento desde el offset start,
+    leyendo de a bloques. Entrega (offset, largo total, pedido) y se
+    detiene en el primer registro incompleto o dañado.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as file:
+        file.seek(start)
+        buffer = b""
+        offset = start  # posición en el archivo de buffer[0]
+        while True:
+            chunk = file.read(READ_CHUNK)
+            buffer += chunk
+            pos = 0
+            while pos + RECORD.size <= len(buffer):
+                length, checksum = RECORD.unpack_from(buffer, pos)
+                end = pos + RECORD.size + length
+                if end > len(buffer):
+                    break
+                payload = buffer[pos + RECORD.size:end]
+                if zlib.crc32(payload) != checksum:
+                    return
+                yield offset + pos, end - pos, decode_order(payload)
+                pos = end
+            if not chunk:
+                return
+            buffer = buffer[pos:]
+            offset += pos
+
+
+class PartitionIndex:
+    """
+    Posiciones de los pedidos de un día por cliente y por producto. El del
+    día en curso guarda una lista por clave; uno leído de disco guarda un
+    solo arreglo de posiciones por tipo y, por clave, su tramo (inicio,
+    fin): armar miles de listas al abrir un día costaría más que consultarlo.
+    """
+
+    def __init__(self):
+        self.size = 0          # bytes del segmento cubiertos por el índice
+        self.orders = 0
+        self.customers = {}    # cliente -> [offsets] o (inicio, fin)
+        self.products = {}     # código -> [offsets] o (inicio, fin)
+        self.units = Counter()
+        self.revenue = Counter()
+        self._columns = {}     # tipo -> arreglo de posiciones (índices leídos)
+
+    def add(self, offset, length, customer, items):
+        self.customers.setdefault(customer, []).append(offset)
+        for code, quantity, price in items:
+            self.products.setdefault(code, []).append(offset)
+            self.units[code] += quantity
+            self.revenue[code] += quantity * price
+        self.orders += 1
+        self.size = offset + length
+
+    def offsets(self, kind, key):
+        """Posiciones de los pedidos de key ("customers" o "products"), en una lista nueva"""
+        found = getattr(self, kind).get(key)
+        if found is None:
+            return []
+        column = self._columns.get(kind)
+        if column is None:
+            return list(found)
+        return column[found[0]:found[1]].tolist()
+
+    @classmethod
+    def build(cls, path):
+        index = cls()
+        for offset, length, order in scan_segment(path):
+            index.add(offset, length, order.customer, order.items)
+        return index
+
+    def encode(self):
+        parts = [U64.pack(self.size), U32.pack(self.orders)]
+        for kind in ("customers", "products"):
+            keys = list(getattr(self, kind))
+            offsets = [self.offsets(kind, key) for key in keys]
+            parts.append(U32.pack(len(keys)))
+            pack_texts(parts, keys)
+            pack_array(parts, "I", map(len, offsets))
+            pack_array(parts, "Q", itertools.chain.from_iterable(offsets))
+        codes = list(self.products)
+        pack_array(parts, "Q", [self.units[code] for code in codes])
+        pack_array(parts, "d", [self.revenue[code] for code in codes])
+        payload = b"".join(parts)
+        return HEADER.pack(INDEX_MAGIC, INDEX_VERSION, 0, len(payload), zlib.crc32(payload)) \
+            + payload
+
+    @classmethod
+    def decode(cls, data):
+        if len(data) < HEADER.size:
+            raise FormatError("Índice demasiado corto")
+        magic, version, _, length, checksum = HEADER.unpack_from(data, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise FormatError("No es un índice del archivo de pedidos")
+        if HEADER.size + length != len(data) or zlib.crc32(data[HEADER.size:]) != checksum:
+            raise FormatError("Índice dañado")
+
+        reader = Reader(memoryview(data), HEADER.size)
+        index = cls()
+        index.size = reader.u64()
+        index.orders = reader.u32()
+        for kind in ("customers", "products"):
+            count = reader.u32()
+            keys = reader.texts(count)
+            ends = list(itertools.accumulate(reader.array("I", count)))
+            index._columns[kind] = reader.array("Q", ends[-1] if ends else 0)
+            setattr(index, kind, dict(zip(keys, zip([0] + ends[:-1], ends))))
+        codes = list(index.products)
+        units = reader.array("Q", len(codes))
+        revenue = reader.array("d", len(codes))
+        index.units = Counter(dict(zip(codes, units)))
+        index.revenue = Counter({code: int(value) if value.is_integer() else value
+                                 for code, value in zip(codes, revenue)})
+        return index
+
+
+class OrderArchive:
+    """
+    Archivo de pedidos completados en directory. append() es seguro para
+    varios hilos (los workers completan pedidos a la vez); cada registro se
+    escribe al sistema operativo en la misma llamada, así las consultas ya
+    lo ven. index_cache: cuántos índices de días cerrados se mantienen en
+    memoria.
+    """
+
+    def __init__(self, directory, index_cache=64):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._indexes = LRUCache(index_cache)
+
+        # Día en curso: (día, archivo abierto para agregar, índice en memoria)
+        self._day = None
+        self._file = None
+        self._index = None
+
+    def _path(self, day, suffix=SEGMENT_SUFFIX):
+        return os.path.join(self.directory, day + suffix)
+
+    # ESCRITURA
+
+    def append(self, order, completed=None):
+        """Agrega un pedido completado (completed: epoch, por defecto ahora)"""
+        self.append_many([order], completed)
+
+    def append_many(self, orders, completed=None):
+        """Agrega varios pedidos con una escritura por día"""
+        completed = time.time() if completed is None else completed
+        records = []
+        for order in orders:
+            items = order_items(order)
+            data = encode_order(order.order_number, order.customer, order.tier, completed, items)
+            records.append((data, order.customer, items))
+        with self._lock:
+            day = day_of(completed)
+            if day != self._day:
+                self._activate(day)
+            self._file.write(b"".join(data for data, _, _ in records))
+            # Se indexan después de escribirlos: una consulta nunca apunta
+            # a un registro que todavía no está en el archivo
+            offset = self._index.size
+            for data, customer, items in records:
+                self._index.add(offset, len(data), customer, items)
+                offset += len(data)
+
+    def _activate(self, day):
+        """Cierra el día en curso y abre (o retoma) el segmento de day"""
+        self._seal()
+        path = self._path(day)
+        index = PartitionIndex.build(path)
+        # Una cola dañada (corte a mitad de escritura) se recorta
+        if os.path.exists(path) and os.path.getsize(path) > index.size:
+            with open(path, "r+b") as file:
+                file.truncate(index.size)
+        # El índice escrito antes ya no va a coincidir: se reescribe al cerrar
+        if os.path.exists(self._path(day, INDEX_SUFFIX)):
+            os.remove(self._path(day, INDEX_SUFFIX))
+        self._indexes.invalidate(day)
+        self._day, self._index = day, index
+        self._file = open(path, "ab", buffering=0)
+
+    def _seal(self):
+        """Escribe el índice del día en curso y cierra su segmento"""
+        if self._day is None:
+            return
+        self._file.close()
+        self._write_index(self._day, self._index)
+        self._indexes.put(self._day, self._index)
+        self._day = self._file = self._index = None
+
+    def _write_index(self, day, index):
+        # Sin fsync: si se pierde, se reconstruye desde el segmento
+        # (temporal propio de cada hilo: dos consultas pueden rearmar el mismo día)
+        path = self._path(day, INDEX_SUFFIX)
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(index.encode())
+        os.replace(temporary, path)
+
+    def close(self):
+        with self._lock:
+            self._seal()
+
+    # CONSULTAS
+
+    def partitions(self, start=None, end=None):
+        """Días con pedidos entre start y end (incluidos), en orden"""
+        start, end = _as_day(start), _as_day(end)
+        days = sorted(name[:-len(SEGMENT_SUFFIX)] for name in os.listdir(self.directory)
+                      if name.endswith(SEGMENT_SUFFIX))
+        return [day for day in days
+                if (start is None or day >= start) and (end is None or day <= end)]
+
+    def _query(self, day, read):
+        """
+        Aplica read al índice del día y retorna su resultado. El del día en
+        curso cambia con cada append: se lee con el lock tomado, así que
+        read no debe retornar nada del índice sin copiarlo.
+        """
+        with self._lock:
+            if day == self._day:
+                return read(self._index)
+        return read(self._indexes.get_or_load(day, lambda: self._load_index(day)))
+
+    def _load_index(self, day):
+        """Lee el índice del día; si falta o no coincide con el segmento, lo rearma"""
+        segment = self._path(day)
+        try:
+            with open(self._path(day, INDEX_SUFFIX), "rb") as file:
+                index = PartitionIndex.decode(file.read())
+            if index.size == os.path.getsize(segment):
+                return index
+        except (OSError, FormatError):
+            pass
+        index = PartitionIndex.build(segment)
+        self._write_index(day, index)
+        return index
+
+    def _read_at(self, day, offsets):
+        """Pedidos en las posiciones dadas de un segmento (un seek por pedido)"""
+        orders = []
+        with open(self._path(day), "rb") as file:
+            for offset in offsets:
+                file.seek(offset)
+                length, _ = RECORD.unpack(file.read(RECORD.size))
+                orders.append(decode_order(file.read(length)))
+        return orders
+
+    def iter_orders(self, start=None, end=None):
+        """Recorre los pedidos del rango en orden de finalización, de a uno"""
+        for day in self.partitions(start, end):
+            for _, _, order in scan_segment(self._path(day)):
+                yield order
+
+    def customer_orders(self, customer, start=None, end=None):
+        """Pedidos de un cliente en el rango, del más viejo al más nuevo"""
+        orders = []
+        for day in self.partitions(start, end):
+            offsets = self._query(day, lambda index: index.offsets("customers", customer))
+            if offsets:
+                orders.extend(self._read_at(day, offsets))
+        return orders
+
+    def product_orders(self, code, start=None, end=None):
+        """Pedidos que incluyen el producto en el rango"""
+        orders = []
+        for day in self.partitions(start, end):
+            offsets = self._query(day, lambda index: index.offsets("products", code))
+            if offsets:
+                orders.extend(self._read_at(day, offsets))
+        return orders
+
+    def customer_purchases(self, customer, start=None, end=None):
+        """Qué compró un cliente: {código: unidades} en el rango"""
+        units = Counter()
+        for order in self.customer_orders(customer, start, end):
+            for code, quantity, _ in order.items:
+                units[code] += quantity
+        return units
+
+    def best_sellers(self, start=None, end=None, limit=10):
+        """
+        Productos más vendidos del rango: [(código, unidades, recaudación)],
+        sumados desde los índices de cada día (sin leer los pedidos).
+        """
+        units, revenue = Counter(), Counter()
+
+        def add(index):
+            units.update(index.units)
+            revenue.update(index.revenue)
+
+        for day in self.partitions(start, end):
+            self._query(day, add)
+        return [(code, count, revenue[code]) for code, count in units.most_common(limit)]
+
+    def __len__(self):
+        return sum(self._query(day, lambda index: index.orders) for day in self.partitions())
+
+    def __str__(self):
+        return f"OrderArchive({self.directory}, {len(self.partitions())} días)"
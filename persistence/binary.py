@@ -0,0 +1,75 @@
+"""
+Piezas comunes de los formatos binarios por columnas (el snapshot del Store
+y los índices del archivo de pedidos), todo en little endian:
+    cabecera: magic (4 bytes) | versión u16 | reservado u16 | largo u64 | crc32 u32
+    columna de texto: largo u64 | textos en UTF-8 separados por "\\0"
+    arreglo: los valores de un array con su typecode, uno tras otro
+"""
+import struct
+import sys
+from array import array
+
+HEADER = struct.Struct("<4sHHQI")
+U32 = struct.Struct("<I")
+U64 = struct.Struct("<Q")
+SEPARATOR = "\0"
+
+
+class FormatError(ValueError):
+    """Contenido binario inválido (formato, versión, largo o checksum)"""
+
+
+def pack_texts(parts, texts):
+    """Agrega a parts una columna de texto"""
+    for text in texts:
+        if SEPARATOR in text:
+            raise FormatError(f"Texto con carácter nulo: {text!r}")
+    data = SEPARATOR.join(texts).encode("utf-8")
+    parts.append(U64.pack(len(data)))
+    parts.append(data)
+
+
+def pack_array(parts, typecode, values):
+    """Agrega a parts los valores como un arreglo binario de typecode"""
+    column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    parts.append(column.tobytes())
+
+
+class Reader:
+    """Lee columnas en secuencia desde un buffer (un mmap o bytes)"""
+
+    def __init__(self, buffer, pos):
+        self.buffer = buffer
+        self.pos = pos
+
+    def _take(self, size):
+        start = self.pos
+        self.pos += size
+        if self.pos > len(self.buffer):
+            raise FormatError("Contenido truncado")
+        return self.buffer[start:self.pos]
+
+    def u32(self):
+        return U32.unpack(self._take(U32.size))[0]
+
+    def u64(self):
+        return U64.unpack(self._take(U64.size))[0]
+
+    def texts(self, count):
+        length = self.u64()
+        data = str(self._take(length), "utf-8")
+        if count == 0:
+            return []
+        return data.split(SEPARATOR)
+
+    def array(self, typecode, count):
+        column = array(typecode)
+        column.frombytes(self._take(column.itemsize * count))
+        if sys.byteorder != "little":
+            column.byteswap()
+        return column
+
+    def raw(self, count):
+        return bytes(self._take(count))
@@ -0,0 +1,111 @@
+"""
+Carga incremental del catálogo de productos.
+En lugar de json.load (que arma todo el documento en memoria antes de
+devolverlo), estas funciones leen el archivo por bloques y entregan los
+productos de a uno con un generador.
+"""
+import csv
+import json
+import re
+
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def iter_products_json(path, chunk_size=1 << 16):
+    """
+    Recorre el arreglo "products" de un archivo JSON elemento por elemento.
+    Solo mantiene en memoria el bloque que se está decodificando.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as file:
+        # Avanzar hasta el "[" que abre el arreglo de productos
+        buffer = ""
+        while True:
+            key = buffer.find('"products"')
+            bracket = buffer.find("[", key) if key >= 0 else -1
+            if bracket >= 0:
+                buffer = buffer[bracket + 1:]
+                break
+            chunk = file.read(chunk_size)
+            if not chunk:
+                raise ValueError("No se encontró el arreglo 'products'")
+            buffer += chunk
+
+        pos = 0
+        while True:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if pos >= len(buffer):
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    raise ValueError("Fin de archivo inesperado dentro de 'products'")
+                buffer, pos = chunk, 0
+                continue
+
+            if buffer[pos] == "]":
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # El objeto quedó cortado al final del bloque: leer más
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+
+            yield item
+            pos = end
+
+
+def iter_products_jsonl(path):
+    """Recorre un archivo JSON Lines (un producto por línea)"""
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_products(path, progress=None, every=10000):
+    """
+    Elige el formato según la extensión (.jsonl/.ndjson o .json) y entrega
+    los productos de a uno. Si se indica progress, se llama con la cantidad
+    de productos leídos cada 'every' elementos.
+    """
+    if path.endswith((".jsonl", ".ndjson")):
+        items = iter_products_jsonl(path)
+    else:
+        items = iter_products_json(path)
+
+    count = 0
+    for item in items:
+        yield item
+        count += 1
+        if progress is not None and count % every == 0:
+            progress(count)
+
+
+def iter_order_records(path):
+    """
+    Recorre pedidos (cliente, [códigos], nivel) desde un archivo para
+    importarlos en bloque con Store.create_orders_bulk.
+    - .jsonl/.ndjson: {"customer": "...", "codes": ["BAT001", ...]} por línea,
+      con un "tier" opcional ("express", "preventa", ...)
+    - .csv: cliente en la primera columna y un código por columna siguiente
+      (se saltea una cabecera que empiece con "customer" o "cliente")
+    """
+    if path.endswith((".jsonl", ".ndjson")):
+        for item in iter_products_jsonl(path):
+            yield (item["customer"], [str(code).strip().upper() for code in item["codes"]],
+                   item.get("tier"))
+        return
+
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        for i, row in enumerate(csv.reader(file)):
+            if not row:
+                continue
+            if i == 0 and row[0].strip().lower() in ("customer", "cliente"):
+                continue
+            codes = [code.strip().upper() for code in row[1:] if code.strip()]
+            yield row[0].strip(), codes, None
@@ -0,0 +1,185 @@
+"""
+Snapshot binario del estado del Store (productos, categorías y pedidos
+pendientes) para arrancar sin volver a parsear el catálogo JSON.
+
+El contenido se guarda por columnas: todos los códigos juntos, todos los
+nombres juntos, los precios y stocks como arreglos binarios, etc. Así la
+lectura decodifica cada columna de una sola vez en lugar de campo por campo.
+
+Formato (little endian):
+    cabecera: magic "TCSN" | versión u16 | reservado u16 | largo u64 | crc32 u32
+    contenido:
+        order_counter u32 | last_lsn u64
+        categorías: cantidad u32 | nombres | padres ("" = raíz)
+        productos:  cantidad u32 | códigos | nombres | categorías |
+                    precios f64[] | tipo de precio u8[] | stocks i64[]
+        pedidos:    cantidad u32 | números u32[] | clientes |
+                    cantidad de productos u32[] | códigos |
+                    niveles | prioridades i32[]
+
+Las columnas de texto y los arreglos son los de persistence/binary.py.
+last_lsn es el último registro del write-ahead log incluido en el
+snapshot: al reproducir el log se saltean los anteriores.
+Solo se lee la versión actual: un snapshot de otra versión se rechaza
+(se vuelve a generar desde el catálogo y el log).
+"""
+import mmap
+import os
+import zlib
+
+from persistence.binary import HEADER, U32, U64, FormatError, Reader, pack_texts, pack_array
+
+MAGIC = b"TCSN"
+VERSION = 3
+
+PRICE_INT = 0
+PRICE_FLOAT = 1
+
+
+class SnapshotError(FormatError):
+    """El archivo no es un snapshot válido (formato, versión o checksum)"""
+
+
+def encode(order_counter, categories, products, orders, last_lsn=0):
+    """
+    Arma el contenido del snapshot.
+    categories: pares (nombre, padre) en preorden
+    products: objetos con code, name, price, stock y category
+    orders: objetos con order_number, customer, products, tier y priority
+    """
+    parts = [U32.pack(order_counter), U64.pack(last_lsn)]
+
+    categories = list(categories)
+    parts.append(U32.pack(len(categories)))
+    pack_texts(parts, [name for name, _ in categories])
+    pack_texts(parts, [parent or "" for _, parent in categories])
+
+    products = list(products)
+    parts.append(U32.pack(len(products)))
+    pack_texts(parts, [p.code for p in products])
+    pack_texts(parts, [p.name for p in products])
+    pack_texts(parts, [p.category for p in products])
+    pack_array(parts, "d", [p.price for p in products])
+    parts.append(bytes(PRICE_INT if isinstance(p.price, int) else PRICE_FLOAT
+                       for p in products))
+    pack_array(parts, "q", [p.stock for p in products])
+
+    orders = list(orders)
+    parts.append(U32.pack(len(orders)))
+    pack_array(parts, "I", [o.order_number for o in orders])
+    pack_texts(parts, [o.customer for o in orders])
+    pack_array(parts, "I", [len(o.products) for o in orders])
+    pack_texts(parts, [p.code for o in orders for p in o.products])
+    pack_texts(parts, [o.tier for o in orders])
+    pack_array(parts, "i", [o.priority for o in orders])
+
+    return b"".join(parts)
+
+
+def write_snapshot(path, order_counter, categories, products, orders, last_lsn=0):
+    """Arma y escribe el snapshot (ver write_encoded)"""
+    write_encoded(path, encode(order_counter, categories, products, orders, last_lsn))
+
+
+def write_encoded(path, payload):
+    """
+    Escribe un contenido ya armado con encode() de forma atómica: primero a
+    un archivo temporal en el mismo directorio (con fsync) y después lo
+    renombra sobre el destino. Un corte a mitad de escritura deja intacto
+    el snapshot anterior.
+    """
+    header = HEADER.pack(MAGIC, VERSION, 0, len(payload), zlib.crc32(payload))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(header)
+        file.write(payload)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+    # Sincronizar el directorio para que el rename sea durable
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def read_snapshot(path):
+    """
+    Lee un snapshot mapeándolo en memoria (mmap) y verifica cabecera,
+    versión y checksum. Retorna un diccionario con order_counter, last_lsn,
+    categories [(nombre, padre)], products [(código, nombre, precio,
+    stock, categoría)] y orders [(número, cliente, [códigos], nivel,
+    prioridad)].
+    """
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if len(buffer) < HEADER.size:
+                raise SnapshotError("Archivo demasiado corto")
+            magic, version, _, length, checksum = HEADER.unpack_from(buffer, 0)
+            if magic != MAGIC:
+                raise SnapshotError("No es un snapshot de la tienda")
+            if version != VERSION:
+                raise SnapshotError(f"Versión de snapshot no soportada: {version}")
+            if HEADER.size + length != len(buffer):
+                raise SnapshotError("Largo del contenido inválido")
+
+            view = memoryview(buffer)
+            try:
+                if zlib.crc32(view[HEADER.size:]) != checksum:
+                    raise SnapshotError("Checksum inválido: el snapshot está dañado")
+                return _decode(Reader(view, HEADER.size))
+            finally:
+                view.release()
+
+
+def _decode(reader):
+    order_counter = reader.u32()
+    last_lsn = reader.u64()
+
+    count = reader.u32()
+    names = reader.texts(count)
+    parents = reader.texts(count)
+    categories = [(name, parent or None) for name, parent in zip(names, parents)]
+
+    count = reader.u32()
+    codes = reader.texts(count)
+    names = reader.texts(count)
+    product_categories = reader.texts(count)
+    prices = reader.array("d", count)
+    kinds = reader.raw(count)
+    stocks = reader.array("q", count)
+    prices = [int(price) if kind == PRICE_INT else price
+              for price, kind in zip(prices, kinds)]
+    products = list(zip(codes, names, prices, stocks, product_categories))
+
+    count = reader.u32()
+    numbers = reader.array("I", count)
+    customers = reader.texts(count)
+    lengths = reader.array("I", count)
+    order_codes = reader.texts(sum(lengths))
+    tiers = reader.texts(count)
+    priorities = reader.array("i", count)
+    orders = []
+    start = 0
+    for number, customer, length, tier, priority in zip(numbers, customers, lengths,
+                                                        tiers, priorities):
+        orders.append((number, customer, order_codes[start:start + length],
+                       tier, priority))
+        start += length
+
+    return {
+        "order_counter": order_counter,
+        "last_lsn": last_lsn,
+        "categories": categories,
+        "products": products,
+        "orders": orders,
+    }
@@ -0,0 +1,233 @@
+"""
+Write-ahead log (WAL) para las modificaciones del Store.
+
+Cada cambio (alta, actualización, baja, pedido, ...) se agrega al final
+del log antes de aplicarse en memoria. Al arrancar, el Store reproduce el
+log sobre el último snapshot y recupera todo lo que pasó desde entonces.
+
+Formato de cada registro (little endian):
+    largo u32 | crc32 u32 | lsn u64 | contenido JSON (UTF-8)
+
+El lsn (log sequence number) crece de a uno. Un registro cortado o con
+checksum inválido marca el final del log: es lo que queda si el proceso
+muere a mitad de una escritura, y se descarta al reabrir.
+
+Cada registro se escribe al sistema operativo en el mismo append: si el
+proceso muere, el registro ya está en el archivo. Lo que cambia con la
+política es cuándo se hace fsync (lo que sobrevive a un corte de luz):
+    "always": fsync después de cada registro
+    "batch":  group commit; quien necesita el registro en disco llama a
+              wait_synced(lsn), y un solo fsync cubre todos los registros
+              escritos hasta ese momento (los que esperan mientras tanto
+              se suman a la ronda siguiente). Además hay fsync cada
+              group_size registros o cada group_interval segundos.
+    "none":   sin fsync (solo al rotar y al cerrar)
+"""
+import json
+import os
+import struct
+import threading
+import zlib
+
+RECORD = struct.Struct("<IIQ")
+FSYNC_POLICIES = ("always", "batch", "none")
+
+
+def read_records(path):
+    """
+    Recorre los registros válidos de un archivo de log.
+    Entrega tuplas (offset_final, lsn, registro) y se detiene en el primer
+    registro incompleto o dañado.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as file:
+        data = file.read()
+
+    pos = 0
+    while pos + RECORD.size <= len(data):
+        length, checksum, lsn = RECORD.unpack_from(data, pos)
+        start = pos + RECORD.size
+        end = start + length
+        if end > len(data):
+            return
+        payload = data[start:end]
+        if zlib.crc32(payload) != checksum:
+            return
+        try:
+            record = json.loads(payload)
+        except ValueError:
+            return
+        yield end, lsn, record
+        pos = end
+
+
+class WriteAheadLog:
+    def __init__(self, path, fsync="batch", group_size=64, group_interval=0.05,
+                 start_lsn=0):
+        """
+        start_lsn: último lsn ya incluido en un snapshot. Los registros
+        nuevos siempre se numeran por encima, aunque el log esté vacío.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Política de fsync desconocida: {fsync}")
+        self.path = path
+        self.old_path = path + ".old"
+        self.fsync = fsync
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.last_lsn = start_lsn
+
+        self._lock = threading.Lock()
+        # Registros escritos desde el último fsync, último lsn sincronizado
+        # y si hay un fsync en curso (se hace sin el lock: mientras tanto se
+        # sigue escribiendo, y lo escrito entra en la ronda siguiente)
+        self._pending = 0
+        self._syncing = False
+        self._synced = threading.Condition(self._lock)
+
+        self._recover()
+        self._synced_lsn = self.last_lsn
+        self._file = open(self.path, "ab")
+
+        # Hilo que completa el group commit si nadie espera los registros
+        self._closed = threading.Event()
+        self._flusher = None
+        if fsync == "batch":
+            self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._flusher.start()
+
+    def _recover(self):
+        """Busca el último lsn y recorta una cola dañada del log actual"""
+        for _, lsn, _ in read_records(self.old_path):
+            self.last_lsn = max(self.last_lsn, lsn)
+
+        valid_end = 0
+        for end, lsn, _ in read_records(self.path):
+            valid_end = end
+            self.last_lsn = max(self.last_lsn, lsn)
+
+        if os.path.exists(self.path) and os.path.getsize(self.path) > valid_end:
+            with open(self.path, "r+b") as file:
+                file.truncate(valid_end)
+
+    def replay(self, after_lsn=0):
+        """
+        Entrega los registros posteriores a after_lsn en orden: primero el
+        segmento viejo (si una compactación quedó a medias) y después el actual.
+        """
+        for path in (self.old_path, self.path):
+            for _, lsn, record in read_records(path):
+                if lsn > after_lsn:
+                    yield lsn, record
+
+    def append(self, op, **fields):
+        """Agrega un registro al log. Retorna su lsn."""
+        record = dict(fields, op=op)
+        payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self.last_lsn += 1
+            lsn = self.last_lsn
+            self._file.write(RECORD.pack(len(payload), zlib.crc32(payload), lsn) + payload)
+            self._file.flush()
+            if self.fsync == "always":
+                os.fsync(self._file.fileno())
+                self._synced_lsn = lsn
+            elif self.fsync == "batch":
+                self._pending += 1
+                if self._pending >= self.group_size and not self._syncing:
+                    self._sync_round()
+            return lsn
+
+    def _sync_round(self):
+        """
+        Se llama con el lock tomado. Si no hay un fsync en curso, hace uno
+        que cubre todo lo escrito hasta ahora (soltando el lock mientras
+        tanto); si hay uno, espera a que termine.
+        """
+        if self._syncing:
+            self._synced.wait()
+            return
+        self._syncing = True
+        target = self.last_lsn
+        fd = self._file.fileno()
+        self._pending = 0
+        synced = False
+        self._lock.release()
+        try:
+            os.fsync(fd)
+            synced = True
+        finally:
+            self._lock.acquire()
+            self._syncing = False
+            if synced:
+                self._synced_lsn = max(self._synced_lsn, target)
+            self._synced.notify_all()
+
+    def wait_synced(self, lsn):
+        """
+        Espera a que el registro lsn esté en disco según la política: con
+        "batch" se suma al group commit; con "always" ya lo está y con
+        "none" no se espera nunca.
+        """
+        if self.fsync != "batch":
+            return
+        with self._lock:
+            while self._synced_lsn < lsn:
+                self._sync_round()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.group_interval):
+            with self._lock:
+                if self._synced_lsn < self.last_lsn and not self._syncing:
+                    self._sync_round()
+
+    def _sync_all_locked(self):
+        """Con el lock tomado: espera el fsync en curso y sincroniza todo lo escrito"""
+        self._synced.wait_for(lambda: not self._syncing)
+        if self.fsync != "none" and self._synced_lsn < self.last_lsn:
+            os.fsync(self._file.fileno())
+            self._synced_lsn = self.last_lsn
+            self._pending = 0
+
+    def sync(self):
+        """Sincroniza en disco todo lo escrito"""
+        with self._lock:
+            self._synced.wait_for(lambda: not self._syncing)
+            os.fsync(self._file.fileno())
+            self._synced_lsn = self.last_lsn
+            self._pending = 0
+
+    def size(self):
+        """Bytes del segmento actual"""
+        with self._lock:
+            return self._file.tell()
+
+    def rotate(self):
+        """
+        Cierra el segmento actual, lo renombra a .old y empieza uno nuevo.
+        Lo usa la compactación: el .old se borra cuando el snapshot que lo
+        incluye ya está escrito.
+        """
+        with self._lock:
+            self._sync_all_locked()
+            self._file.close()
+            os.replace(self.path, self.old_path)
+            self._file = open(self.path, "ab")
+            return self.last_lsn
+
+    def discard_old(self):
+        """Borra el segmento viejo (ya incluido en un snapshot)"""
+        if os.path.exists(self.old_path):
+            os.remove(self.old_path)
+
+    def close(self):
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self._sync_all_locked()
+            self._file.close()
+
+    def __str__(self):
+        return f"WriteAheadLog({self.path}, lsn={self.last_lsn}, fsync={self.fsync})"
@@ -0,0 +1,317 @@
+"""
+Servidor HTTP/JSON asíncrono (asyncio, solo biblioteca estándar) sobre el Store.
+
+Rutas:
+    GET  /products/{código}         producto por código
+    GET  /products?limit=50&sort=code catálogo paginado; sort admite code,
+                                    name, price o stock, desc=1 invierte el
+                                    orden y after=<next> pide la página
+                                    siguiente (también offset=N)
+    POST /orders                    {"customer": "...", "codes": ["BAT001", ...]}
+                                    y "tier" opcional (express, preventa,
+                                    normal o mayorista)
+    POST /orders/process            procesa el siguiente pedido de la cola (el
+                                    más urgente); ?tier=express solo toma
+                                    pedidos de ese nivel o más urgentes
+    GET  /metrics                   métricas en formato Prometheus (solo con
+                                    --metrics; ?format=json las da en JSON)
+
+Las conexiones son keep-alive (HTTP/1.1) y admiten pipelining: las
+solicitudes se leen y responden en orden sobre la misma conexión. Si la
+cola de pedidos está llena, POST /orders responde 503 con Retry-After
+(backpressure) en lugar de acumular pedidos sin límite. Los cuerpos se
+leen con Content-Length: Transfer-Encoding (chunked) responde 501, y un
+cuerpo rechazado cierra la conexión.
+
+Uso:
+    python server.py [puerto] [--metrics]
+"""
+import asyncio
+import json
+import sys
+from urllib.parse import urlsplit, parse_qs
+
+from store import Store, OutOfStockError, DEFAULT_TIER, ORDER_TIERS
+from metrics import Metrics
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request",
+           404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+           413: "Payload Too Large", 500: "Internal Server Error", 501: "Not Implemented",
+           503: "Service Unavailable"}
+
+
+class HttpError(Exception):
+    # close: después de responder se cierra la conexión (el cuerpo quedó
+    # sin leer y no se sabe dónde empieza la solicitud siguiente)
+    def __init__(self, status, message, close=False):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.close = close
+
+
+def product_to_dict(product):
+    return {"code": product.code, "name": product.name, "price": product.price,
+            "stock": product.stock, "category": product.category}
+
+
+def order_to_dict(order):
+    return {"order_number": order.order_number, "customer": order.customer,
+            "status": order.status, "codes": [p.code for p in order.products],
+            "tier": order.tier, "priority": order.priority}
+
+
+class StoreServer:
+    def __init__(self, store, host="127.0.0.1", port=8080, keepalive_timeout=15.0):
+        self.store = store
+        self.host = host
+        self.port = port
+        self.keepalive_timeout = keepalive_timeout
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                 limit=MAX_HEADER_BYTES)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    # CONEXIONES
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"),
+                                                  self.keepalive_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 413, {"error": "Cabeceras demasiado grandes"}, False)
+                    break
+
+                keep_alive = True
+                try:
+                    method, target, version, headers = self._parse_head(head)
+                    keep_alive = self._wants_keep_alive(version, headers)
+                    body = await self._read_body(reader, headers)
+                    status, payload = self._dispatch(method, target, body)
+                except HttpError as e:
+                    status, payload = e.status, {"error": e.message}
+                    keep_alive = keep_alive and not e.close
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception:
+                    # Error inesperado: no se sabe en qué estado quedó la
+                    # solicitud, así que se responde y se cierra la conexión
+                    status, payload, keep_alive = 500, {"error": "Error interno"}, False
+
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _parse_head(self, head):
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise HttpError(400, "Línea de solicitud inválida")
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, version, headers
+
+    def _wants_keep_alive(self, version, headers):
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    async def _read_body(self, reader, headers):
+        # Solo se aceptan cuerpos con Content-Length (sin chunked)
+        if "transfer-encoding" in headers:
+            raise HttpError(501, "Transfer-Encoding no soportado: usar Content-Length",
+                            close=True)
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HttpError(400, "Content-Length inválido", close=True)
+        if length < 0:
+            raise HttpError(400, "Content-Length inválido", close=True)
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Cuerpo demasiado grande", close=True)
+        if length == 0:
+            return None
+        data = await reader.readexactly(length)
+        try:
+            return json.loads(data)
+        except ValueError:
+            raise HttpError(400, "JSON inválido")
+
+    async def _send(self, writer, status, payload, keep_alive):
+        # Los textos (métricas de Prometheus) van tal cual; el resto como JSON
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json"
+        headers = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                   f"Content-Length: {len(body)}",
+                   f"Content-Type: {content_type}; charset=utf-8",
+                   f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        # drain() frena al servidor si el cliente no lee las respuestas
+        await writer.drain()
+
+    # RUTAS
+
+    def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts == ["products"]:
+            self._require(method, "GET")
+            return self._list_products(parse_qs(url.query))
+        if len(parts) == 2 and parts[0] == "products":
+            self._require(method, "GET")
+            return self._get_product(parts[1])
+        if parts == ["orders"]:
+            self._require(method, "POST")
+            return self._create_order(body)
+        if parts == ["orders", "process"]:
+            self._require(method, "POST")
+            return self._process_order(parse_qs(url.query))
+        if parts == ["metrics"]:
+            self._require(method, "GET")
+            return self._metrics(parse_qs(url.query))
+        raise HttpError(404, "Ruta inexistente")
+
+    def _require(self, method, expected):
+        if method != expected:
+            raise HttpError(405, f"Método no permitido (se espera {expected})")
+
+    def _int_param(self, query, name, default):
+        try:
+            return int(query.get(name, [default])[0])
+        except ValueError:
+            raise HttpError(400, f"Parámetro inválido: {name}")
+
+    def _get_product(self, code):
+        product = self.store.find_product(code.upper())
+        if product is None:
+            raise HttpError(404, f"Producto con código '{code}' no encontrado")
+        return 200, product_to_dict(product)
+
+    def _list_products(self, query):
+        offset = max(0, self._int_param(query, "offset", 0))
+        limit = min(500, max(1, self._int_param(query, "limit", 50)))
+        sort = query.get("sort", ["code"])[0]
+        if sort not in self.store.sort_indexes:
+            raise HttpError(400, f"Orden desconocido: {sort}")
+        cursor = None
+        if "after" in query:
+            # El cursor es el "next" de la respuesta anterior: [clave, código]
+            try:
+                key, code = json.loads(query["after"][0])
+                cursor = (key, code)
+            except (ValueError, TypeError):
+                raise HttpError(400, "Parámetro inválido: after")
+        try:
+            page = self.store.catalog_page(sort, limit, cursor, offset=offset,
+                                           descending=query.get("desc") == ["1"])
+        except TypeError:
+            # Cursor de otro orden (por ejemplo un nombre al ordenar por precio)
+            raise HttpError(400, "Parámetro inválido: after")
+        return 200, {"total": page["total"], "sort": sort,
+                     "next": json.dumps(page["next"]) if page["next"] else None,
+                     "products": [product_to_dict(p) for p in page["products"]]}
+
+    def _create_order(self, body):
+        if not isinstance(body, dict) or not isinstance(body.get("customer"), str) \
+                or not isinstance(body.get("codes"), list) \
+                or not all(isinstance(code, str) for code in body["codes"]):
+            raise HttpError(400, "Se espera {\"customer\": str, \"codes\": [str]}")
+        tier = body.get("tier")
+        if tier is None or tier == "":
+            tier = DEFAULT_TIER
+        if not isinstance(tier, str) or tier not in ORDER_TIERS:
+            raise HttpError(400, f"Nivel de pedido inválido: {tier}")
+
+        products, not_found = [], []
+        for code in body["codes"]:
+            product = self.store.find_product(code.upper())
+            if product is None:
+                not_found.append(code)
+            else:
+                products.append(product)
+        if not products:
+            raise HttpError(400, "Ningún producto válido")
+
+        try:
+            order = self.store.submit_order(body["customer"], products, block=False,
+                                            tier=tier)
+        except OutOfStockError as e:
+            raise HttpError(409, f"Sin stock suficiente de {e.code}")
+        except ValueError as e:
+            # El pedido no entra en el archivo de pedidos
+            raise HttpError(400, str(e))
+        if order is None:
+            raise HttpError(503, "Cola de pedidos llena, reintente más tarde")
+
+        result = order_to_dict(order)
+        result["not_found"] = not_found
+        return 201, result
+
+    def _process_order(self, query):
+        tier = query.get("tier", [None])[0]
+        if tier is not None and tier not in ORDER_TIERS:
+            raise HttpError(400, f"Nivel de pedido inválido: {tier}")
+        order = self.store.fulfill_next_order(tier=tier)
+        if order is None:
+            return 204, None
+        return 200, order_to_dict(order)
+
+    def _metrics(self, query):
+        if self.store.metrics is None:
+            raise HttpError(404, "Métricas desactivadas (iniciar con --metrics)")
+        if query.get("format") == ["json"]:
+            return 200, self.store.metrics.snapshot()
+        return 200, self.store.metrics.to_prometheus()
+
+
+def main(port=8080, metrics=False):
+    store = Store(order_queue_size=10000, metrics=Metrics() if metrics else None)
+    server = StoreServer(store, port=port)
+    print(f"✓ Servidor escuchando en http://{server.host}:{port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n✓ Servidor detenido")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--metrics"]
+    main(int(args[0]) if args else 8080, metrics="--metrics" in sys.argv)
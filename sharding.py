@@ -0,0 +1,341 @@
+"""
+Catálogo repartido en varios procesos (shards) para usar más de un núcleo
+en las consultas de productos.
+
+Cada shard es un proceso con su propia HashTable y su índice por categoría,
+dueño de los productos cuyo código cae en él (crc32 del código módulo la
+cantidad de shards). ShardedCatalog hace de router:
+    - las búsquedas por código van solo al shard dueño; find_many agrupa
+      los códigos por shard y consulta todos los shards a la vez
+    - los listados y las consultas por categoría se piden a todos los
+      shards (scatter) y los resultados ordenados se combinan (gather)
+
+Los pedidos y las respuestas viajan por pipes como tuplas de valores
+simples codificadas con marshal (mucho más liviano que pickle): un
+producto viaja como (código, nombre, precio, stock, categoría) y el router
+arma el Product al final. marshal solo es seguro entre procesos propios,
+que es el caso.
+
+Los pedidos, el stock reservado y el log siguen en el Store (un proceso);
+el catálogo repartido es para el camino de lectura.
+"""
+import heapq
+import marshal
+import multiprocessing
+import os
+import threading
+import zlib
+
+from structures.hashtable import HashTable
+from structures.index import CategoryIndex
+from structures.tree import Tree
+
+
+class ShardError(RuntimeError):
+    """Un shard respondió con un error (o se cerró)"""
+
+
+# PROCESO DE CADA SHARD
+
+def _shard_main(conn, storage):
+    """Atiende pedidos (operación, argumentos) hasta recibir "stop" """
+    table = HashTable(storage=storage)
+    categories = CategoryIndex()
+
+    def put(row):
+        # Se desarma antes de tocar nada: una fila mal formada no queda a medias
+        code, _, _, _, category = row
+        old = table.search(code)
+        if old is not None:
+            categories.remove(old[4], old[0])
+        table.insert(code, row)
+        categories.add(category, code, row)
+
+    def update(code, price, stock):
+        row = table.search(code)
+        if row is None:
+            return None
+        row = (code, row[1], row[2] if price is None else price,
+               row[3] if stock is None else stock, row[4])
+        put(row)
+        return row
+
+    def delete(code):
+        row = table.search(code)
+        if row is None:
+            return False
+        table.delete(code)
+        categories.remove(row[4], code)
+        return True
+
+    operations = {
+        "load": lambda rows: [put(row) for row in rows] and None,
+        "get": lambda code: table.search(code),
+        "get_many": lambda codes: [table.search(code) for code in codes],
+        "put": put,
+        "update": update,
+        "delete": delete,
+        "list": lambda: sorted(table.list_all()),
+        "category": lambda names: [categories.get(name) for name in names],
+        "count": lambda: len(table),
+        "stats": lambda: table.stats(),
+    }
+
+    while True:
+        try:
+            op, args = marshal.loads(conn.recv_bytes())
+        except (EOFError, OSError):
+            return
+        if op == "stop":
+            conn.send_bytes(marshal.dumps(("ok", None)))
+            return
+        try:
+            response = ("ok", operations[op](*args))
+        except Exception as e:
+            response = ("error", f"{type(e).__name__}: {e}")
+        conn.send_bytes(marshal.dumps(response))
+
+
+# ROUTER
+
+class ShardedCatalog:
+    """
+    Catálogo repartido en shards procesos. Se puede usar desde varios
+    hilos: cada shard atiende un pedido a la vez (un lock por shard) y los
+    pedidos a varios shards se envían todos antes de esperar respuestas,
+    así los shards trabajan en paralelo.
+    """
+
+    def __init__(self, shards=None, storage="chaining", start_method="spawn"):
+        # "spawn" arranca cada shard limpio (sin copiar hilos ni locks del
+        # proceso que lo crea, como haría "fork")
+        self.shards = shards or os.cpu_count() or 1
+        context = multiprocessing.get_context(start_method)
+        self._connections = []
+        self._processes = []
+        self._locks = []
+        for i in range(self.shards):
+            parent, child = context.Pipe()
+            process = context.Process(target=_shard_main, args=(child, storage),
+                                      name=f"catalog-shard-{i + 1}", daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+            self._locks.append(threading.Lock())
+
+        # Las categorías son pocas: el árbol queda en el router, que
+        # resuelve los subárboles antes de consultar a los shards
+        self.category_tree = Tree()
+        self.closed = False
+
+    @classmethod
+    def from_store(cls, store, shards=None, **kwargs):
+        """Reparte los productos y las categorías de un Store"""
+        catalog = cls(shards, **kwargs)
+        for name, parent in store.category_tree.categories():
+            catalog.category_tree.add(name, parent)
+        catalog.load((p.code, p.name, p.price, p.stock, p.category)
+                     for p in store.products.list_all())
+        return catalog
+
+    @classmethod
+    def from_catalog(cls, path, shards=None, categories=(), **kwargs):
+        """Reparte un catálogo JSON/JSONL leído con persistence.loader"""
+        from persistence.loader import iter_products
+        catalog = cls(shards, **kwargs)
+        for name, parent in categories:
+            catalog.category_tree.add(name, parent)
+        catalog.load((item["code"], item["name"], item["price"], item["stock"],
+                      item["category"]) for item in iter_products(path))
+        return catalog
+
+    def shard_of(self, code):
+        """Shard dueño de un código (crc32 está en C: el router no se demora)"""
+        return zlib.crc32(code.encode("utf-8")) % self.shards
+
+    # COMUNICACIÓN
+
+    def _receive(self, shard):
+        try:
+            status, result = marshal.loads(self._connections[shard].recv_bytes())
+        except (EOFError, OSError) as e:
+            raise ShardError(f"El shard {shard + 1} se cerró") from e
+        if status == "error":
+            raise ShardError(f"Shard {shard + 1}: {result}")
+        return result
+
+    def _call(self, shard, op, *args):
+        request = marshal.dumps((op, args))
+        with self._locks[shard]:
+            self._connections[shard].send_bytes(request)
+            return self._receive(shard)
+
+    def _scatter(self, requests):
+        """
+        requests: {shard: (operación, argumentos)}. Envía todos los pedidos
+        y después junta las respuestas. Los locks se toman en orden de
+        shard, así dos hilos que consultan varios shards no se trancan.
+        Retorna {shard: resultado}.
+        Si un shard falla, igual se leen las respuestas de todos los que
+        recibieron su pedido (si no, quedarían en los pipes y las llamadas
+        siguientes leerían respuestas ajenas) y después se lanza el primer
+        error.
+        """
+        shards = sorted(requests)
+        # Se codifica todo antes de enviar: un pedido que no se puede
+        # codificar no deja a los demás enviados y sin leer
+        payloads = {shard: marshal.dumps(requests[shard]) for shard in shards}
+        for shard in shards:
+            self._locks[shard].acquire()
+        try:
+            sent = []
+            error = None
+            for shard in shards:
+                try:
+                    self._connections[shard].send_bytes(payloads[shard])
+                    sent.append(shard)
+                except OSError as e:
+                    if error is None:
+                        error = ShardError(f"El shard {shard + 1} se cerró")
+                        error.__cause__ = e
+            results = {}
+            for shard in sent:
+                try:
+                    results[shard] = self._receive(shard)
+                except ShardError as e:
+                    error = error or e
+            if error is not None:
+                raise error
+            return results
+        finally:
+            for shard in shards:
+                self._locks[shard].release()
+
+    def _broadcast(self, op, *args):
+        """Mismo pedido a todos los shards; retorna los resultados en orden de shard"""
+        results = self._scatter({shard: (op, args) for shard in range(self.shards)})
+        return [results[shard] for shard in range(self.shards)]
+
+    @staticmethod
+    def _product(row):
+        from store import Product
+        return Product(*row) if row is not None else None
+
+    # CARGA Y CAMBIOS
+
+    def load(self, rows, batch_size=10000):
+        """Reparte filas (código, nombre, precio, stock, categoría) entre los shards"""
+        batches = [[] for _ in range(self.shards)]
+        pending = 0
+        for row in rows:
+            batches[self.shard_of(row[0])].append(tuple(row))
+            pending += 1
+            if pending >= batch_size * self.shards:
+                self._load_batches(batches)
+                batches = [[] for _ in range(self.shards)]
+                pending = 0
+        self._load_batches(batches)
+
+    def _load_batches(self, batches):
+        self._scatter({shard: ("load", (rows,)) for shard, rows in enumerate(batches) if rows})
+
+    def add_product(self, code, name, price, stock, category):
+        row = (code, name, price, stock, category)
+        self._call(self.shard_of(code), "put", row)
+        return self._product(row)
+
+    def update_product(self, code, new_price=None, new_stock=None):
+        """Actualiza precio y/o stock. Retorna el producto o None si no existe."""
+        return self._product(self._call(self.shard_of(code), "update", code, new_price, new_stock))
+
+    def delete_product(self, code):
+        return self._call(self.shard_of(code), "delete", code)
+
+    # CONSULTAS
+
+    def find_product(self, code):
+        """Busca un producto por código (solo en su shard)"""
+        return self._product(self._call(self.shard_of(code), "get", code))
+
+    def find_many(self, codes):
+        """
+        Busca muchos códigos de una vez: cada shard recibe solo los suyos y
+        todos buscan en paralelo. Retorna los productos (o None) en el orden
+        de codes.
+        """
+        groups = {}
+        for i, code in enumerate(codes):
+            positions, shard_codes = groups.setdefault(self.shard_of(code), ([], []))
+            positions.append(i)
+            shard_codes.append(code)
+        results = self._scatter({shard: ("get_many", (shard_codes,))
+                                 for shard, (_, shard_codes) in groups.items()})
+        products = [None] * len(codes)
+        for shard, (positions, _) in groups.items():
+            for position, row in zip(positions, results[shard]):
+                if row is not None:
+                    products[position] = self._product(row)
+        return products
+
+    def list_products(self):
+        """Todos los productos ordenados por código (combinando los shards)"""
+        return [self._product(row) for row in heapq.merge(*self._broadcast("list"))]
+
+    def products_by_category(self, category):
+        """Productos de una categoría ordenados por código"""
+        per_shard = self._broadcast("category", [category])
+        return [self._product(row) for row in heapq.merge(*(rows[0] for rows in per_shard))]
+
+    def products_in_category_tree(self, category):
+        """
+        Productos de una categoría y sus subcategorías, en el mismo orden
+        que Store.products_in_category_tree (por categoría del subárbol y
+        dentro de cada una por código).
+        """
+        names = self.category_tree.list_subcategories(category)
+        if not names:
+            return []
+        per_shard = self._broadcast("category", names)
+        result = []
+        for i in range(len(names)):
+            result.extend(self._product(row)
+                          for row in heapq.merge(*(rows[i] for rows in per_shard)))
+        return result
+
+    def shard_sizes(self):
+        return self._broadcast("count")
+
+    def stats(self):
+        """HashTable.stats de cada shard"""
+        return self._broadcast("stats")
+
+    def __len__(self):
+        return sum(self.shard_sizes())
+
+    # CIERRE
+
+    def close(self):
+        """Detiene los procesos de los shards"""
+        if self.closed:
+            return
+        self.closed = True
+        for shard in range(self.shards):
+            try:
+                self._call(shard, "stop")
+            except (ShardError, OSError):
+                pass
+            self._connections[shard].close()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __str__(self):
+        return f"ShardedCatalog({self.shards} shards)"
@@ -0,0 +1,1243 @@
+from structures.hashtable import HashTable
+from structures.queue import Queue, BlockingQueue
+from structures.priority_queue import BlockingPriorityQueue
+from structures.stack import Stack
+from structures.tree import Tree, TreeNode
+from structures.index import CategoryIndex, SortedIndex
+from structures.text_index import TextIndex
+from structures.cache import LRUCache
+from structures.columns import ColumnStore, LooseValues
+from structures.striped_lock import StripedLock
+from persistence.loader import iter_products
+from persistence.snapshot import read_snapshot, write_snapshot, encode, write_encoded
+from persistence.wal import WriteAheadLog
+from persistence.archive import OrderArchive, check_order
+from events import NullSink, Event, DEBUG, INFO, WARNING, ERROR
+from metrics import SIZE_BUCKETS
+from collections import Counter
+from contextlib import contextmanager
+import itertools, os, threading, time
+
+script_directory = os.path.dirname(os.path.abspath(__file__))
+
+# Stock a partir del cual un producto se considera con stock bajo
+LOW_STOCK_THRESHOLD = 3
+
+# Niveles de servicio de los pedidos y su prioridad (menor = se atiende antes)
+ORDER_TIERS = {"express": 0, "preventa": 1, "normal": 2, "mayorista": 3}
+DEFAULT_TIER = "normal"
+
+
+class OutOfStockError(Exception):
+    """No hay stock suficiente de un producto para reservar el pedido"""
+
+    def __init__(self, code):
+        super().__init__(f"Sin stock suficiente de {code}")
+        self.code = code
+
+
+class Product:
+    # __slots__ evita un __dict__ por instancia (mucha memoria con catálogos grandes).
+    # Precio, stock y categoría no son atributos propios: dentro de un Store
+    # el producto es una vista sobre su fila de Store.inventory
+    # (ColumnStore.attach); suelto, los guarda en un LooseValues.
+    __slots__ = ("code", "name", "_columns", "_row")
+
+    def __init__(self, code, name, price, stock, category):
+        self.code = code
+        self.name = name
+        self._columns = LooseValues(price, stock, category)
+        self._row = -1
+
+    @property
+    def price(self):
+        return self._columns.price_at(self._row)
+
+    @price.setter
+    def price(self, price):
+        self._columns.set_price_at(self._row, price)
+
+    @property
+    def stock(self):
+        return self._columns.stock_at(self._row)
+
+    @stock.setter
+    def stock(self, stock):
+        self._columns.set_stock_at(self._row, stock)
+
+    @property
+    def category(self):
+        return self._columns.category_at(self._row)
+    
+    def __str__(self):
+        return f"[{self.code}] {self.name} - ${self.price} (Stock: {self.stock})"
+
+
+class Order:
+    __slots__ = ("order_number", "customer", "products", "status",
+                 "tier", "priority", "created")
+
+    def __init__(self, order_number, customer, products, tier=DEFAULT_TIER, priority=None):
+        self.order_number = order_number
+        self.customer = customer
+        self.products = products
+        self.status = "pendiente"  # pendiente, completado o cancelado
+        # La prioridad empieza en la del nivel y baja si el pedido espera mucho
+        self.tier = tier
+        self.priority = ORDER_TIERS[tier] if priority is None else priority
+        self.created = time.monotonic()
+    
+    def __str__(self):
+        text = f"Pedido #{self.order_number} - Cliente: {self.customer}"
+        if self.tier != DEFAULT_TIER:
+            text += f" ({self.tier})"
+        return text
+
+
+def tier_priority(tier):
+    """Prioridad de un nivel de servicio; ValueError si no existe"""
+    if tier not in ORDER_TIERS:
+        raise ValueError(f"Nivel de pedido inválido: {tier!r} "
+                         f"(válidos: {', '.join(ORDER_TIERS)})")
+    return ORDER_TIERS[tier]
+
+
+class Store:
+    """
+    Inventario, pedidos y categorías de la tienda. No muestra nada: los
+    métodos retornan resultados y los avisos se emiten como eventos al
+    sink recibido (ver events.py); main.py es la interfaz de consola.
+    """
+
+    def __init__(self, history_size=5, catalog_path=None, snapshot_path=None,
+                 storage="chaining", wal_path=None, fsync="batch",
+                 compact_bytes=8 * 1024 * 1024, order_queue_size=0, stock_stripes=64,
+                 events=None, cache_size=10000, query_cache_size=256, cache_ttl=None,
+                 metrics=None, archive_path=None):
+        # Destino de los eventos (por defecto se descartan)
+        self.events = events or NullSink()
+
+        # Hash table para productos (búsqueda rápida por código).
+        # storage="open" usa el modo compacto de direccionamiento abierto y
+        # storage="persistent" la tabla con snapshots O(1) (catalog_snapshot).
+        self.storage = storage
+        self.products = HashTable(storage=storage)
+        
+        # Cola de prioridad para procesar pedidos: primero los de nivel más
+        # urgente y, dentro del mismo nivel, en orden de llegada (segura para
+        # varios hilos; con order_queue_size > 0 es acotada)
+        self.order_queue = BlockingPriorityQueue(maxsize=order_queue_size,
+                                                 key=lambda order: order.priority)
+
+        # Pedidos pendientes por número (para cancelarlos)
+        self.pending_orders = {}
+
+        # Locks para el stock (uno por grupo de productos), el contador de
+        # pedidos, el estado de los pedidos y los índices
+        self.stock_locks = StripedLock(stripes=stock_stripes)
+        # Cambios de stock todavía no pasados al índice de stock, uno por
+        # grupo del StripedLock: código -> (producto, stock en el índice).
+        # Una reserva solo toma el lock de su producto; el índice y el caché
+        # de stock bajo se ponen al día al leerlos (_sync_stock).
+        self._stock_changes = [{} for _ in range(stock_stripes)]
+        self._order_lock = threading.Lock()
+        self._status_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        
+        # Pila acotada para historial de productos vistos (últimos N)
+        self.view_history = Stack(capacity=history_size)
+        
+        # Árbol para categorías jerárquicas
+        self.category_tree = Tree()
+
+        # Índices secundarios (categoría, precio y stock) y los índices
+        # ordenados que usa el catálogo paginado
+        self.category_index = CategoryIndex()
+        self.price_index = SortedIndex()
+        self.stock_index = SortedIndex()
+        self.code_index = SortedIndex()
+        self.name_index = SortedIndex()
+        self.sort_indexes = {"code": self.code_index, "name": self.name_index,
+                             "price": self.price_index, "stock": self.stock_index}
+
+        # Cachés de lectura: productos por código y resultados de consultas
+        # (uno por tipo de consulta, así cada cambio revisa solo las claves
+        # que le afectan). cache_size=0 los desactiva.
+        self.product_cache = LRUCache(cache_size, cache_ttl)
+        self.category_cache = LRUCache(query_cache_size, cache_ttl)
+        self.tree_cache = LRUCache(query_cache_size, cache_ttl)
+        self.price_cache = LRUCache(query_cache_size, cache_ttl)
+        self.stock_cache = LRUCache(query_cache_size, cache_ttl)
+
+        # Índice de texto sobre código, nombre y categoría (búsqueda por
+        # palabras). Se arma en la primera búsqueda para no demorar el arranque.
+        self.text_index = None
+
+        # Columnas de precio, stock y categoría para estadísticas del
+        # inventario y los reportes de analytics.py (se crean al pedirlos)
+        self.inventory = ColumnStore()
+        self._analytics = None
+        
+        # Contador para números de pedido
+        self.order_counter = 1
+
+        self.catalog_path = catalog_path
+        self.snapshot_path = snapshot_path
+
+        # Write-ahead log: con wal_path, cada cambio se registra en disco
+        # antes de aplicarse y se compacta en un snapshot al crecer
+        if wal_path and not snapshot_path:
+            self.snapshot_path = wal_path + ".snap"
+        self.wal = None
+        self.compact_bytes = compact_bytes
+        self._snapshot_lsn = 0
+        self._compaction = None
+        # Cambios en curso (registrados en el log y todavía aplicándose): la
+        # compactación espera a que no haya ninguno para capturar el estado
+        self._wal_gate = threading.Condition()
+        self._in_flight = 0
+        # Último lsn registrado por cada hilo: antes de confirmar un cambio
+        # se espera a que esté en disco (_durable)
+        self._logged = threading.local()
+        
+        # Inicializar datos
+        self._initialize_data()
+
+        if wal_path:
+            self.wal = WriteAheadLog(wal_path, fsync=fsync, start_lsn=self._snapshot_lsn)
+            self._replay_wal()
+
+        # Archivo histórico de pedidos completados (persistence/archive.py):
+        # con archive_path, cada pedido completado se agrega al archivo del
+        # día. Al reproducir el WAL no se vuelven a archivar.
+        self.archive = OrderArchive(archive_path) if archive_path else None
+
+        # Instrumentación opcional (ver metrics.py): sin metrics no se
+        # envuelve nada y no hay ningún costo
+        self.metrics = metrics
+        if metrics is not None:
+            self._instrument(metrics)
+    
+    def _instrument(self, metrics):
+        """
+        Envuelve, solo en esta instancia, los métodos públicos del Store y
+        las operaciones de las estructuras que interesa medir. Se hace al
+        final de __init__, cuando la tabla de productos ya es la definitiva.
+        """
+        methods = [name for name in dir(type(self))
+                   if not name.startswith("_") and callable(getattr(type(self), name))]
+        metrics.instrument(self, methods, "store")
+
+        # Largo de la cadena (o del sondeo) de las búsquedas de productos,
+        # en 1 de cada metrics.sample_every
+        search, probe_length = self.products.search, self.products.probe_length
+        lookups = itertools.count()
+        every = metrics.sample_every
+
+        def instrumented_search(key):
+            if next(lookups) % every == 0:
+                metrics.observe("hashtable_probe_length", probe_length(key), SIZE_BUCKETS,
+                                table="products")
+            return search(key)
+        self.products.search = instrumented_search
+
+        # Espera de cada pedido en la cola, desde su creación hasta que se toma
+        fulfill = self.fulfill_next_order
+
+        def instrumented_fulfill(*args, **kwargs):
+            order = fulfill(*args, **kwargs)
+            if order is not None:
+                metrics.observe("order_wait_seconds", time.monotonic() - order.created,
+                                tier=order.tier)
+            return order
+        self.fulfill_next_order = instrumented_fulfill
+
+        # Categorías recorridas por cada consulta de subárbol
+        list_subcategories = self.category_tree.list_subcategories
+
+        def instrumented_subcategories(name):
+            result = list_subcategories(name)
+            metrics.observe("tree_subtree_size", len(result), SIZE_BUCKETS)
+            return result
+        self.category_tree.list_subcategories = instrumented_subcategories
+
+        # Valores que se leen al exportar
+        metrics.gauge("order_queue_depth", self.order_queue.size,
+                      "Pedidos en la cola (incluye cancelados aún no descartados)")
+        metrics.gauge("pending_orders", self._pending_by_tier, "Pedidos pendientes por nivel")
+        metrics.gauge("hashtable_stat", self._table_stats,
+                      "Contadores de la tabla de productos (HashTable.counters)")
+        metrics.gauge("cache_stat", self._cache_gauges, "Contadores de los cachés")
+        metrics.describe("hashtable_probe_length", "Elementos comparados por búsqueda")
+        metrics.describe("order_wait_seconds", "Espera de los pedidos en la cola")
+        metrics.describe("tree_subtree_size", "Categorías por consulta de subárbol")
+
+    def _pending_by_tier(self):
+        counts = Counter(order.tier for order in list(self.pending_orders.values()))
+        return {(("tier", tier),): counts.get(tier, 0) for tier in ORDER_TIERS}
+
+    def _table_stats(self):
+        # counters y no stats: cada lectura de las métricas sería un recorrido
+        # de toda la tabla. Son lecturas sueltas de atributos: sin lock.
+        return {(("stat", name), ("table", "products")): value
+                for name, value in self.products.counters().items()}
+
+    def _cache_gauges(self):
+        # Store.cache_stats y no self.cache_stats: leer los gauges no cuenta como llamada
+        return {(("cache", cache), ("stat", name)): value
+                for cache, stats in Store.cache_stats(self).items()
+                for name, value in stats.items()}
+
+    def _initialize_data(self):
+        # Arranque rápido desde el snapshot binario si existe
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            try:
+                self._restore_snapshot(self.snapshot_path)
+                return
+            except Exception as e:
+                self._emit(WARNING, "snapshot_error", "Error al leer el snapshot: {error}", error=e)
+
+        # Crear categorías
+        self.category_tree.add("Comics")
+        self.category_tree.add("DC Comics", "Comics")
+        self.category_tree.add("Marvel", "Comics")
+        self.category_tree.add("Manga", "Comics")
+        self.category_tree.add("Independientes", "Comics")
+        
+        # Subcategorías
+        self.category_tree.add("Batman", "DC Comics")
+        self.category_tree.add("Superman", "DC Comics")
+        self.category_tree.add("Wonder Woman", "DC Comics")
+        self.category_tree.add("Flash", "DC Comics")
+        self.category_tree.add("Justice League", "DC Comics")
+        
+        self.category_tree.add("Spider-Man", "Marvel")
+        self.category_tree.add("X-Men", "Marvel")
+        self.category_tree.add("Avengers", "Marvel")
+        self.category_tree.add("Iron Man", "Marvel")
+        self.category_tree.add("Captain America", "Marvel")
+        self.category_tree.add("Deadpool", "Marvel")
+        
+        self.category_tree.add("Shonen", "Manga")
+        self.category_tree.add("Seinen", "Manga")
+        
+        self._load_products()
+    
+    def _load_products(self):
+        possible_files = ["products.json", "1761138984441_products.json"]
+        file_path = self.catalog_path or "products/products.json"
+        
+        if self.catalog_path is None:
+            for filename in possible_files:
+                if os.path.exists(filename):
+                    file_path = "products/" + filename
+                    break
+        
+        try:
+            # Los productos se leen y se insertan de a uno, sin armar
+            # el documento completo en memoria. Los índices se arman al
+            # final, todos juntos.
+            loaded = {}
+            for product_data in iter_products(file_path, progress=self._report_progress):
+                product = Product(
+                    product_data['code'],
+                    product_data['name'],
+                    product_data['price'],
+                    product_data['stock'],
+                    product_data['category']
+                )
+                self.products.insert(product.code, product)
+                loaded[product.code] = product
+            self._index_many(loaded.values())
+            self._emit(INFO, "catalog_loaded", "✓ {count} productos cargados desde {path}",
+                       count=len(loaded), path=file_path)
+        except Exception as e:
+            self._emit(ERROR, "catalog_error", "Error al cargar productos: {error}", error=e)
+
+    def _report_progress(self, count):
+        self._emit(INFO, "catalog_progress", "  ... {count} productos cargados", count=count)
+
+    def _emit(self, level, name, template, /, **data):
+        """Envía un evento al sink si su nivel lo acepta (data puede tener "name")"""
+        if level >= self.events.level:
+            self.events.emit(Event(level, name, template, data))
+
+
+    # ÍNDICES SECUNDARIOS
+
+    def _index_product(self, product):
+        self._invalidate_product(product)
+        self.category_index.add(product.category, product.code, product)
+        self.price_index.add(product.price, product.code, product)
+        self.stock_index.add(product.stock, product.code, product)
+        self.code_index.add(product.code, product.code, product)
+        self.name_index.add(product.name, product.code, product)
+        if self.text_index is not None:
+            self.text_index.add(product.code, self._text_fields(product), product)
+        self.inventory.attach(product)
+
+    def _unindex_product(self, product):
+        self._invalidate_product(product)
+        self.category_index.remove(product.category, product.code)
+        self.price_index.remove(product.price, product.code)
+        self.stock_index.remove(product.stock, product.code)
+        self.code_index.remove(product.code, product.code)
+        self.name_index.remove(product.name, product.code)
+        if self.text_index is not None:
+            self.text_index.remove(product.code)
+        self.inventory.detach(product)
+
+    def _index_many(self, products):
+        """
+        Indexa muchos productos nuevos de una vez (carga inicial, con los
+        cachés todavía vacíos)
+        """
+        products = list(products)
+        for product in products:
+            self.category_index.add(product.category, product.code, product)
+            if self.text_index is not None:
+                self.text_index.add(product.code, self._text_fields(product), product)
+            self.inventory.attach(product)
+        self.price_index.add_many((p.price, p.code, p) for p in products)
+        self.stock_index.add_many((p.stock, p.code, p) for p in products)
+        self.code_index.add_many((p.code, p.code, p) for p in products)
+        self.name_index.add_many((p.name, p.code, p) for p in products)
+
+    # INVALIDACIÓN DE CACHÉS
+
+    def _invalidate_product(self, product):
+        """Un producto entra o sale del inventario: todo lo que lo incluye"""
+        self.product_cache.invalidate(product.code)
+        self.category_cache.invalidate(product.category)
+        for name in self.category_tree.ancestors(product.category):
+            self.tree_cache.invalidate(name)
+        self._invalidate_price(product.price)
+        self._invalidate_stock(product.stock)
+
+    def _invalidate_price(self, *prices):
+        """Rangos de precio cacheados que contienen alguno de esos precios"""
+        if len(self.price_cache):
+            self.price_cache.invalidate_where(
+                lambda key: any((key[0] is None or key[0] <= price) and
+                                (key[1] is None or price <= key[1]) for price in prices))
+
+    def _invalidate_stock(self, *stocks):
+        """Consultas de stock bajo cuyo umbral alcanza a alguno de esos stocks"""
+        if len(self.stock_cache):
+            self.stock_cache.invalidate_where(
+                lambda threshold: any(stock <= threshold for stock in stocks))
+
+    def cache_stats(self):
+        """Aciertos, fallos y descartes de cada caché"""
+        return {
+            "products": self.product_cache.stats(),
+            "category": self.category_cache.stats(),
+            "category_tree": self.tree_cache.stats(),
+            "price_range": self.price_cache.stats(),
+            "low_stock": self.stock_cache.stats(),
+        }
+
+    @staticmethod
+    def _text_fields(product):
+        """Campos del índice de texto con su peso: el código pesa más que el nombre"""
+        return [(product.code, 3), (product.name, 2), (product.category, 1)]
+
+    def _store_product(self, product):
+        """Inserta (o reemplaza) un producto manteniendo los índices al día"""
+        # Con el lock del producto nadie cambia el stock del anterior
+        # mientras se lo quita de los índices; se lo busca con los locks
+        # tomados, así otro alta o baja del mismo código no lo cambia antes
+        stripe = self.stock_locks.index(product.code)
+        with self._index_lock, self.stock_locks.lock_at(stripe):
+            previous = self.products.search(product.code)
+            self._invalidate_stock(*self._sync_stripe(stripe))
+            if previous is not None:
+                self._unindex_product(previous)
+            # Se indexa antes de publicarlo en la tabla: nadie llega a
+            # cambiar el stock del objeto suelto mientras pasa a su columna
+            self._index_product(product)
+            self.products.insert(product.code, product)
+
+    def products_by_category(self, category):
+        """Productos de una categoría (sin incluir subcategorías)"""
+        return list(self.category_cache.get_or_load(
+            category, lambda: self.category_index.get(category)))
+
+    def search_products(self, query, limit=10):
+        """
+        Busca productos por palabras del nombre, la categoría o el código,
+        sin importar mayúsculas ni acentos, con autocompletado de la última
+        palabra y tolerancia a errores de tipeo. Retorna [(producto, puntaje)]
+        del más relevante al menos relevante.
+        """
+        with self._index_lock:
+            if self.text_index is None:
+                self.text_index = TextIndex()
+                for product in self.products:
+                    self.text_index.add(product.code, self._text_fields(product), product)
+            return self.text_index.search(query, limit)
+
+    def products_in_category_tree(self, category):
+        """
+        Productos de una categoría y de todas sus subcategorías.
+        El subárbol sale del recorrido Euler del árbol (tramo contiguo) y
+        cada categoría se resuelve con el índice: O(subcategorías + k).
+        El resultado queda en caché hasta que cambie algún producto del
+        subárbol o se agregue una subcategoría.
+        """
+        def load():
+            result = []
+            for name in self.category_tree.list_subcategories(category):
+                result.extend(self.category_index.get(name))
+            return result
+        return list(self.tree_cache.get_or_load(category, load))
+
+    def products_by_price_range(self, min_price=None, max_price=None):
+        """Productos con precio entre min_price y max_price, del más barato al más caro"""
+        return list(self.price_cache.get_or_load(
+            (min_price, max_price), lambda: self.price_index.range(min_price, max_price)))
+
+    def low_stock_products(self, threshold=LOW_STOCK_THRESHOLD):
+        """Productos con stock menor o igual al umbral (incluye los agotados)"""
+        with self._index_lock:
+            self._sync_stock()
+            return list(self.stock_cache.get_or_load(
+                threshold, lambda: self.stock_index.range(None, threshold)))
+
+    def inventory_stats(self):
+        """Totales del inventario calculados sobre las columnas de precio y stock"""
+        return {
+            "products": len(self.inventory),
+            "units": self.inventory.total_stock(),
+            "value": self.inventory.total_value(),
+        }
+
+    def analytics(self):
+        """
+        Reportes vectorizados del inventario (InventoryAnalytics, ver
+        analytics.py). Necesita numpy: sin numpy lanza ImportError.
+        """
+        if self._analytics is None:
+            from analytics import InventoryAnalytics
+            self._analytics = InventoryAnalytics(self.inventory, self.category_tree,
+                                                 self._index_lock, self._sync_stock)
+        return self._analytics
+
+    # INVENTARIO
+
+    def add_product(self, code, name, price, stock, category):
+        """Agrega un nuevo producto al inventario y lo retorna"""
+        with self._changing():
+            self._log("add", code=code, name=name, price=price, stock=stock, category=category)
+            product = self._apply_add(code, name, price, stock, category)
+        self._durable()
+        self._emit(DEBUG, "product_added", "Producto agregado: {code}", code=code)
+        return product
+
+    def _apply_add(self, code, name, price, stock, category):
+        product = Product(code, name, price, stock, category)
+        self._store_product(product)
+        return product
+    
+    def search_product(self, code):
+        """
+        Busca un producto por su código único (O(1) con hash table) y lo
+        agrega al historial. Retorna el producto o None.
+        """
+        product = self.find_product(code)
+        if product:
+            self.add_to_history(product)
+        else:
+            self._emit(DEBUG, "product_not_found", "Producto no encontrado: {code}", code=code)
+        return product
+    
+    def find_product(self, code):
+        """Busca un producto por código sin mostrar nada ni tocar el historial"""
+        return self.product_cache.get_or_load(code, lambda: self.products.search(code))
+
+    def update_product(self, code, new_price=None, new_stock=None):
+        """
+        Actualiza información de un producto existente.
+        Retorna el producto actualizado o None si no existe.
+        """
+        product = self.products.search(code)
+        if product is None:
+            return None
+        with self._changing():
+            self._log("update", code=code, price=new_price, stock=new_stock)
+            self._apply_update(code, new_price, new_stock)
+        self._durable()
+        self._emit(DEBUG, "product_updated", "Producto actualizado: {code}", code=code)
+        return product
+
+    def _apply_update(self, code, new_price, new_stock):
+        product = self.products.search(code)
+        if product:
+            if new_price is not None:
+                with self._index_lock:
+                    self._invalidate_price(product.price, new_price)
+                    self.price_index.remove(product.price, code)
+                    product.price = new_price
+                    self.price_index.add(new_price, code, product)
+                    self.inventory.touch(code)
+            if new_stock is not None:
+                with self.stock_locks.lock_for(code):
+                    self._set_stock(product, new_stock)
+
+    def _set_stock(self, product, new_stock):
+        """
+        Cambia el stock (en su columna). Se llama con el lock del producto
+        tomado y sin el de los índices: el cambio queda anotado en su grupo
+        y el índice de stock se pone al día en la próxima lectura.
+        """
+        changes = self._stock_changes[self.stock_locks.index(product.code)]
+        if product.code not in changes:
+            changes[product.code] = (product, product.stock)
+        product.stock = new_stock
+
+    def _sync_stripe(self, stripe):
+        """
+        Pasa al índice de stock los cambios anotados en un grupo. Se llama
+        con el lock de los índices y el del grupo tomados. Retorna los
+        stocks (viejos y nuevos) cuyas consultas cacheadas hay que invalidar.
+        """
+        changes = self._stock_changes[stripe]
+        if not changes:
+            return ()
+        self._stock_changes[stripe] = {}
+        stocks = []
+        for code, (product, indexed) in changes.items():
+            # Un producto reemplazado o eliminado ya salió de los índices
+            if self.products.search(code) is not product:
+                continue
+            self.inventory.touch(code)
+            stock = product.stock
+            if stock != indexed:
+                self.stock_index.remove(indexed, code)
+                self.stock_index.add(stock, code, product)
+                stocks += (indexed, stock)
+        return stocks
+
+    def _sync_stock(self):
+        """
+        Pone al día el índice de stock, el caché de stock bajo y las marcas
+        de las columnas con todos los cambios anotados. Se llama con el lock
+        de los índices tomado; toma el de cada grupo por turno, y solo si
+        ese grupo tiene cambios.
+        """
+        stocks = []
+        for stripe, changes in enumerate(self._stock_changes):
+            if changes:
+                with self.stock_locks.lock_at(stripe):
+                    stocks.extend(self._sync_stripe(stripe))
+        if stocks:
+            self._invalidate_stock(*stocks)
+    
+    def delete_product(self, code):
+        """Elimina un producto del inventario. Retorna False si no existía."""
+        if self.products.search(code) is None:
+            return False
+        with self._changing():
+            self._log("delete", code=code)
+            self._apply_delete(code)
+        self._durable()
+        self._emit(DEBUG, "product_deleted", "Producto eliminado: {code}", code=code)
+        return True
+
+    def _apply_delete(self, code):
+        stripe = self.stock_locks.index(code)
+        with self._index_lock, self.stock_locks.lock_at(stripe):
+            product = self.products.search(code)
+            if product is not None:
+                self._invalidate_stock(*self._sync_stripe(stripe))
+                self.products.delete(code)
+                self._unindex_product(product)
+    
+    def list_products(self):
+        """Retorna todos los productos del inventario"""
+        return self.products.list_all()
+
+    def iter_products(self):
+        """Recorre los productos del inventario sin armar una lista"""
+        return iter(self.products)
+
+    def catalog_snapshot(self):
+        """
+        Foto de la tabla de productos (HashTableSnapshot) para reportes que
+        recorren el catálogo una o más veces mientras sigue cambiando.
+        Con storage="persistent" es O(1) y no frena a nadie; con los otros
+        motores copia la tabla con los cambios de productos en espera.
+        Fija qué productos hay; precio y stock se leen de cada producto.
+        """
+        if self.storage == "persistent":
+            return self.products.snapshot()
+        with self._index_lock:
+            return self.products.snapshot()
+
+    def catalog_page(self, sort="code", limit=20, cursor=None, page=None, offset=0,
+                     descending=False):
+        """
+        Una página del catálogo ordenado por "code", "name", "price" o "stock".
+        Se avanza pasando el cursor que retorna la página anterior, o se
+        salta directo a un número de página (desde 1) o a un offset. Cada
+        página cuesta O(log n + limit) gracias a los índices ordenados.
+        Retorna {"products", "next" (cursor o None), "total"}.
+        """
+        index = self.sort_indexes.get(sort)
+        if index is None:
+            raise ValueError(f"Orden desconocido: {sort}")
+        if page:
+            offset = (page - 1) * limit
+        # El índice de stock se pone al día con las reservas anotadas
+        with self._index_lock:
+            if index is self.stock_index:
+                self._sync_stock()
+            products, next_cursor = index.page(cursor, limit, offset, descending)
+            total = len(index)
+        return {"products": products, "next": next_cursor, "total": total}
+    
+    # PROCESAMIENTO DE PEDIDOS
+    
+    def create_order(self, customer, product_codes, tier=DEFAULT_TIER):
+        """
+        Crea un nuevo pedido a partir de códigos y lo agrega a la cola con
+        la prioridad de su nivel (ver ORDER_TIERS; ValueError si no existe
+        o si el pedido no entra en el archivo de pedidos).
+        Retorna un resultado con:
+        - lookups: (código, producto o None) en el orden recibido
+        - not_found: códigos que no existen
+        - order: el pedido creado, o None
+        - error: None, "sin_productos", "sin_stock" (con out_of_stock, el
+          código que no alcanzó) o "cola_llena"
+        """
+        tier_priority(tier)
+        lookups = [(code, self.find_product(code)) for code in product_codes]
+        order_products = [product for _, product in lookups if product]
+        result = {"lookups": lookups, "not_found": [c for c, p in lookups if p is None],
+                  "order": None, "error": None, "out_of_stock": None}
+
+        if not order_products:
+            result["error"] = "sin_productos"
+        else:
+            try:
+                result["order"] = self.submit_order(customer, order_products, tier=tier)
+                if result["order"] is None:
+                    result["error"] = "cola_llena"
+            except OutOfStockError as e:
+                result["error"] = "sin_stock"
+                result["out_of_stock"] = e.code
+
+        if result["order"] is not None:
+            self._emit(DEBUG, "order_created", "Pedido #{number} creado para {customer}",
+                       number=result["order"].order_number, customer=customer)
+        else:
+            self._emit(DEBUG, "order_rejected", "Pedido de {customer} rechazado: {error}",
+                       customer=customer, error=result["error"])
+        return result
+    
+    def submit_order(self, customer, order_products, block=True, timeout=None,
+                     tier=DEFAULT_TIER):
+        """
+        Crea un pedido del nivel tier, reserva su stock y lo encola sin
+        mostrar nada; se puede llamar desde varios hilos.
+        Lanza OutOfStockError si algún producto no alcanza (no se reserva
+        nada) y ValueError si el nivel no existe o, con archivo de pedidos,
+        si el pedido no entra en él (ver archive.check_order). Si la cola
+        es acotada y sigue llena al vencer el timeout (o de inmediato con
+        block=False), retorna None.
+        """
+        tier_priority(tier)
+        if self.archive is not None:
+            check_order(customer, [p.code for p in order_products])
+        needed = Counter(p.code for p in order_products)
+        # Solo se bloquean los locks de los productos del pedido: pedidos
+        # de productos distintos se reservan en paralelo
+        with self.stock_locks.acquire_many(needed), self._changing():
+            self._reserve(needed)
+            try:
+                with self._order_lock:
+                    # Solo los productores toman este lock y los consumidores
+                    # solo liberan lugar: si ahora hay lugar, lo sigue habiendo
+                    if block:
+                        has_room = self.order_queue.wait_not_full(timeout)
+                    else:
+                        has_room = not self.order_queue.is_full()
+                    if not has_room:
+                        self._release(needed)
+                        return None
+                    self._log("order", customer=customer,
+                              codes=[p.code for p in order_products], tier=tier)
+                    order = self._enqueue_order(customer, order_products, tier)
+            except BaseException:
+                self._release(needed)
+                raise
+        self._durable()
+        return order
+
+    def create_orders_bulk(self, records, chunk_size=10000):
+        """
+        Crea muchos pedidos de una vez a partir de un iterable (o archivo
+        leído con iter_order_records) de registros (cliente, [códigos]) o
+        (cliente, [códigos], nivel).
+        Los registros se procesan por bloques: cada código distinto se busca
+        una sola vez por bloque, el stock se valida y reserva en una pasada
+        sobre un balance local y se escribe una vez por producto, y el
+        bloque entero va al log en un solo registro. Los pedidos que no
+        tienen stock suficiente se rechazan completos; un registro con un
+        nivel que no existe o, con archivo de pedidos, que no entra en él
+        lanza ValueError.
+        Retorna un resumen con los totales, sin mostrar nada.
+        """
+        summary = {"records": 0, "created": 0, "out_of_stock": 0, "empty": 0,
+                   "not_found": Counter(), "first_order": None, "last_order": None}
+        chunk = []
+        for record in records:
+            customer, codes, *rest = record
+            tier = rest[0] if rest and rest[0] else DEFAULT_TIER
+            tier_priority(tier)
+            if self.archive is not None:
+                check_order(customer, codes)
+            chunk.append((customer, codes, tier))
+            if len(chunk) >= chunk_size:
+                self._create_orders_chunk(chunk, summary)
+                chunk = []
+        if chunk:
+            self._create_orders_chunk(chunk, summary)
+        self._durable()
+        return summary
+
+    def _create_orders_chunk(self, chunk, summary):
+        codes = {code for _, order_codes, _ in chunk for code in order_codes}
+        products = {code: self.products.search(code) for code in codes}
+        found = [code for code, product in products.items() if product is not None]
+
+        with self.stock_locks.acquire_many(found):
+            available = {code: products[code].stock for code in found}
+            accepted = []
+            for customer, order_codes, tier in chunk:
+                summary["records"] += 1
+                order_products = []
+                for code in order_codes:
+                    if products[code] is None:
+                        summary["not_found"][code] += 1
+                    else:
+                        order_products.append(products[code])
+                if not order_products:
+                    summary["empty"] += 1
+                    continue
+
+                needed = Counter(p.code for p in order_products)
+                if any(available[code] < qty for code, qty in needed.items()):
+                    summary["out_of_stock"] += 1
+                    continue
+                for code, qty in needed.items():
+                    available[code] -= qty
+                accepted.append((customer, order_products, tier))
+
+            if not accepted:
+                return
+            with self._order_lock, self._changing():
+                self._log("orders", orders=[[customer, [p.code for p in order_products], tier]
+                                            for customer, order_products, tier in accepted])
+                for code in found:
+                    if available[code] != products[code].stock:
+                        self._set_stock(products[code], available[code])
+                orders = self._enqueue_orders(accepted)
+                if summary["first_order"] is None:
+                    summary["first_order"] = orders[0].order_number
+                summary["last_order"] = orders[-1].order_number
+                summary["created"] += len(orders)
+
+    def _reserve(self, needed):
+        """
+        Descuenta el stock producto por producto. Si uno no alcanza,
+        devuelve lo ya descontado (rollback) y lanza OutOfStockError.
+        Se llama con los locks de esos productos tomados.
+        """
+        taken = Counter()
+        for code, qty in needed.items():
+            product = self.products.search(code)
+            if product is None or product.stock < qty:
+                self._release(taken)
+                raise OutOfStockError(code)
+            self._set_stock(product, product.stock - qty)
+            taken[code] = qty
+
+    def _release(self, needed):
+        """Devuelve al stock lo reservado (los productos eliminados se ignoran)"""
+        for code, qty in needed.items():
+            product = self.products.search(code)
+            if product is not None:
+                self._set_stock(product, product.stock + qty)
+
+    def _enqueue_order(self, customer, order_products, tier=DEFAULT_TIER):
+        order = Order(self.order_counter, customer, order_products, tier)
+        self.order_queue.enqueue(order)
+        self.pending_orders[order.order_number] = order
+        self.order_counter += 1
+        return order
+
+    def _enqueue_orders(self, accepted):
+        """Como _enqueue_order para muchos pedidos; con cola acotada espera lugar"""
+        orders = []
+        for customer, order_products, tier in accepted:
+            order = Order(self.order_counter, customer, order_products, tier)
+            self.pending_orders[order.order_number] = order
+            self.order_counter += 1
+            orders.append(order)
+        self.order_queue.enqueue_many(orders)
+        return orders
+
+    def _apply_order(self, customer, codes, tier=DEFAULT_TIER):
+        products = [p for p in (self.products.search(c) for c in codes) if p]
+        # El log solo tiene pedidos cuya reserva salió bien: se repite sin verificar
+        for code, qty in Counter(p.code for p in products).items():
+            product = self.products.search(code)
+            self._set_stock(product, product.stock - qty)
+        self._enqueue_order(customer, products, tier)
+
+    def cancel_order(self, order_number):
+        """
+        Cancela un pedido pendiente y libera su stock reservado.
+        Retorna True si se canceló, False si no existe o ya fue procesado.
+        """
+        with self._status_lock:
+            order = self.pending_orders.get(order_number)
+            if order is None or order.status != "pendiente":
+                return False
+            needed = Counter(p.code for p in order.products)
+            with self.stock_locks.acquire_many(needed), self._changing():
+                self._log("cancel", number=order_number)
+                self._release(needed)
+                order.status = "cancelado"
+                del self.pending_orders[order_number]
+            # El pedido queda en la cola; los workers lo saltean
+        self._durable()
+        return True
+
+    def fulfill_next_order(self, block=False, timeout=None, tier=None):
+        """
+        Toma el siguiente pedido pendiente de la cola (el más urgente) y lo
+        marca como completado (su stock ya se reservó al crearlo). Los
+        pedidos cancelados se saltean. Con tier solo toma pedidos de ese
+        nivel o más urgentes (por ejemplo, un worker reservado para
+        "express"). Retorna el pedido o None si no había.
+        Lo usan varios workers a la vez.
+        """
+        max_priority = tier_priority(tier) if tier is not None else None
+        while True:
+            order = self.order_queue.get(block=block, timeout=timeout,
+                                         max_priority=max_priority)
+            if order is None:
+                return None
+            with self._status_lock:
+                if order.status != "pendiente":
+                    continue
+                with self._changing():
+                    self._log("complete", number=order.order_number)
+                    order.status = "completado"
+                    self.pending_orders.pop(order.order_number, None)
+            self._durable()
+            if self.archive is not None:
+                try:
+                    self.archive.append(order)
+                except ValueError as e:
+                    # Un pedido aceptado antes de activar el archivo puede
+                    # no entrar: el worker sigue con los demás
+                    self._emit(ERROR, "archive_error", "No se pudo archivar el pedido "
+                               "#{number}: {error}", number=order.order_number, error=e)
+            return order
+
+    def _apply_complete(self, number):
+        order = self.pending_orders.pop(number, None)
+        if order is not None:
+            order.status = "completado"
+
+    def _apply_cancel(self, number):
+        order = self.pending_orders.pop(number, None)
+        if order is not None:
+            self._release(Counter(p.code for p in order.products))
+            order.status = "cancelado"
+
+    def process_next_order(self, tier=None):
+        """
+        Procesa el siguiente pedido de la cola: el de nivel más urgente y,
+        entre iguales, el más antiguo. Con tier, solo si es de ese nivel o
+        más urgente. Retorna el pedido o None.
+        """
+        order = self.fulfill_next_order(tier=tier)
+        if order:
+            self._emit(DEBUG, "order_completed", "Pedido #{number} completado",
+                       number=order.order_number)
+        return order
+    
+    def escalate_orders(self, max_wait, top_tier="preventa"):
+        """
+        Adelanta los pedidos que esperan demasiado: por cada max_wait
+        segundos en la cola, un pedido sube un nivel respecto del suyo,
+        hasta la prioridad de top_tier. Así un pedido mayorista no queda
+        postergado para siempre detrás de los más urgentes; por defecto no
+        llega a la de "express", porque los pedidos adelantados (más viejos)
+        quedarían delante de todos los express nuevos.
+        Se puede llamar seguido (por ejemplo, desde un hilo cada
+        max_wait / 4): un pedido solo cambia cuando le corresponde subir.
+        Retorna cuántos se adelantaron.
+        """
+        top = tier_priority(top_tier)
+        now = time.monotonic()
+        escalated = 0
+        with self._status_lock:
+            for order in list(self.pending_orders.values()):
+                levels = int((now - order.created) // max_wait)
+                priority = max(top, ORDER_TIERS[order.tier] - levels)
+                if priority < order.priority:
+                    with self._changing():
+                        self._log("escalate", number=order.order_number, priority=priority)
+                        self._apply_escalate(order.order_number, priority)
+                    escalated += 1
+        self._durable()
+        if escalated:
+            self._emit(DEBUG, "orders_escalated", "{count} pedidos adelantados",
+                       count=escalated)
+        return escalated
+
+    def _apply_escalate(self, number, priority):
+        order = self.pending_orders.get(number)
+        if order is not None:
+            order.priority = priority
+            self.order_queue.update(order, priority)
+
+    def pending_order_list(self):
+        """
+        Pedidos pendientes en el orden de la cola: por prioridad y, entre
+        iguales, por número. Sale de pending_orders y no de la cola, que
+        también tiene los cancelados y no tiene los que un worker ya sacó
+        pero todavía no completó.
+        """
+        return sorted(self.pending_orders.values(),
+                      key=lambda order: (order.priority, order.order_number))
+    
+    # HISTORIAL DE PRODUCTOS VISTOS
+    
+    def add_to_history(self, product):
+        """Agrega un producto al historial (la pila descarta el más antiguo)"""
+        self.view_history.push(product)
+    
+    def history(self):
+        """Últimos productos vistos, del más reciente al más antiguo"""
+        return list(self.view_history)
+    
+    # SNAPSHOT BINARIO
+
+    def save_snapshot(self, path=None):
+        """Guarda productos, categorías y pedidos pendientes en un snapshot binario"""
+        path = path or self.snapshot_path
+        write_snapshot(path, self.order_counter, self.category_tree.categories(),
+                       self.products.list_all(), self.pending_order_list(), self.wal_lsn())
+        self._emit(INFO, "snapshot_saved", "✓ Snapshot guardado en {path}", path=path)
+        return path
+
+    def wal_lsn(self):
+        """Último lsn del log (0 sin log): lo que ya incluye un snapshot"""
+        return self.wal.last_lsn if self.wal is not None else self._snapshot_lsn
+
+    def _restore_snapshot(self, path):
+        """Reconstruye el estado completo a partir de un snapshot"""
+        data = read_snapshot(path)
+
+        # Con la cantidad de productos conocida, la tabla se crea con el
+        # tamaño justo y la carga no dispara ningún rehash
+        self.products = HashTable(size=max(100, int(len(data["products"]) / 0.75) + 1),
+                                  storage=self.storage)
+
+        for name, parent in data["categories"]:
+            self.category_tree.add(name, parent)
+
+        products = []
+        for code, name, price, stock, category in data["products"]:
+            product = Product(code, name, price, stock, category)
+            self.products.insert(code, product)
+            products.append(product)
+        self._index_many(products)
+
+        for number, customer, codes, tier, priority in data["orders"]:
+            # El stock de los pedidos pendientes ya está descontado en el snapshot
+            order_products = [p for p in (self.products.search(c) for c in codes) if p]
+            order = Order(number, customer, order_products, tier, priority)
+            self.order_queue.enqueue(order)
+            self.pending_orders[number] = order
+        self.order_counter = data["order_counter"]
+        self._snapshot_lsn = data["last_lsn"]
+
+        self._emit(INFO, "snapshot_restored",
+                   "✓ {products} productos y {orders} pedidos restaurados desde {path}",
+                   products=len(products), orders=len(data["orders"]), path=path)
+
+    # WRITE-AHEAD LOG
+
+    def _log(self, op, **fields):
+        """
+        Registra un cambio en el WAL (si está activo) antes de aplicarlo.
+        Se llama dentro de _changing(), que abarca también su aplicación.
+        """
+        if self.wal is not None:
+            self._logged.lsn = self.wal.append(op, **fields)
+
+    def _durable(self):
+        """
+        Espera a que el último cambio que registró este hilo esté en disco
+        (con fsync="batch", en el próximo group commit). Se llama al soltar
+        los locks y antes de confirmarle el cambio a quien llamó, así los
+        que esperan a la vez comparten el mismo fsync.
+        """
+        lsn = getattr(self._logged, "lsn", 0)
+        if lsn:
+            self._logged.lsn = 0
+            self.wal.wait_synced(lsn)
+
+    @contextmanager
+    def _changing(self):
+        """
+        Marca un cambio en curso: su registro en el log y su aplicación
+        (incluida la reserva de stock previa). La compactación solo captura
+        el estado cuando no hay ninguno, así el snapshot incluye exactamente
+        los registros hasta su lsn. Al terminar, si el log creció lo
+        suficiente, se pide una compactación (corre en otro hilo: quien
+        llama puede estar tomando locks).
+        """
+        if self.wal is None:
+            yield
+            return
+        with self._wal_gate:
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._wal_gate:
+                self._in_flight -= 1
+                if not self._in_flight:
+                    self._wal_gate.notify_all()
+        if self.wal.size() >= self.compact_bytes:
+            self.compact_log()
+
+    def _replay_wal(self):
+        """Aplica los cambios registrados después del último snapshot"""
+        appliers = {
+            "add": lambda r: self._apply_add(r["code"], r["name"], r["price"],
+                                             r["stock"], r["category"]),
+            "update": lambda r: self._apply_update(r["code"], r["price"], r["stock"]),
+            "delete": lambda r: self._apply_delete(r["code"]),
+            "order": lambda r: self._apply_order(r["customer"], r["codes"], r["tier"]),
+            "orders": lambda r: [self._apply_order(*order) for order in r["orders"]],
+            "escalate": lambda r: self._apply_escalate(r["number"], r["priority"]),
+            "complete": lambda r: self._apply_complete(r["number"]),
+            "cancel": lambda r: self._apply_cancel(r["number"]),
+            "category": lambda r: self._apply_category(r["name"], r["parent"]),
+        }
+        count = 0
+        for _, record in self.wal.replay(after_lsn=self._snapshot_lsn):
+            appliers[record["op"]](record)
+            count += 1
+
+        # Los workers pueden completar pedidos en otro orden que el de la
+        # cola: al final se quitan de la cola los que ya no están pendientes
+        queued = self.order_queue.dequeue_many(self.order_queue.size())
+        for order in queued:
+            if order.status == "pendiente":
+                self.order_queue.enqueue(order)
+
+        if count:
+            self._emit(INFO, "wal_recovered", "✓ {count} cambios recuperados del log", count=count)
+
+        # Una compactación anterior quedó a medias: completarla ahora
+        if os.path.exists(self.wal.old_path):
+            self.compact_log(background=False)
+
+    def compact_log(self, background=True):
+        """
+        Guarda el estado actual en el snapshot y descarta el log ya incluido.
+        Con background (lo normal: la pide _changing al crecer el log) corre
+        en un hilo aparte, y no hace nada si ya hay una en curso.
+        """
+        if not background:
+            self._compact()
+            return
+        with self._wal_gate:
+            if self._compaction is not None and self._compaction.is_alive():
+                return
+            self._compaction = threading.Thread(target=self._compact, daemon=True)
+            self._compaction.start()
+
+    def _compact(self):
+        # El estado se copia cuando no hay cambios a medio aplicar (los
+        # nuevos esperan esa copia): así coincide con el log hasta last_lsn.
+        # Armar y escribir el snapshot se hace después, sin frenar cambios.
+        with self._wal_gate:
+            self._wal_gate.wait_for(lambda: not self._in_flight)
+            if os.path.exists(self.wal.old_path):
+                # Una compactación anterior quedó a medias: el estado ya
+                # incluye el segmento viejo
+                last_lsn = self.wal.last_lsn
+            else:
+                last_lsn = self.wal.rotate()
+            state = self._capture_state()
+        write_encoded(self.snapshot_path, self._encode_state(state, last_lsn))
+        self.wal.discard_old()
+
+    def _capture_state(self):
+        """
+        Copia de los valores del estado (los productos y pedidos siguen
+        cambiando después): contador, categorías, productos y pedidos
+        """
+        products = [(p.code, p.name, p.price, p.stock, p.category)
+                    for p in self.products.list_all()]
+        orders = [(o.order_number, o.customer, list(o.products), o.tier, o.priority)
+                  for o in self.pending_order_list()]
+        return self.order_counter, self.category_tree.categories(), products, orders
+
+    def _encode_state(self, state, last_lsn):
+        order_counter, categories, products, orders = state
+        return encode(order_counter, categories,
+                      (Product(*values) for values in products),
+                      (Order(*values) for values in orders), last_lsn)
+
+    def close(self):
+        """Sincroniza el log, espera una compactación en curso y cierra el archivo de pedidos"""
+        if self._compaction is not None:
+            self._compaction.join()
+        if self.wal is not None:
+            self.wal.close()
+        if self.archive is not None:
+            self.archive.close()
+
+    # CATEGORÍAS JERÁRQUICAS
+    
+    def create_category(self, name, parent=None):
+        """
+        Crea una nueva categoría en el árbol. Retorna False si el padre no
+        existe o si ya hay una categoría con ese nombre.
+        """
+        if parent is not None and self.category_tree.search(parent) is None:
+            self._emit(DEBUG, "category_parent_not_found",
+                       "Categoría padre no encontrada: {parent}", parent=parent)
+            return False
+        if self.category_tree.search(name) is not None:
+            self._emit(DEBUG, "category_exists", "La categoría ya existe: {name}", name=name)
+            return False
+        with self._changing():
+            self._log("category", name=name, parent=parent)
+            # Otro hilo pudo crearla entre la verificación y el registro: al
+            # reproducir el log, ese registro tampoco agrega nada
+            created = self._apply_category(name, parent)
+        self._durable()
+        if created:
+            self._emit(DEBUG, "category_created", "Categoría '{name}' creada", name=name)
+        return created
+
+    def _apply_category(self, name, parent):
+        # Cambia el subárbol de la categoría nueva y de todos sus ancestros
+        if not self.category_tree.add(name, parent):
+            return False
+        for category in self.category_tree.ancestors(name):
+            self.tree_cache.invalidate(category)
+        return True
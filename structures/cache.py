@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Caché acotado: al llenarse descarta el elemento usado hace más tiempo
+    (LRU). Con ttl (segundos), además, cada elemento vence ese tiempo
+    después de guardarse. Es seguro para varios hilos.
+
+    get_or_load hace de caché "read-through": si la clave no está, llama
+    al loader y guarda el resultado. Cada invalidación aumenta un número
+    de generación; si hubo una mientras el loader calculaba, el resultado
+    (quizás viejo) se retorna pero no se guarda.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()  # clave -> (valor, vencimiento o None)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _lookup(self, key):
+        """Valor vigente de key (o _MISSING), actualizando contadores y orden"""
+        entry = self._data.get(key)
+        if entry is not None:
+            value, expires = entry
+            if expires is None or expires > self.clock():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+            self.expirations += 1
+        self.misses += 1
+        return _MISSING
+
+    def _store(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires = self.clock() + self.ttl if self.ttl is not None else None
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def put(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_load(self, key, loader):
+        """Retorna el valor de key; si no está (o venció), lo calcula con loader()"""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+            generation = self._generation
+        value = loader()
+        with self._lock:
+            if self._generation == generation:
+                self._store(key, value)
+        return value
+
+    def invalidate(self, key):
+        """Quita key del caché. Retorna True si estaba."""
+        with self._lock:
+            self._generation += 1
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+                return True
+            return False
+
+    def invalidate_where(self, predicate):
+        """Quita las claves para las que predicate(clave) es verdadero. Retorna cuántas."""
+        with self._lock:
+            self._generation += 1
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def keys(self):
+        with self._lock:
+            return list(self._data)
+
+    def stats(self):
+        """Contadores del caché y porcentaje de aciertos"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > self.clock())
+
+    def __str__(self):
+        return f"LRUCache({len(self._data)}/{self.maxsize} elementos)"
+
+
+if __name__ == "__main__":
+    print("=== Prueba de Caché LRU ===\n")
+
+    cache = LRUCache(maxsize=2)
+    cache.put("BAT001", "Batman: Año Uno")
+    cache.put("SUP001", "Superman: Red Son")
+    print("Buscar BAT001:", cache.get("BAT001"))
+
+    # SUP001 es el usado hace más tiempo: se descarta al agregar otro
+    cache.put("SM002", "Spider-Man: Blue")
+    print("Buscar SUP001 (descartado):", cache.get("SUP001"))
+    print("Cargar SUP001:", cache.get_or_load("SUP001", lambda: "Superman: Red Son"))
+    print(cache, cache.stats())
+
+    print("\nCon vencimiento de 0.05 segundos...")
+    timed = LRUCache(maxsize=10, ttl=0.05)
+    timed.put("BAT001", "Batman: Año Uno")
+    print("Enseguida:", timed.get("BAT001"))
+    time.sleep(0.06)
+    print("Después de vencer:", timed.get("BAT001"))
+    print("Estadísticas:", timed.stats())
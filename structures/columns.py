@@ -0,0 +1,228 @@
+from array import array
+from operator import mul
+
+
+class LooseValues:
+    """
+    Precio, stock y categoría de un producto que no está en ningún
+    ColumnStore (misma interfaz que las columnas; la fila se ignora)
+    """
+    __slots__ = ("price", "stock", "category")
+
+    def __init__(self, price, stock, category):
+        self.price = price
+        self.stock = stock
+        self.category = category
+
+    def price_at(self, row):
+        return self.price
+
+    def stock_at(self, row):
+        return self.stock
+
+    def category_at(self, row):
+        return self.category
+
+    def set_price_at(self, row, price):
+        self.price = price
+
+    def set_stock_at(self, row, stock):
+        self.stock = stock
+
+
+class ColumnStore:
+    """
+    Almacenamiento columnar de precio, stock y categoría.
+    Cada producto ocupa una fila (row id) en arreglos compactos (array de
+    C, 8 bytes por precio y stock y 4 por categoría) en lugar de objetos
+    de Python. Las filas de productos eliminados se ponen en cero (y la
+    categoría en -1) y se reutilizan, así los totales se calculan
+    recorriendo las columnas completas con funciones de C (sum, map) sin
+    crear objetos intermedios.
+    La categoría se guarda como un id numérico estable (el orden en que
+    apareció cada nombre, ver category_names). La columna de precios es de
+    floats: int_prices (1 byte por fila) recuerda si el precio era int,
+    así se lee con el mismo tipo con que se guardó.
+
+    Los Product de un Store no guardan precio, stock ni categoría: son
+    una vista sobre su fila (attach). Leer product.stock lee la columna y
+    asignarlo la escribe, así no hay dos copias que mantener iguales.
+    Esas escrituras por fila no marcan la fila para changes(): el stock se
+    cambia con el lock de cada producto y no con el que protege changes(),
+    así que quien escribe la marca después con touch().
+    """
+
+    def __init__(self):
+        self.rows = {}               # código -> fila
+        self.codes = []              # fila -> código (None si está libre)
+        self.prices = array("d")
+        self.int_prices = array("b")  # 1 si el precio de la fila es int
+        self.stocks = array("q")
+        self.categories = array("i")
+        self.category_ids = {}       # nombre -> id
+        self.category_names = []     # id -> nombre
+        self._free = []              # filas libres para reutilizar
+        # Filas cambiadas desde la última llamada a changes() (None hasta
+        # que alguien las pida, así nadie paga por seguirlas sin usarlas)
+        self._changed = None
+
+    def category_id(self, name):
+        """Id de la categoría (se asigna la primera vez que aparece)"""
+        category = self.category_ids.get(name)
+        if category is None:
+            category = self.category_ids[name] = len(self.category_names)
+            self.category_names.append(name)
+        return category
+
+    def set(self, code, price, stock, category=None):
+        """Crea o actualiza la fila del producto. Retorna el row id."""
+        row = self.rows.get(code)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+                self.codes[row] = code
+            else:
+                row = len(self.prices)
+                self.prices.append(0.0)
+                self.int_prices.append(0)
+                self.stocks.append(0)
+                self.categories.append(-1)
+                self.codes.append(code)
+            self.rows[code] = row
+        self.set_price_at(row, price)
+        self.stocks[row] = stock
+        if category is not None:
+            self.categories[row] = self.category_id(category)
+        if self._changed is not None:
+            self._changed.add(row)
+        return row
+
+    def set_price(self, code, price):
+        row = self.rows[code]
+        self.set_price_at(row, price)
+        if self._changed is not None:
+            self._changed.add(row)
+
+    def set_stock(self, code, stock):
+        row = self.rows[code]
+        self.stocks[row] = stock
+        if self._changed is not None:
+            self._changed.add(row)
+
+    # VISTA DE LOS PRODUCTOS (Product.price, stock y category)
+
+    def price_at(self, row):
+        price = self.prices[row]
+        # Con un cambio de precio a medio escribir el tipo puede ser el del
+        # otro valor: solo se convierten los enteros, así nunca se redondea
+        return int(price) if self.int_prices[row] and price.is_integer() else price
+
+    def stock_at(self, row):
+        return self.stocks[row]
+
+    def category_at(self, row):
+        category = self.categories[row]
+        return self.category_names[category] if category >= 0 else None
+
+    def set_price_at(self, row, price):
+        self.int_prices[row] = isinstance(price, int)
+        self.prices[row] = price
+
+    def set_stock_at(self, row, stock):
+        self.stocks[row] = stock
+
+    def touch(self, code):
+        """Marca la fila del producto como cambiada (ver changes)"""
+        row = self.rows.get(code)
+        if row is not None and self._changed is not None:
+            self._changed.add(row)
+
+    def attach(self, product):
+        """
+        Pasa el precio, el stock y la categoría del producto a su fila y lo
+        convierte en una vista sobre ella. Retorna el row id.
+        """
+        row = self.set(product.code, product.price, product.stock, product.category)
+        # Primero la fila y después las columnas: quien lea en el medio
+        # todavía ve los valores sueltos, que no usan la fila
+        product._row = row
+        product._columns = self
+        return row
+
+    def detach(self, product):
+        """
+        Libera la fila del producto; el objeto se queda con una copia de sus
+        valores (lo pueden seguir usando pedidos o cachés).
+        """
+        if product._columns is not self:
+            return False
+        # Un solo cambio de atributo: quien lea ve la fila o la copia, nunca
+        # una mezcla. La fila se libera recién después.
+        product._columns = LooseValues(product.price, product.stock, product.category)
+        return self.remove(product.code)
+
+    def remove(self, code):
+        """Libera la fila del producto. Retorna True si existía."""
+        row = self.rows.pop(code, None)
+        if row is None:
+            return False
+        self.prices[row] = 0.0
+        self.int_prices[row] = 0
+        self.stocks[row] = 0
+        self.categories[row] = -1
+        self.codes[row] = None
+        self._free.append(row)
+        if self._changed is not None:
+            self._changed.add(row)
+        return True
+
+    def changes(self):
+        """
+        Filas creadas, modificadas o liberadas desde la llamada anterior.
+        La primera llamada retorna None (todavía no se seguían: hay que
+        leer todo) y desde ahí se empiezan a registrar.
+        """
+        changed, self._changed = self._changed, set()
+        return changed
+
+    def category(self, code):
+        category = self.categories[self.rows[code]]
+        return self.category_names[category] if category >= 0 else None
+
+    def price(self, code):
+        return self.prices[self.rows[code]]
+
+    def stock(self, code):
+        return self.stocks[self.rows[code]]
+
+    def total_stock(self):
+        """Unidades totales en inventario"""
+        return sum(self.stocks)
+
+    def total_value(self):
+        """Valor total del inventario (precio * stock de cada fila)"""
+        return sum(map(mul, self.prices, self.stocks))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __str__(self):
+        return f"ColumnStore({len(self.rows)} productos, {len(self.prices)} filas)"
+
+
+if __name__ == "__main__":
+    print("=== Prueba de ColumnStore ===\n")
+
+    columns = ColumnStore()
+    columns.set("BAT001", 3500, 10, "Batman")
+    columns.set("SUP001", 3800, 8, "Superman")
+    columns.set("SPI001", 2900, 12, "Spider-Man")
+
+    print(columns)
+    print("Unidades totales:", columns.total_stock())
+    print("Valor del inventario:", columns.total_value())
+
+    columns.remove("SUP001")
+    columns.set("XMN001", 4100, 2, "X-Men")  # Reutiliza la fila de SUP001
+    print("\nDespués de eliminar SUP001 y agregar XMN001:", columns)
+    print("Valor del inventario:", columns.total_value())
@@ -1,64 +1,246 @@
+import threading
+import weakref
+from array import array
+
+FNV_OFFSET = 0xcbf29ce484222325
+FNV_PRIME = 0x100000001b3
+MASK_64 = 0xffffffffffffffff
+
+
+def hash_key(key):
+    """
+    Función hash FNV-1a de 64 bits sobre los bytes UTF-8 de la clave.
+    A diferencia de sumar los valores ASCII, distingue el orden de los
+    caracteres ("BAT010" y "BAT001" dan valores muy distintos) y reparte
+    bien los códigos de producto entre los buckets.
+    """
+    h = FNV_OFFSET
+    for byte in str(key).encode("utf-8"):
+        h ^= byte
+        h = (h * FNV_PRIME) & MASK_64
+    return h
+
+
 class HashTable:
-    def __init__(self, size=100):
+    def __new__(cls, *args, storage="chaining", **kwargs):
+        """
+        Elige el motor de almacenamiento:
+        - "chaining": lista de buckets con tuplas (clave, valor)
+        - "open": direccionamiento abierto sobre arreglos paralelos
+        - "persistent": trie de hashes persistente (HAMT) con snapshots O(1)
         """
-        Inicializa la tabla hash con un tamaño fijo.
+        if cls is HashTable and storage == "open":
+            cls = OpenAddressingHashTable
+        elif cls is HashTable and storage == "persistent":
+            cls = PersistentHashTable
+        elif storage not in ("chaining", "open", "persistent"):
+            raise ValueError(f"Motor de almacenamiento desconocido: {storage}")
+        return super().__new__(cls)
+
+    def __init__(self, size=100, max_load=0.75, min_load=0.1, rehash_step=4,
+                 storage="chaining"):
+        """
+        Inicializa la tabla hash con un tamaño inicial.
         Usa una lista de listas para manejar colisiones (chaining).
+
+        La tabla crece cuando el factor de carga supera max_load y se
+        achica cuando baja de min_load (nunca por debajo del tamaño
+        inicial). El rehash es incremental: cada escritura mueve unos
+        pocos buckets (rehash_step) de la tabla vieja a la nueva, así
+        ninguna inserción tiene que copiar toda la tabla de una vez.
+
+        Concurrencia: las escrituras (insert, delete) deben hacerse de a
+        una (el Store las hace con su lock), pero search se puede llamar
+        desde cualquier hilo a la vez que ellas, sin lock: las lecturas no
+        modifican la tabla. Cada cambio de estructura (empezar un rehash,
+        mover buckets, borrar) incrementa _version antes y después; una
+        búsqueda que no encuentra la clave y vio cambiar _version (o lo
+        vio impar, con un cambio a medias) se repite.
         """
         self.size = size
         self.table = [[] for _ in range(size)]
-    
-    def _hash(self, key):
+        self.count = 0
+        self.min_size = size
+        self.max_load = max_load
+        self.min_load = min_load
+        self.rehash_step = rehash_step
+
+        # Estado del rehash incremental (None si no hay uno en curso)
+        self._old_table = None
+        self._old_size = 0
+        self._rehash_index = 0
+
+        # Impar mientras un cambio de estructura está a medias
+        self._version = 0
+
+    def _hash(self, key, size=None):
+        """
+        Convierte la clave en un índice válido de la tabla.
+        Por defecto usa el tamaño de la tabla actual.
+        """
+        return hash_key(key) % (size or self.size)
+
+    def load_factor(self):
+        """Cantidad de elementos por bucket"""
+        return self.count / self.size
+
+    def is_rehashing(self):
+        return self._old_table is not None
+
+    def _start_resize(self, new_size):
+        """Crea la tabla nueva y deja la actual como tabla vieja a migrar"""
+        if self.is_rehashing():
+            self._finish_rehash()
+        table = [[] for _ in range(new_size)]
+        self._version += 1
+        # La tabla vieja se publica antes que la nueva: una búsqueda que ya
+        # ve la nueva (vacía) también ve la vieja
+        self._old_table = self.table
+        self._old_size = self.size
+        self._rehash_index = 0
+        self.size = new_size
+        self.table = table
+        self._version += 1
+
+    def _rehash_some(self, steps):
+        """Migra hasta 'steps' buckets de la tabla vieja a la nueva"""
+        old_table = self._old_table
+        self._version += 1
+        while steps > 0 and self._rehash_index < self._old_size:
+            bucket = old_table[self._rehash_index]
+            # Primero se copia a la tabla nueva y después se vacía el bucket viejo
+            for key, value in bucket:
+                self.table[self._hash(key)].append((key, value))
+            old_table[self._rehash_index] = None
+            self._rehash_index += 1
+            steps -= 1
+
+        if self._rehash_index >= self._old_size:
+            self._old_table = None
+            self._old_size = 0
+            self._rehash_index = 0
+        self._version += 1
+
+    def _finish_rehash(self):
+        while self.is_rehashing():
+            self._rehash_some(self._old_size)
+
+    def _old_bucket(self, key):
         """
-        Función hash simple: suma los valores ASCII y aplica módulo.
-        Esto convierte la clave en un índice válido de la tabla.
+        Retorna el bucket de la tabla vieja donde puede estar la clave,
+        o None si ese bucket ya fue migrado (o no hay rehash en curso).
         """
-        sum_val = 0
-        for char in str(key):
-            sum_val += ord(char)
-        return sum_val % self.size
-    
+        if self._old_table is None:
+            return None
+        index = self._hash(key, self._old_size)
+        if index < self._rehash_index:
+            return None
+        return self._old_table[index]
+
+    def _check_resize(self):
+        if self.is_rehashing():
+            return
+        if self.count > self.size * self.max_load:
+            self._start_resize(self.size * 2)
+        elif self.size > self.min_size and self.count < self.size * self.min_load:
+            self._start_resize(max(self.min_size, self.size // 2))
+
     def insert(self, key, value):
         """
         Inserta un par clave-valor en la tabla hash.
         Si la clave ya existe, actualiza el valor.
         """
+        if self._old_table is not None:
+            self._rehash_some(self.rehash_step)
+
+        old_bucket = self._old_bucket(key)
+        if old_bucket:
+            for i, (k, v) in enumerate(old_bucket):
+                if k == key:
+                    old_bucket[i] = (key, value)
+                    return
+
         index = self._hash(key)
-        
+
         for i, (k, v) in enumerate(self.table[index]):
             if k == key:
                 self.table[index][i] = (key, value)
                 return
-        
+
         self.table[index].append((key, value))
-    
+        self.count += 1
+        self._check_resize()
+
     def search(self, key):
         """
         Busca un valor por su clave.
         Retorna el valor si existe, None si no se encuentra.
-        Complejidad: O(1) promedio
+        Complejidad: O(1) promedio. No modifica la tabla (ver __init__).
         """
-        index = self._hash(key)
-        
-        for k, v in self.table[index]:
+        h = hash_key(key)
+        while True:
+            version = self._version
+            # El índice sale del largo de cada tabla leída, no de self.size:
+            # así nunca se mezclan una tabla y el tamaño de otra
+            table = self.table
+            for k, v in table[h % len(table)]:
+                if k == key:
+                    return v
+
+            old_table = self._old_table
+            if old_table is not None:
+                index = h % len(old_table)
+                if index >= self._rehash_index:
+                    for k, v in old_table[index] or ():
+                        if k == key:
+                            return v
+
+            if version == self._version and not version & 1:
+                return None
+
+    def probe_length(self, key):
+        """
+        Cuántos elementos compara una búsqueda de key: su posición en la
+        cadena (más la cadena de la tabla vieja si hay rehash en curso),
+        o todo lo recorrido si no está. Lo usa la instrumentación (metrics.py).
+        """
+        chain = self.table[self._hash(key)]
+        for i, (k, _) in enumerate(chain):
             if k == key:
-                return v
-        
-        return None
-    
+                return i + 1
+        old_bucket = self._old_bucket(key) or []
+        for i, (k, _) in enumerate(old_bucket):
+            if k == key:
+                return len(chain) + i + 1
+        return len(chain) + len(old_bucket)
+
     def delete(self, key):
         """
         Elimina un par clave-valor de la tabla.
         Retorna True si se eliminó, False si no existía.
         """
+        if self._old_table is not None:
+            self._rehash_some(self.rehash_step)
+
         index = self._hash(key)
-        
-        for i, (k, v) in enumerate(self.table[index]):
-            if k == key:
-                del self.table[index][i]
-                return True
-        
+        buckets = [self.table[index], self._old_bucket(key)]
+
+        for bucket in buckets:
+            if not bucket:
+                continue
+            for i, (k, v) in enumerate(bucket):
+                if k == key:
+                    # Borrar corre los elementos siguientes del bucket: una
+                    # búsqueda que lo recorre en ese momento puede saltear uno
+                    self._version += 1
+                    del bucket[i]
+                    self._version += 1
+                    self.count -= 1
+                    self._check_resize()
+                    return True
+
         return False
-    
+
     def list_all(self):
         """
         Retorna una lista con todos los valores almacenados.
@@ -68,26 +250,655 @@ class HashTable:
         for list_item in self.table:
             for key, value in list_item:
                 values.append(value)
+        if self._old_table is not None:
+            for list_item in self._old_table[self._rehash_index:]:
+                for key, value in list_item:
+                    values.append(value)
         return values
-    
+
+    def iter_items(self):
+        """
+        Recorre los pares (clave, valor) sin armar una lista intermedia.
+        Como con un dict, la tabla no se debe modificar mientras se recorre.
+        """
+        for bucket in self.table:
+            yield from bucket
+        if self._old_table is not None:
+            for bucket in self._old_table[self._rehash_index:]:
+                yield from bucket
+
+    def __iter__(self):
+        """Recorre los valores almacenados (igual que list_all, pero de a uno)"""
+        for _, value in self.iter_items():
+            yield value
+
+    def snapshot(self):
+        """
+        Copia de solo lectura del contenido actual (HashTableSnapshot).
+        Acá cuesta O(n) y nadie debe modificar la tabla mientras se copia;
+        con storage="persistent" es O(1) y no hace falta frenar a nadie.
+        """
+        copy = PersistentHashTable()
+        for key, value in self.iter_items():
+            copy.insert(key, value)
+        return copy.snapshot()
+
+    def stats(self):
+        """
+        Estadísticas de distribución de los buckets.
+        Sirve para verificar que los códigos reales no colisionan de más.
+        Si hay un rehash en curso no lo completa: también cuenta como
+        cadenas los buckets de la tabla vieja que faltan migrar.
+        """
+        lengths = [len(bucket) for bucket in self.table]
+        if self._old_table is not None:
+            lengths += [len(bucket) for bucket in self._old_table[self._rehash_index:]]
+        used = [n for n in lengths if n > 0]
+        return {
+            "size": self.size,
+            "elements": self.count,
+            "load_factor": round(self.load_factor(), 4),
+            "used_buckets": len(used),
+            "empty_buckets": len(lengths) - len(used),
+            "collisions": sum(n - 1 for n in used),
+            "max_chain": max(lengths) if lengths else 0,
+            "avg_chain": round(sum(used) / len(used), 4) if used else 0.0,
+        }
+
+    def counters(self):
+        """
+        Contadores en O(1) (stats recorre todos los buckets): para
+        consultarlos seguido, por ejemplo desde las métricas.
+        rehash_pending son los buckets viejos que faltan migrar.
+        """
+        rehashing = self._old_table is not None
+        return {
+            "size": self.size,
+            "elements": self.count,
+            "load_factor": round(self.load_factor(), 4),
+            "rehash_pending": max(0, self._old_size - self._rehash_index) if rehashing else 0,
+        }
+
+    def __len__(self):
+        return self.count
+
     def __str__(self):
         """Representación en string de la tabla hash"""
-        return f"HashTable(elements={len(self.list_all())})"
+        return f"HashTable(elements={self.count}, size={self.size})"
+
+
+# Marcadores de slot para el direccionamiento abierto
+_EMPTY = object()
+_DELETED = object()
+
+
+class OpenAddressingHashTable(HashTable):
+    """
+    Tabla hash con direccionamiento abierto (linear probing).
+    Guarda claves, valores y hashes en tres arreglos paralelos, sin una
+    lista ni una tupla por elemento. Los borrados dejan una lápida
+    (_DELETED) para no cortar las secuencias de sondeo; las lápidas se
+    limpian al redimensionar.
+    Se crea con HashTable(storage="open") y mantiene la misma API, con las
+    mismas reglas de concurrencia: escrituras de a una y búsquedas desde
+    cualquier hilo sin lock.
+    """
+
+    def __init__(self, size=100, max_load=0.6, min_load=0.1, rehash_step=4,
+                 storage="open"):
+        capacity = 8
+        while capacity < size:
+            capacity *= 2
+        self.min_size = capacity
+        self.max_load = max_load
+        self.min_load = min_load
+        self.count = 0
+        self._version = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.size = capacity
+        self._mask = capacity - 1
+        self._keys = [_EMPTY] * capacity
+        self._values = [None] * capacity
+        self._hashes = array("Q", bytes(8 * capacity))
+        self._tombstones = 0
+        # Los tres arreglos juntos: search los lee de una vez y no mezcla
+        # los de antes y después de un resize
+        self._slots = (self._keys, self._values, self._hashes)
+
+    def _resize(self, capacity):
+        """Reubica todos los elementos usando los hashes ya calculados"""
+        keys, values, hashes = self._keys, self._values, self._hashes
+        self._version += 1
+        self._allocate(capacity)
+        new_keys, new_values, new_hashes = self._keys, self._values, self._hashes
+        mask = self._mask
+        for i, key in enumerate(keys):
+            if key is _EMPTY or key is _DELETED:
+                continue
+            h = hashes[i]
+            j = h & mask
+            while new_keys[j] is not _EMPTY:
+                j = (j + 1) & mask
+            new_keys[j] = key
+            new_values[j] = values[i]
+            new_hashes[j] = h
+        self._version += 1
+
+    def _find(self, key, h):
+        """Retorna el slot donde está la clave, o -1 si no existe"""
+        keys, hashes, mask = self._keys, self._hashes, self._mask
+        i = h & mask
+        while True:
+            k = keys[i]
+            if k is _EMPTY:
+                return -1
+            if k is not _DELETED and hashes[i] == h and k == key:
+                return i
+            i = (i + 1) & mask
+
+    def is_rehashing(self):
+        return False
+
+    def insert(self, key, value):
+        """
+        Inserta un par clave-valor en la tabla hash.
+        Si la clave ya existe, actualiza el valor.
+        """
+        h = hash_key(key)
+        keys, hashes, mask = self._keys, self._hashes, self._mask
+        i = h & mask
+        free = -1
+        while True:
+            k = keys[i]
+            if k is _EMPTY:
+                break
+            if k is _DELETED:
+                if free < 0:
+                    free = i
+            elif hashes[i] == h and k == key:
+                self._values[i] = value
+                return
+            i = (i + 1) & mask
+
+        if free >= 0:
+            i = free
+            self._tombstones -= 1
+        # La clave va última: una búsqueda que la ve ya tiene su valor y hash
+        self._values[i] = value
+        hashes[i] = h
+        keys[i] = key
+        self.count += 1
+
+        if self.count + self._tombstones > self.size * self.max_load:
+            if self.count > self.size * self.max_load / 2:
+                self._resize(self.size * 2)
+            else:
+                self._resize(self.size)
+
+    def search(self, key):
+        """
+        Busca un valor por su clave.
+        Retorna el valor si existe, None si no se encuentra.
+        """
+        h = hash_key(key)
+        while True:
+            version = self._version
+            keys, values, hashes = self._slots
+            mask = len(keys) - 1
+            i = h & mask
+            while True:
+                k = keys[i]
+                if k is _EMPTY:
+                    break
+                if k is not _DELETED and hashes[i] == h and k == key:
+                    return values[i]
+                i = (i + 1) & mask
+            if version == self._version and not version & 1:
+                return None
+
+    def probe_length(self, key):
+        """Slots que recorre una búsqueda de key (hasta encontrarla o un slot vacío)"""
+        keys, hashes, mask = self._keys, self._hashes, self._mask
+        h = hash_key(key)
+        i = h & mask
+        probes = 1
+        while True:
+            k = keys[i]
+            if k is _EMPTY or (k is not _DELETED and hashes[i] == h and k == key):
+                return probes
+            i = (i + 1) & mask
+            probes += 1
+
+    def delete(self, key):
+        """
+        Elimina un par clave-valor de la tabla dejando una lápida.
+        Retorna True si se eliminó, False si no existía.
+        """
+        i = self._find(key, hash_key(key))
+        if i < 0:
+            return False
+        self._version += 1
+        self._keys[i] = _DELETED
+        self._values[i] = None
+        self._version += 1
+        self.count -= 1
+        self._tombstones += 1
+
+        if self.size > self.min_size and self.count < self.size * self.min_load:
+            self._resize(max(self.min_size, self.size // 2))
+        return True
+
+    def list_all(self):
+        """Retorna una lista con todos los valores almacenados."""
+        return [self._values[i] for i, key in enumerate(self._keys)
+                if key is not _EMPTY and key is not _DELETED]
+
+    def iter_items(self):
+        """Recorre los pares (clave, valor) sin armar una lista intermedia."""
+        values = self._values
+        for i, key in enumerate(self._keys):
+            if key is not _EMPTY and key is not _DELETED:
+                yield key, values[i]
+
+    def stats(self):
+        """
+        Estadísticas de sondeo: cuántos slots hay que recorrer desde el
+        slot ideal de cada clave hasta encontrarla.
+        """
+        mask = self._mask
+        probes = []
+        for i, key in enumerate(self._keys):
+            if key is _EMPTY or key is _DELETED:
+                continue
+            probes.append(((i - self._hashes[i]) & mask) + 1)
+        return {
+            "size": self.size,
+            "elements": self.count,
+            "load_factor": round(self.load_factor(), 4),
+            "tombstones": self._tombstones,
+            "collisions": sum(1 for p in probes if p > 1),
+            "max_probe": max(probes) if probes else 0,
+            "avg_probe": round(sum(probes) / len(probes), 4) if probes else 0.0,
+        }
+
+    def counters(self):
+        """Contadores en O(1) (ver HashTable.counters)"""
+        return {
+            "size": self.size,
+            "elements": self.count,
+            "load_factor": round(self.load_factor(), 4),
+            "tombstones": self._tombstones,
+        }
+
+    def __str__(self):
+        return f"HashTable(elements={self.count}, size={self.size}, storage=open)"
+
+
+# Trie de hashes persistente (HAMT). Cada nivel usa 5 bits del hash FNV:
+# un nodo tiene un bitmap de 32 bits con los hijos presentes y una tupla
+# solo con esos hijos. Un hijo es otro nodo, una hoja (hash, clave, valor)
+# o un _Collision con las claves que comparten los 64 bits del hash.
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_MISSING = object()
+
+
+class _Node:
+    __slots__ = ("bitmap", "children")
+
+    def __init__(self, bitmap, children):
+        self.bitmap = bitmap
+        self.children = children
+
+
+class _Collision:
+    __slots__ = ("hash", "pairs")
+
+    def __init__(self, h, pairs):
+        self.hash = h
+        self.pairs = pairs
+
+
+_EMPTY_NODE = _Node(0, ())
+
+
+# int.bit_count existe desde Python 3.10 y es varias veces más rápido
+_popcount = getattr(int, "bit_count", None) or (lambda n: bin(n).count("1"))
+
+
+def _position(bitmap, bit):
+    """Posición del hijo en la tupla: cuántos hijos hay antes de bit"""
+    return _popcount(bitmap & (bit - 1))
+
+
+def _find(node, h, key):
+    while True:
+        bit = 1 << (h & _MASK)
+        bitmap = node.bitmap
+        if not bitmap & bit:
+            return _MISSING
+        child = node.children[_popcount(bitmap & (bit - 1))]
+        if type(child) is _Node:
+            node = child
+            h >>= _BITS
+        elif type(child) is tuple:
+            return child[2] if child[1] == key else _MISSING
+        else:
+            for k, v in child.pairs:
+                if k == key:
+                    return v
+            return _MISSING
+
+
+def _merge(shift, h1, leaf1, h2, leaf2):
+    """Nodo(s) que separan dos hijos con hashes distintos desde el nivel shift"""
+    i1, i2 = (h1 >> shift) & _MASK, (h2 >> shift) & _MASK
+    if i1 == i2:
+        return _Node(1 << i1, (_merge(shift + _BITS, h1, leaf1, h2, leaf2),))
+    if i1 > i2:
+        i1, i2, leaf1, leaf2 = i2, i1, leaf2, leaf1
+    return _Node((1 << i1) | (1 << i2), (leaf1, leaf2))
+
+
+def _hash_of(child):
+    return child.hash if type(child) is _Collision else child[0]
+
+
+def _insert(node, shift, h, key, value):
+    """
+    Retorna (nodo nuevo, agregado). Solo se copian los nodos del camino
+    hasta la clave: el resto se comparte con la versión anterior.
+    """
+    bit = 1 << ((h >> shift) & _MASK)
+    index = _position(node.bitmap, bit)
+    children = node.children
+    if not node.bitmap & bit:
+        leaf = (h, key, value)
+        return _Node(node.bitmap | bit, children[:index] + (leaf,) + children[index:]), True
+
+    child = children[index]
+    if type(child) is _Node:
+        new_child, added = _insert(child, shift + _BITS, h, key, value)
+    elif type(child) is tuple and child[1] == key:
+        new_child, added = (h, key, value), False
+    elif _hash_of(child) != h:
+        new_child, added = _merge(shift + _BITS, _hash_of(child), child, h, (h, key, value)), True
+    elif type(child) is tuple:
+        new_child, added = _Collision(h, ((child[1], child[2]), (key, value))), True
+    else:
+        pairs = tuple(pair for pair in child.pairs if pair[0] != key)
+        added = len(pairs) == len(child.pairs)
+        new_child = _Collision(h, pairs + ((key, value),))
+    return _Node(node.bitmap, children[:index] + (new_child,) + children[index + 1:]), added
+
+
+def _delete(node, shift, h, key):
+    """
+    Retorna el nodo sin la clave (el mismo nodo si no estaba, None si
+    quedó vacío). Un nodo que queda con una sola hoja se reemplaza por
+    ella, así la forma del trie no depende del orden de los borrados.
+    """
+    bit = 1 << ((h >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node
+    index = _position(node.bitmap, bit)
+    children = node.children
+    child = children[index]
+
+    if type(child) is _Node:
+        new_child = _delete(child, shift + _BITS, h, key)
+        if new_child is child:
+            return node
+        if (new_child is not None and len(new_child.children) == 1
+                and type(new_child.children[0]) is not _Node):
+            new_child = new_child.children[0]
+    elif type(child) is tuple:
+        if child[1] != key:
+            return node
+        new_child = None
+    else:
+        pairs = tuple(pair for pair in child.pairs if pair[0] != key)
+        if len(pairs) == len(child.pairs):
+            return node
+        new_child = (h, *pairs[0]) if len(pairs) == 1 else _Collision(h, pairs)
+
+    if new_child is not None:
+        return _Node(node.bitmap, children[:index] + (new_child,) + children[index + 1:])
+    if len(children) == 1:
+        return None
+    return _Node(node.bitmap & ~bit, children[:index] + children[index + 1:])
+
+
+def _iter_items(node):
+    stack = [node]
+    while stack:
+        for child in stack.pop().children:
+            if type(child) is tuple:
+                yield child[1], child[2]
+            elif type(child) is _Node:
+                stack.append(child)
+            else:
+                yield from child.pairs
+
+
+class HashTableSnapshot:
+    """
+    Versión fija de una tabla: se consulta y se recorre sin locks mientras
+    la tabla sigue cambiando. Los nodos se comparten con la tabla; cuando
+    ya nadie usa el snapshot, los nodos que solo eran suyos se liberan
+    solos (recolección por conteo de referencias).
+    Los valores son los mismos objetos que tiene la tabla: si se modifican
+    en el lugar, el snapshot ve el cambio.
+    """
+    __slots__ = ("_root", "count", "version", "__weakref__")
+
+    def __init__(self, root, count, version):
+        self._root = root
+        self.count = count
+        self.version = version
+
+    def search(self, key):
+        value = _find(self._root, hash_key(key), key)
+        return None if value is _MISSING else value
+
+    def __contains__(self, key):
+        return _find(self._root, hash_key(key), key) is not _MISSING
+
+    def iter_items(self):
+        return _iter_items(self._root)
+
+    def __iter__(self):
+        for _, value in _iter_items(self._root):
+            yield value
+
+    def list_all(self):
+        return list(self)
+
+    def __len__(self):
+        return self.count
+
+    def __str__(self):
+        return f"HashTableSnapshot(elements={self.count}, version={self.version})"
+
+
+class PersistentHashTable(HashTable):
+    """
+    Tabla hash persistente (HAMT): cada cambio copia solo los nodos del
+    camino a la clave (unos pocos, el trie tiene log32(n) niveles) y
+    publica la raíz nueva de una sola vez. Las lecturas toman la raíz
+    vigente y no usan locks: un recorrido nunca ve un cambio a medias ni
+    se cruza con un rehash (no hay rehash). snapshot() es O(1).
+    Las escrituras se hacen de a una (lock interno).
+    Se crea con HashTable(storage="persistent") y mantiene la misma API.
+    """
+
+    def __init__(self, size=100, max_load=0.75, min_load=0.1, rehash_step=4,
+                 storage="persistent"):
+        # (raíz, cantidad, versión) en una sola tupla: un lector siempre
+        # ve las tres de la misma versión
+        self._state = (_EMPTY_NODE, 0, 0)
+        self._write_lock = threading.Lock()
+        self._snapshots = weakref.WeakSet()
+
+    @property
+    def count(self):
+        return self._state[1]
+
+    @property
+    def version(self):
+        """Cantidad de cambios aplicados desde que se creó la tabla"""
+        return self._state[2]
+
+    def is_rehashing(self):
+        return False
+
+    def load_factor(self):
+        return 0.0
+
+    def insert(self, key, value):
+        """
+        Inserta un par clave-valor en la tabla hash.
+        Si la clave ya existe, actualiza el valor.
+        """
+        h = hash_key(key)
+        with self._write_lock:
+            root, count, version = self._state
+            root, added = _insert(root, 0, h, key, value)
+            self._state = (root, count + added, version + 1)
+
+    def search(self, key):
+        """
+        Busca un valor por su clave.
+        Retorna el valor si existe, None si no se encuentra.
+        """
+        value = _find(self._state[0], hash_key(key), key)
+        return None if value is _MISSING else value
+
+    def probe_length(self, key):
+        """Nodos que recorre una búsqueda de key (más las claves de un _Collision)"""
+        node, h, probes = self._state[0], hash_key(key), 1
+        while True:
+            bit = 1 << (h & _MASK)
+            if not node.bitmap & bit:
+                return probes
+            child = node.children[_position(node.bitmap, bit)]
+            if type(child) is not _Node:
+                return probes + (len(child.pairs) if type(child) is _Collision else 0)
+            node, h, probes = child, h >> _BITS, probes + 1
+
+    def delete(self, key):
+        """
+        Elimina un par clave-valor de la tabla.
+        Retorna True si se eliminó, False si no existía.
+        """
+        h = hash_key(key)
+        with self._write_lock:
+            root, count, version = self._state
+            new_root = _delete(root, 0, h, key)
+            if new_root is root:
+                return False
+            self._state = (new_root or _EMPTY_NODE, count - 1, version + 1)
+            return True
+
+    def snapshot(self):
+        """Versión actual de la tabla, fija aunque la tabla siga cambiando (O(1))"""
+        snapshot = HashTableSnapshot(*self._state)
+        self._snapshots.add(snapshot)
+        return snapshot
+
+    def list_all(self):
+        """Retorna una lista con todos los valores (de una misma versión)."""
+        return [value for _, value in _iter_items(self._state[0])]
+
+    def iter_items(self):
+        """
+        Recorre los pares (clave, valor) de la versión vigente al empezar.
+        A diferencia de los otros motores, la tabla se puede modificar
+        mientras tanto: el recorrido no ve esos cambios.
+        """
+        return _iter_items(self._state[0])
+
+    def stats(self):
+        """Forma del trie: nodos, profundidad de las hojas y snapshots vivos"""
+        root, count, version = self._state
+        nodes, depths, collisions = 0, [], 0
+        stack = [(root, 1)]
+        while stack:
+            node, depth = stack.pop()
+            nodes += 1
+            for child in node.children:
+                if type(child) is _Node:
+                    stack.append((child, depth + 1))
+                else:
+                    depths.append(depth)
+                    if type(child) is _Collision:
+                        collisions += len(child.pairs) - 1
+        return {
+            "elements": count,
+            "nodes": nodes,
+            "version": version,
+            "live_snapshots": len(self._snapshots),
+            "collisions": collisions,
+            "max_depth": max(depths) if depths else 0,
+            "avg_depth": round(sum(depths) / len(depths), 4) if depths else 0.0,
+        }
+
+    def counters(self):
+        """Contadores sin recorrer el trie (ver HashTable.counters)"""
+        _, count, version = self._state
+        return {
+            "elements": count,
+            "version": version,
+            "live_snapshots": len(self._snapshots),
+        }
+
+    def __str__(self):
+        return f"HashTable(elements={self.count}, version={self.version}, storage=persistent)"
 
 if __name__ == "__main__":
     print("=== Prueba de Hash Table ===\n")
-    
+
     table = HashTable()
-    
+
     table.insert("BAT001", "Batman: Año Uno")
     table.insert("SUP001", "Superman: Red Son")
     table.insert("MAR001", "Spider-Man")
-    
+
     print("Buscar BAT001:", table.search("BAT001"))
     print("Buscar SUP001:", table.search("SUP001"))
     print("Buscar XXX999:", table.search("XXX999"))
-    
+
     print("\nEliminar SUP001:", table.delete("SUP001"))
     print("Buscar SUP001 después de eliminar:", table.search("SUP001"))
-    
-    print("\nTodos los elementos:", table.list_all())
\ No newline at end of file
+
+    print("\nTodos los elementos:", table.list_all())
+    print("Recorrido sin lista:", [key for key, _ in table.iter_items()])
+
+    print("\nInsertando 10000 códigos para probar el crecimiento...")
+    for i in range(10000):
+        table.insert(f"SKU{i:05d}", i)
+    print(table)
+    print("Estadísticas:", table.stats())
+
+    print("\nMisma prueba con direccionamiento abierto...")
+    open_table = HashTable(storage="open")
+    for i in range(10000):
+        open_table.insert(f"SKU{i:05d}", i)
+    print(open_table)
+    print("Buscar SKU00042:", open_table.search("SKU00042"))
+    print("Estadísticas:", open_table.stats())
+
+    print("\nTabla persistente con un snapshot tomado a mitad de la carga...")
+    persistent = HashTable(storage="persistent")
+    for i in range(5000):
+        persistent.insert(f"SKU{i:05d}", i)
+    snapshot = persistent.snapshot()
+    for i in range(5000, 10000):
+        persistent.insert(f"SKU{i:05d}", i)
+    persistent.delete("SKU00042")
+    print(persistent, "-", snapshot)
+    print("Buscar SKU00042 en la tabla:", persistent.search("SKU00042"),
+          "/ en el snapshot:", snapshot.search("SKU00042"))
+    print("Estadísticas:", persistent.stats())
@@ -0,0 +1,165 @@
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+
+class CategoryIndex:
+    """
+    Índice invertido categoría -> {código: producto}.
+    Permite obtener los productos de una categoría sin recorrer el inventario.
+    """
+
+    def __init__(self):
+        self.categories = {}
+
+    def add(self, category, code, value=None):
+        self.categories.setdefault(category, {})[code] = value
+
+    def remove(self, category, code):
+        codes = self.categories.get(category)
+        if codes is not None:
+            codes.pop(code, None)
+            if not codes:
+                del self.categories[category]
+
+    def codes(self, category):
+        """Retorna los códigos de la categoría ordenados"""
+        return sorted(self.categories.get(category, ()))
+
+    def get(self, category):
+        """Retorna los valores de la categoría ordenados por código"""
+        entries = self.categories.get(category, {})
+        return [entries[code] for code in sorted(entries)]
+
+    def count(self, category):
+        return len(self.categories.get(category, ()))
+
+    def __str__(self):
+        return f"CategoryIndex({len(self.categories)} categorías)"
+
+
+class SortedIndex:
+    """
+    Índice ordenado por una clave numérica (precio, stock, ...).
+    Guarda listas paralelas (clave, código, valor) ordenadas por
+    (clave, código), así las consultas por rango se resuelven con
+    búsqueda binaria (bisect) en O(log n + k), donde k es la cantidad
+    de resultados. Las claves solo tienen que ser comparables entre sí
+    (también sirve para ordenar por nombre o por código).
+    add inserta en el medio de las listas (O(n) por el desplazamiento):
+    sirve para los cambios de a uno; las cargas usan add_many.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.codes = []
+        self.values = []
+
+    def _position(self, key, code, after=False):
+        """
+        Posición de (key, code) dentro de las listas ordenadas; con
+        after=True, la posición siguiente a (key, code) si ya está.
+        """
+        lo = bisect_left(self.keys, key)
+        hi = bisect_right(self.keys, key, lo)
+        if after:
+            return bisect_right(self.codes, code, lo, hi)
+        return bisect_left(self.codes, code, lo, hi)
+
+    def add(self, key, code, value=None):
+        index = self._position(key, code)
+        self.keys.insert(index, key)
+        self.codes.insert(index, code)
+        self.values.insert(index, value)
+
+    def add_many(self, entries):
+        """
+        Agrega muchas entradas (clave, código, valor) de una vez.
+        Ordena todo junto en O(n log n) en lugar de insertar de a una,
+        que desplaza las listas en cada inserción.
+        """
+        merged = list(zip(self.keys, self.codes, self.values))
+        merged.extend(entries)
+        merged.sort(key=itemgetter(0, 1))
+        self.keys = [entry[0] for entry in merged]
+        self.codes = [entry[1] for entry in merged]
+        self.values = [entry[2] for entry in merged]
+
+    def remove(self, key, code):
+        """Elimina la entrada (key, code). Retorna True si existía."""
+        index = self._position(key, code)
+        if index < len(self.codes) and self.keys[index] == key and self.codes[index] == code:
+            del self.keys[index]
+            del self.codes[index]
+            del self.values[index]
+            return True
+        return False
+
+    def _bounds(self, low, high):
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        return start, end
+
+    def range_codes(self, low=None, high=None):
+        """Códigos con low <= clave <= high (None = sin límite), ordenados por clave"""
+        start, end = self._bounds(low, high)
+        return self.codes[start:end]
+
+    def range(self, low=None, high=None):
+        """Valores con low <= clave <= high (None = sin límite), ordenados por clave"""
+        start, end = self._bounds(low, high)
+        return self.values[start:end]
+
+    def page(self, after=None, limit=20, offset=0, descending=False):
+        """
+        Una página de hasta limit valores en el orden del índice.
+        after es el cursor (clave, código) de la última entrada de la página
+        anterior (None = desde el principio) y offset saltea posiciones a
+        partir de ahí. Retorna (valores, cursor de la página siguiente o
+        None si no hay más). Cuesta O(log n + limit), sin importar en qué
+        página se esté.
+        """
+        if not descending:
+            start = 0 if after is None else self._position(*after, after=True)
+            start += offset
+            end = min(start + limit, len(self.codes))
+            if start >= end:
+                return [], None
+            cursor = (self.keys[end - 1], self.codes[end - 1]) if end < len(self.codes) else None
+            return self.values[start:end], cursor
+
+        end = len(self.codes) if after is None else self._position(*after)
+        end -= offset
+        start = max(end - limit, 0)
+        if start >= end:
+            return [], None
+        cursor = (self.keys[start], self.codes[start]) if start > 0 else None
+        return self.values[start:end][::-1], cursor
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __str__(self):
+        return f"SortedIndex({len(self.codes)} entradas)"
+
+
+if __name__ == "__main__":
+    print("=== Prueba de Índices ===\n")
+
+    categories = CategoryIndex()
+    prices = SortedIndex()
+
+    for code, price, category in [("BAT001", 3500, "Batman"), ("BAT002", 4200, "Batman"),
+                                  ("SUP001", 3800, "Superman"), ("SPI001", 2900, "Spider-Man")]:
+        categories.add(category, code, f"{code} (${price})")
+        prices.add(price, code, f"{code} (${price})")
+
+    print("Productos de Batman:", categories.get("Batman"))
+    print("Precio entre 3000 y 4000:", prices.range(3000, 4000))
+    print("Códigos hasta $3500:", prices.range_codes(high=3500))
+
+    page, cursor = prices.page(limit=2)
+    print("\nPrimera página por precio:", page, "cursor:", cursor)
+    print("Página siguiente:", prices.page(after=cursor, limit=2)[0])
+
+    prices.remove(3500, "BAT001")
+    print("\nDespués de eliminar BAT001:", prices.range())
@@ -0,0 +1,218 @@
+from structures.queue import Queue, BlockingQueue
+
+
+class PriorityQueue(Queue):
+    """
+    Cola de prioridad sobre un heap binario (menor prioridad = se atiende
+    antes). Con la misma interfaz que Queue: enqueue/dequeue son O(log n)
+    y front es O(1). Entre elementos de igual prioridad se respeta el orden
+    de llegada (cada uno lleva un número de secuencia).
+
+    La prioridad sale de key(elemento), por defecto el elemento mismo.
+    update() cambia la prioridad de un elemento que ya está en la cola
+    (decrease-key, por ejemplo para adelantar pedidos que esperan hace
+    mucho); por eso un mismo elemento no puede estar dos veces.
+    """
+
+    def __init__(self, capacity=8, key=None):
+        self.key = key or (lambda item: item)
+        self._heap = []       # entradas [prioridad, secuencia, elemento, posición]
+        self._entries = {}    # elemento -> su entrada
+        self._sequence = 0
+        self._count = 0
+
+    # Heap con la posición de cada entrada guardada en la entrada misma,
+    # así update() encuentra el elemento sin buscarlo. Las entradas se
+    # comparan enteras: la secuencia es única, así que la comparación se
+    # decide en (prioridad, secuencia) sin llegar al elemento.
+
+    def _place(self, entry, index):
+        self._heap[index] = entry
+        entry[3] = index
+
+    def _sift_up(self, index):
+        heap = self._heap
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if heap[parent] <= entry:
+                break
+            self._place(heap[parent], index)
+            index = parent
+        self._place(entry, index)
+
+    def _sift_down(self, index):
+        heap = self._heap
+        entry = heap[index]
+        size = len(heap)
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            self._place(heap[child], index)
+            index = child
+        self._place(entry, index)
+
+    # _push y _pop hacen el trabajo; los métodos públicos los llaman para
+    # que en BlockingPriorityQueue enqueue_many no vuelva a tomar el lock
+
+    def _push(self, item):
+        if item in self._entries:
+            raise ValueError("El elemento ya está en la cola")
+        entry = [self.key(item), self._sequence, item, len(self._heap)]
+        self._sequence += 1
+        self._heap.append(entry)
+        self._entries[item] = entry
+        self._count += 1
+        self._sift_up(entry[3])
+
+    def _pop(self):
+        if not self._heap:
+            return None
+        top = self._heap[0]
+        last = self._heap.pop()
+        if self._heap:
+            self._place(last, 0)
+            self._sift_down(0)
+        del self._entries[top[2]]
+        self._count -= 1
+        return top[2]
+
+    def enqueue(self, item):
+        self._push(item)
+
+    def enqueue_many(self, items):
+        for item in items:
+            self._push(item)
+
+    def dequeue(self):
+        return self._pop()
+
+    def dequeue_many(self, n):
+        items = []
+        while len(items) < n and self._heap:
+            items.append(self._pop())
+        return items
+
+    def front(self):
+        return self._heap[0][2] if self._heap else None
+
+    def front_priority(self):
+        """Prioridad del primer elemento (None si la cola está vacía)"""
+        return self._heap[0][0] if self._heap else None
+
+    def priority(self, item):
+        entry = self._entries.get(item)
+        return entry[0] if entry is not None else None
+
+    def update(self, item, priority):
+        """
+        Cambia la prioridad de un elemento de la cola en O(log n).
+        Al bajarla (decrease-key) el elemento sube en el heap; conserva su
+        número de secuencia, así queda antes que los que llegaron después.
+        Retorna False si el elemento no está en la cola.
+        """
+        entry = self._entries.get(item)
+        if entry is None:
+            return False
+        old = entry[0]
+        entry[0] = priority
+        if priority < old:
+            self._sift_up(entry[3])
+        elif priority > old:
+            self._sift_down(entry[3])
+        return True
+
+    def __contains__(self, item):
+        return item in self._entries
+
+    def __iter__(self):
+        """Recorre los elementos en el orden en que se atenderían (O(n log n))"""
+        for entry in sorted(self._heap, key=lambda e: (e[0], e[1])):
+            yield entry[2]
+
+    def __str__(self):
+        return f"PriorityQueue({self.size()} elementos)"
+
+
+class BlockingPriorityQueue(BlockingQueue, PriorityQueue):
+    """
+    Cola de prioridad segura para varios hilos: BlockingQueue (put/get con
+    espera, maxsize, close) sobre el heap de PriorityQueue.
+    get(max_priority=p) solo entrega el primero si su prioridad es <= p.
+    """
+
+    def __init__(self, maxsize=0, key=None):
+        super().__init__(maxsize)
+        self.key = key or (lambda item: item)
+
+    def _ready(self, max_priority):
+        return self._count > 0 and (max_priority is None or self._heap[0][0] <= max_priority)
+
+    def get(self, block=True, timeout=None, max_priority=None):
+        """
+        Como BlockingQueue.get; con max_priority espera (o retorna None)
+        mientras el primero de la cola tenga una prioridad mayor.
+        """
+        with self._not_empty:
+            if block:
+                self._not_empty.wait_for(lambda: self._ready(max_priority) or self.closed,
+                                         timeout)
+            if not self._ready(max_priority):
+                return None
+            item = self._pop()
+            self._not_full.notify()
+            return item
+
+    def update(self, item, priority):
+        with self._lock:
+            changed = super().update(item, priority)
+            if changed:
+                # Un elemento que ahora alcanza el max_priority de alguien
+                self._not_empty.notify_all()
+            return changed
+
+    def priority(self, item):
+        with self._lock:
+            return super().priority(item)
+
+    def front_priority(self):
+        with self._lock:
+            return super().front_priority()
+
+    def __contains__(self, item):
+        with self._lock:
+            return super().__contains__(item)
+
+    def __str__(self):
+        return f"BlockingPriorityQueue({self.size()} elementos)"
+
+
+if __name__ == "__main__":
+    print("=== Prueba de Cola de Prioridad ===\n")
+
+    # (prioridad, pedido): 0 = express, 2 = normal, 3 = mayorista
+    queue = PriorityQueue(key=lambda order: order[0])
+    for order in [(2, "Pedido #1"), (3, "Pedido #2"), (0, "Pedido #3"),
+                  (2, "Pedido #4"), (0, "Pedido #5")]:
+        queue.enqueue(order)
+
+    print("Orden de atención:", [name for _, name in queue])
+    print("Primero:", queue.front())
+
+    # El mayorista esperó demasiado: se adelanta a prioridad 1
+    queue.update((3, "Pedido #2"), 1)
+    print("\nDespués de adelantar el Pedido #2:")
+    while not queue.is_empty():
+        print(f"  Atendido: {queue.dequeue()}")
+
+    print("\nCola bloqueante: solo pedidos express (prioridad <= 0)...")
+    blocking = BlockingPriorityQueue(key=lambda order: order[0])
+    blocking.put((2, "Pedido #6"))
+    print("get(max_priority=0):", blocking.get(block=False, max_priority=0))
+    blocking.put((0, "Pedido #7"))
+    print("get(max_priority=0):", blocking.get(block=False, max_priority=0))
@@ -1,56 +1,273 @@
+import threading
+
+
 class Queue:
-    def __init__(self):
-        self.items = []
-    
+    """
+    Cola FIFO (First In, First Out) sobre un buffer circular.
+    head apunta al primer elemento y el buffer se duplica cuando se llena,
+    así enqueue, dequeue y front son O(1) (amortizado).
+    Usada para procesar los pedidos en orden de llegada.
+    """
+
+    def __init__(self, capacity=8):
+        self._buffer = [None] * max(1, capacity)
+        self._head = 0
+        self._count = 0
+
+    def _grow(self, needed=None):
+        """
+        Duplica el buffer (o lo agranda hasta needed lugares) dejando los
+        elementos en orden desde 0
+        """
+        old = self._buffer
+        capacity = len(old)
+        new_capacity = max(2 * capacity, needed or 0)
+        self._buffer = [old[(self._head + i) % capacity] for i in range(self._count)]
+        self._buffer.extend([None] * (new_capacity - self._count))
+        self._head = 0
+
     def enqueue(self, item):
-        self.items.append(item)
-    
+        if self._count == len(self._buffer):
+            self._grow()
+        self._buffer[(self._head + self._count) % len(self._buffer)] = item
+        self._count += 1
+
+    def enqueue_many(self, items):
+        """Encola una lista de elementos de una vez, creciendo el buffer una sola vez"""
+        n = len(items)
+        if self._count + n > len(self._buffer):
+            self._grow(self._count + n)
+        capacity = len(self._buffer)
+        start = (self._head + self._count) % capacity
+        first = min(n, capacity - start)
+        self._buffer[start:start + first] = items[:first]
+        self._buffer[:n - first] = items[first:]
+        self._count += n
+
     def dequeue(self):
         if not self.is_empty():
-            return self.items.pop(0)
+            item = self._buffer[self._head]
+            self._buffer[self._head] = None
+            self._head = (self._head + 1) % len(self._buffer)
+            self._count -= 1
+            return item
         return None
-    
+
+    def dequeue_many(self, n):
+        """
+        Desencola hasta n elementos de una vez.
+        Retorna una lista (vacía si la cola está vacía o si n <= 0).
+        """
+        n = max(0, min(n, self._count))
+        capacity = len(self._buffer)
+        end = self._head + n
+        if end <= capacity:
+            items = self._buffer[self._head:end]
+            self._buffer[self._head:end] = [None] * n
+        else:
+            end -= capacity
+            items = self._buffer[self._head:] + self._buffer[:end]
+            self._buffer[self._head:] = [None] * (capacity - self._head)
+            self._buffer[:end] = [None] * end
+        self._head = end % capacity
+        self._count -= n
+        return items
+
     def front(self):
         if not self.is_empty():
-            return self.items[0]
+            return self._buffer[self._head]
         return None
-    
+
     def is_empty(self):
-        return len(self.items) == 0
-    
+        return self._count == 0
+
     def size(self):
-        return len(self.items)
-    
+        return self._count
+
+    @property
+    def items(self):
+        """Copia de los elementos en orden, del primero al último"""
+        return list(self)
+
+    def __iter__(self):
+        capacity = len(self._buffer)
+        for i in range(self._count):
+            yield self._buffer[(self._head + i) % capacity]
+
+    def __len__(self):
+        return self._count
+
     def display(self):
         if self.is_empty():
             print("  (Cola vacía)")
         else:
-            for i, item in enumerate(self.items, 1):
+            for i, item in enumerate(self, 1):
                 print(f"  {i}. {item}")
-    
+
     def __str__(self):
         return f"Queue({self.size()} elementos)"
 
+class BlockingQueue(Queue):
+    """
+    Cola FIFO segura para varios hilos, construida sobre Queue.
+    put/get pueden esperar (con timeout) a que haya lugar o elementos.
+    Con maxsize > 0 la cola es acotada: los productores se frenan cuando
+    está llena (backpressure). close() despierta a todos los que esperan.
+    """
+
+    def __init__(self, maxsize=0, capacity=8):
+        super().__init__(capacity)
+        self.maxsize = maxsize
+        self.closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def _full(self):
+        return self.maxsize > 0 and self._count >= self.maxsize
+
+    def is_full(self):
+        with self._lock:
+            return self._full()
+
+    def wait_not_full(self, timeout=None):
+        """Espera hasta que haya lugar. Retorna False si venció el timeout o está cerrada."""
+        with self._not_full:
+            self._not_full.wait_for(lambda: not self._full() or self.closed, timeout)
+            return not self._full() and not self.closed
+
+    def put(self, item, block=True, timeout=None):
+        """
+        Encola un elemento. Retorna False si la cola sigue llena al vencer
+        el timeout (o de inmediato con block=False) o si está cerrada.
+        """
+        with self._not_full:
+            if block:
+                self._not_full.wait_for(lambda: not self._full() or self.closed, timeout)
+            if self.closed or self._full():
+                return False
+            super().enqueue(item)
+            self._not_empty.notify()
+            return True
+
+    def put_many(self, items):
+        """
+        Encola una lista de elementos en orden. En una cola acotada encola
+        lo que entra y espera lugar para el resto. Retorna cuántos encoló
+        (menos que len(items) solo si la cola se cerró).
+        """
+        done = 0
+        with self._not_full:
+            while done < len(items):
+                self._not_full.wait_for(lambda: not self._full() or self.closed)
+                if self.closed:
+                    break
+                room = len(items) - done
+                if self.maxsize > 0:
+                    room = min(room, self.maxsize - self._count)
+                super().enqueue_many(items[done:done + room])
+                done += room
+                self._not_empty.notify_all()
+        return done
+
+    def get(self, block=True, timeout=None):
+        """
+        Desencola un elemento esperando hasta timeout segundos.
+        Retorna None si no llegó ninguno (o si la cola está cerrada y vacía).
+        """
+        with self._not_empty:
+            if block:
+                self._not_empty.wait_for(lambda: self._count > 0 or self.closed, timeout)
+            if self._count == 0:
+                return None
+            item = super().dequeue()
+            self._not_full.notify()
+            return item
+
+    def get_many(self, n, block=True, timeout=None):
+        """Desencola hasta n elementos; espera solo por el primero (con n <= 0, por ninguno)"""
+        if n <= 0:
+            return []
+        with self._not_empty:
+            if block:
+                self._not_empty.wait_for(lambda: self._count > 0 or self.closed, timeout)
+            items = super().dequeue_many(n)
+            if items:
+                self._not_full.notify_all()
+            return items
+
+    def enqueue(self, item):
+        self.put(item)
+
+    def enqueue_many(self, items):
+        self.put_many(items)
+
+    def dequeue(self):
+        return self.get(block=False)
+
+    def dequeue_many(self, n):
+        return self.get_many(n, block=False)
+
+    def front(self):
+        with self._lock:
+            return super().front()
+
+    def size(self):
+        with self._lock:
+            return self._count
+
+    def __iter__(self):
+        with self._lock:
+            items = list(super().__iter__())
+        return iter(items)
+
+    def close(self):
+        """Cierra la cola: no acepta más elementos y despierta a los que esperan"""
+        with self._lock:
+            self.closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def __str__(self):
+        return f"BlockingQueue({self.size()} elementos)"
+
+
 if __name__ == "__main__":
     print("=== Prueba de Cola ===\n")
-    
+
     queue = Queue()
-    
+
     print("Encolando elementos...")
     queue.enqueue("Pedido #1")
     queue.enqueue("Pedido #2")
     queue.enqueue("Pedido #3")
-    
+
     print(f"Tamaño de la cola: {queue.size()}")
     print(f"Elemento al frente: {queue.front()}")
-    
+
     print("\nDesencolando elementos...")
     print(f"Desencolado: {queue.dequeue()}")
     print(f"Desencolado: {queue.dequeue()}")
-    
+
     print(f"\nTamaño de la cola: {queue.size()}")
     print(f"Elemento al frente: {queue.front()}")
-    
+
     print("\nContenido de la cola:")
     queue.display()
-    
\ No newline at end of file
+
+    print("\nEncolando 26 pedidos y desencolando en lotes de 8...")
+    for i in range(4, 24):
+        queue.enqueue(f"Pedido #{i}")
+    queue.enqueue_many([f"Pedido #{i}" for i in range(24, 30)])
+    while not queue.is_empty():
+        print(f"Lote: {queue.dequeue_many(8)}")
+
+    print("\nCola bloqueante con un productor y un consumidor...")
+    blocking = BlockingQueue(maxsize=2)
+    consumer = threading.Thread(
+        target=lambda: [print(f"Consumido: {blocking.get()}") for _ in range(4)])
+    consumer.start()
+    for i in range(1, 5):
+        blocking.put(f"Pedido #{i}")
+    consumer.join()
+    print(f"Esperando con timeout en cola vacía: {blocking.get(timeout=0.1)}")
@@ -5,36 +5,96 @@ class Stack:
     Usado para mantener historial de productos vistos.
     """
     
-    def __init__(self):
-        self.items = []
-    
+    def __init__(self, capacity=None):
+        """
+        Si se indica capacity, la pila queda acotada: al apilar con la
+        pila llena se descarta el elemento más antiguo en O(1). Para eso
+        los elementos se guardan en un buffer circular de tamaño fijo.
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError("La capacidad debe ser al menos 1")
+        self.capacity = capacity
+        self._items = [] if capacity is None else [None] * capacity
+        self._start = 0  # Índice del elemento más antiguo (pila acotada)
+        self._count = 0
+
     def push(self, item):
-        self.items.append(item)
-    
+        """
+        Apila un elemento.
+        Si la pila acotada está llena, retorna el elemento descartado.
+        """
+        if self.capacity is None:
+            self._items.append(item)
+            self._count += 1
+            return None
+
+        evicted = None
+        if self._count == self.capacity:
+            evicted = self._items[self._start]
+            self._items[self._start] = item
+            self._start = (self._start + 1) % self.capacity
+        else:
+            self._items[(self._start + self._count) % self.capacity] = item
+            self._count += 1
+        return evicted
+
+    def _top_index(self):
+        if self.capacity is None:
+            return self._count - 1
+        return (self._start + self._count - 1) % self.capacity
+
     def pop(self):
         if not self.is_empty():
-            return self.items.pop()
+            if self.capacity is None:
+                self._count -= 1
+                return self._items.pop()
+            index = self._top_index()
+            item = self._items[index]
+            self._items[index] = None
+            self._count -= 1
+            return item
         return None
-    
+
     def peek(self):
         if not self.is_empty():
-            return self.items[-1]
+            return self._items[self._top_index()]
         return None
-    
+
     def is_empty(self):
-        return len(self.items) == 0
-    
+        return self._count == 0
+
     def size(self):
-        return len(self.items)
-    
+        return self._count
+
+    def is_full(self):
+        return self.capacity is not None and self._count == self.capacity
+
+    @property
+    def items(self):
+        """Copia de los elementos, del más antiguo al más reciente"""
+        if self.capacity is None:
+            return list(self._items)
+        return [self._items[(self._start + i) % self.capacity] for i in range(self._count)]
+
+    def __iter__(self):
+        """Recorre la pila del más reciente al más antiguo"""
+        for i in range(self._count - 1, -1, -1):
+            if self.capacity is None:
+                yield self._items[i]
+            else:
+                yield self._items[(self._start + i) % self.capacity]
+
+    def __len__(self):
+        return self._count
+
     def display(self):
         if self.is_empty():
             print("  (Historial vacío)")
         else:
             print("  (Más reciente primero)")
-            for i in range(len(self.items) - 1, -1, -1):
-                print(f"  {len(self.items) - i}. {self.items[i]}")
-    
+            for i, item in enumerate(self, 1):
+                print(f"  {i}. {item}")
+
     def __str__(self):
         """Representación en string de la pila"""
         return f"Stack({self.size()} elementos)"
@@ -65,4 +125,13 @@ if __name__ == "__main__":
     
     # Mostrar pila
     print("\nContenido de la pila:")
-    stack.display()
\ No newline at end of file
+    stack.display()
+
+    # Pila acotada: conserva solo los últimos 3
+    print("\nPila acotada a 3 elementos:")
+    bounded = Stack(capacity=3)
+    for title in ["Watchmen", "Sandman", "Maus", "Akira", "Saga"]:
+        evicted = bounded.push(title)
+        if evicted:
+            print(f"Descartado: {evicted}")
+    bounded.display()
@@ -0,0 +1,70 @@
+import threading
+from contextlib import contextmanager
+
+
+class StripedLock:
+    """
+    Conjunto fijo de locks repartidos por clave (lock striping).
+    Cada código de producto cae siempre en el mismo lock, así dos hilos
+    que tocan productos distintos casi nunca se bloquean entre sí, sin
+    tener que crear un lock por producto.
+    """
+
+    def __init__(self, stripes=64):
+        self.stripes = stripes
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def index(self, key):
+        return hash(key) % self.stripes
+
+    def lock_for(self, key):
+        """Lock que protege la clave"""
+        return self._locks[self.index(key)]
+
+    def lock_at(self, index):
+        """Lock número index (para recorrer los grupos uno por uno)"""
+        return self._locks[index]
+
+    @contextmanager
+    def acquire_many(self, keys):
+        """
+        Toma los locks de varias claves a la vez. Se adquieren siempre en
+        orden creciente de índice para que dos hilos no se bloqueen
+        mutuamente (deadlock) al pedir los mismos locks en distinto orden.
+        """
+        indexes = sorted({self.index(key) for key in keys})
+        acquired = []
+        try:
+            for i in indexes:
+                self._locks[i].acquire()
+                acquired.append(i)
+            yield
+        finally:
+            for i in reversed(acquired):
+                self._locks[i].release()
+
+    def __str__(self):
+        return f"StripedLock({self.stripes} locks)"
+
+
+if __name__ == "__main__":
+    print("=== Prueba de StripedLock ===\n")
+
+    locks = StripedLock(stripes=8)
+    stock = {"BAT001": 1000, "SUP001": 1000}
+
+    def buy(code, times):
+        for _ in range(times):
+            with locks.lock_for(code):
+                stock[code] -= 1
+
+    threads = [threading.Thread(target=buy, args=(code, 500))
+               for code in ("BAT001", "SUP001") for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print("Stock final:", stock)
+    with locks.acquire_many(["BAT001", "SUP001", "BAT001"]):
+        print("Locks de BAT001 y SUP001 tomados juntos")
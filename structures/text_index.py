@@ -0,0 +1,200 @@
+import re
+import unicodedata
+from heapq import nsmallest
+from operator import neg
+
+from structures.trie import Trie
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_ACCENTS = str.maketrans("áéíóúüñàèìòùâêîôûäëïö", "aeiouunaeiouaeiouaeio")
+
+# Puntaje de cada tipo de coincidencia (se multiplica por el peso del campo)
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.7
+FUZZY_SCORES = {1: 0.6, 2: 0.3}
+
+
+def normalize(text):
+    """
+    Minúsculas y sin acentos ni diéresis: "Año" -> "ano", "Pokémon" -> "pokemon".
+    NFKD separa cada letra de su marca y las marcas se descartan.
+    """
+    # Las letras acentuadas del español se resuelven con una tabla; el
+    # resto (otros idiomas) pasa por la descomposición de Unicode
+    text = text.lower().translate(_ACCENTS)
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Palabras normalizadas de un texto"""
+    return _TOKEN.findall(normalize(text))
+
+
+def max_typos(token):
+    """Errores tolerados según el largo de la palabra"""
+    if len(token) <= 3:
+        return 0
+    if len(token) <= 6:
+        return 1
+    return 2
+
+
+class TextIndex:
+    """
+    Índice invertido palabra -> {código: peso} para búsqueda por texto.
+    Cada documento (producto) se indexa con varios campos de distinto peso
+    (por ejemplo nombre y categoría). Las palabras del índice también
+    están en un trie, que resuelve los prefijos (autocompletar) y las
+    palabras parecidas (errores de tipeo) sin recorrer el vocabulario.
+    Se actualiza de a un documento con add/remove.
+    """
+
+    def __init__(self, max_expansions=50):
+        self.postings = {}
+        self.documents = {}  # código -> (valor, {palabra: peso})
+        self.vocabulary = Trie()
+        # Máximo de palabras en que se expande un prefijo
+        self.max_expansions = max_expansions
+
+    def add(self, code, fields, value=None):
+        """
+        Indexa (o reindexa) un documento. fields es una lista de
+        (texto, peso); si una palabra aparece en varios campos cuenta
+        el peso mayor.
+        """
+        if code in self.documents:
+            self.remove(code)
+        weights = {}
+        for text, weight in fields:
+            for token in tokenize(text):
+                if weight > weights.get(token, 0):
+                    weights[token] = weight
+        for token, weight in weights.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                self.vocabulary.insert(token)
+            posting[code] = weight
+        self.documents[code] = (value, weights)
+
+    def remove(self, code):
+        """Quita un documento. Retorna True si existía."""
+        entry = self.documents.pop(code, None)
+        if entry is None:
+            return False
+        for token in entry[1]:
+            posting = self.postings[token]
+            del posting[code]
+            if not posting:
+                del self.postings[token]
+                self.vocabulary.remove(token)
+        return True
+
+    def _expand(self, token, prefix):
+        """
+        Palabras del índice que coinciden con token, con su puntaje:
+        la palabra exacta, las que la tienen como prefijo (si prefix) y,
+        si no hubo exacta, las parecidas.
+        """
+        matches = {}
+        if token in self.postings:
+            matches[token] = EXACT_SCORE
+        if prefix:
+            for word in self.vocabulary.with_prefix(token, self.max_expansions):
+                matches.setdefault(word, PREFIX_SCORE)
+        if token not in self.postings and max_typos(token):
+            for word, distance in self.vocabulary.fuzzy(token, max_typos(token)):
+                score = FUZZY_SCORES[distance] if distance else EXACT_SCORE
+                if score > matches.get(word, 0):
+                    matches[word] = score
+        return matches
+
+    def _token_scores(self, token, prefix):
+        """Puntaje de cada documento para una palabra de la consulta"""
+        expanded = self._expand(token, prefix)
+        if len(expanded) == 1:
+            word, score = next(iter(expanded.items()))
+            posting = self.postings[word]
+            # Caso común: palabra exacta sin variantes, el puntaje es el peso
+            if score == EXACT_SCORE:
+                return posting
+            return {code: weight * score for code, weight in posting.items()}
+        best = {}
+        for word, score in expanded.items():
+            for code, weight in self.postings[word].items():
+                points = score * weight
+                if points > best.get(code, 0):
+                    best[code] = points
+        return best
+
+    def search(self, query, limit=10, prefix=True):
+        """
+        Documentos que coinciden con las palabras de query, del más
+        relevante al menos relevante: primero los que coinciden con más
+        palabras, después por puntaje. La última palabra se toma también
+        como prefijo (se está escribiendo). Retorna [(valor, puntaje)].
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        last = len(tokens) - 1
+        per_token = [self._token_scores(token, prefix and i == last)
+                     for i, token in enumerate(tokens)]
+
+        if len(per_token) == 1:
+            scores = per_token[0]
+            ranked = zip(map(neg, scores.values()), scores.keys())
+        else:
+            # matched y scores se completan juntos: mismo orden de claves
+            matched = {}
+            scores = {}
+            for best in per_token:
+                for code, points in best.items():
+                    if code in scores:
+                        matched[code] += 1
+                        scores[code] += points
+                    else:
+                        matched[code] = 1
+                        scores[code] = points
+            ranked = zip(map(neg, matched.values()), map(neg, scores.values()), scores.keys())
+
+        # Las tuplas se comparan en C: más coincidencias, más puntaje, menor código
+        top = nsmallest(limit, ranked)
+        return [(self.documents[entry[-1]][0], round(scores[entry[-1]], 3)) for entry in top]
+
+    def suggest(self, prefix, limit=10):
+        """Palabras del índice que completan prefix, las más frecuentes primero"""
+        words = self.vocabulary.with_prefix(normalize(prefix), self.max_expansions)
+        words.sort(key=lambda word: -len(self.postings[word]))
+        return words[:limit]
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __str__(self):
+        return f"TextIndex({len(self.documents)} documentos, {len(self.postings)} palabras)"
+
+
+if __name__ == "__main__":
+    print("=== Prueba de Índice de Texto ===\n")
+
+    index = TextIndex()
+    for code, name, category in [("BAT001", "Batman: Año Uno", "Batman"),
+                                 ("BAT003", "Batman: The Killing Joke", "Batman"),
+                                 ("SUP001", "Superman: Red Son", "Superman"),
+                                 ("SM002", "Spider-Man: Blue", "Spider-Man")]:
+        index.add(code, [(name, 2), (category, 1)], f"[{code}] {name}")
+
+    print(index)
+    print("Palabras de 'Batman: Año Uno':", tokenize("Batman: Año Uno"))
+    print("\nBuscar 'killing joke':", index.search("killing joke"))
+    print("Buscar 'ano' (sin tilde):", index.search("ano"))
+    print("Buscar 'supreman' (con error):", index.search("supreman"))
+    print("Autocompletar 'spi':", index.search("spi"))
+    print("Sugerencias para 'b':", index.suggest("b"))
+
+    index.remove("BAT003")
+    print("\nDespués de quitar BAT003, 'joke':", index.search("joke"))
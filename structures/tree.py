@@ -1,4 +1,6 @@
 #Basado en: https://www.w3schools.com/dsa/dsa_data_trees.php
+import threading
+
 
 class TreeNode:
     """
@@ -10,9 +12,11 @@ class TreeNode:
         """Inicializa un nodo con un nombre y lista de hijos vacía"""
         self.name = name
         self.children = []
+        self.parent = None
     
     def add_child(self, child_node):
         """Agrega un nodo hijo a este nodo"""
+        child_node.parent = self
         self.children.append(child_node)
     
     def __str__(self):
@@ -24,44 +28,136 @@ class Tree:
     """
     Árbol N-ario para representar categorías jerárquicas.
     Permite múltiples hijos por nodo (no es binario).
+
+    Mantiene una numeración de entrada/salida (Euler tour en preorden):
+    cada nodo recibe el índice en que se visita (entry) y el último índice
+    de su subárbol (exit). Así "X está bajo Y" es una comparación de
+    intervalos y el subárbol de Y es un tramo contiguo del recorrido.
+    La numeración se recalcula de forma perezosa después de cada add().
+
+    Se puede leer desde varios hilos mientras otro agrega categorías: add()
+    y la reconstrucción de la numeración toman un lock, y la numeración se
+    arma en listas nuevas que reemplazan a las anteriores de una sola vez
+    (quien estaba leyendo las viejas las sigue viendo completas).
     """
     
     def __init__(self):
         """Inicializa un árbol vacío"""
         self.root = None
         self.nodes = {}  # Diccionario para búsqueda rápida de nodos
+        self._lock = threading.Lock()
+
+        # Cambios del árbol y numeración Euler tour (versión con que se
+        # armó, orden, entry, exit): se reconstruye al consultarla si el
+        # árbol cambió desde entonces
+        self._version = 0
+        self._euler = (-1, [], {}, {})
     
     def add(self, name, parent=None):
         """
         Agrega un nuevo nodo al árbol.
-        Si parent es None, se crea como raíz.
-        Si parent existe, se agrega como hijo de ese nodo.
+        Si parent es None, se crea como raíz (o como hijo de la raíz, si
+        ya hay una). Si parent existe, se agrega como hijo de ese nodo.
+        Retorna False si parent no existe o si ya hay un nodo con ese
+        nombre (no agrega nada).
         """
-        new_node = TreeNode(name)
-        self.nodes[name] = new_node
-        
-        if parent is None:
-            # Es la raíz del árbol
-            if self.root is None:
-                self.root = new_node
-            else:
-                # Si ya hay raíz, agregarlo como hijo de la raíz
-                self.root.add_child(new_node)
-        else:
-            # Buscar el nodo padre y agregar como hijo
-            if parent in self.nodes:
-                parent_node = self.nodes[parent]
-                parent_node.add_child(new_node)
+        with self._lock:
+            if name in self.nodes or (parent is not None and parent not in self.nodes):
+                return False
+            new_node = TreeNode(name)
+            if parent is None:
+                # Es la raíz del árbol
+                if self.root is None:
+                    self.root = new_node
+                else:
+                    # Si ya hay raíz, agregarlo como hijo de la raíz
+                    self.root.add_child(new_node)
             else:
-                print(f"Error: Categoría padre '{parent}' no existe")
+                self.nodes[parent].add_child(new_node)
+            self.nodes[name] = new_node
+            self._version += 1
+            return True
     
     def search(self, name):
         """Busca un nodo por su nombre"""
         return self.nodes.get(name)
+
+    def _build_euler(self):
+        """
+        Recorre el árbol en preorden con una pila explícita (sin recursión,
+        así no hay límite de profundidad) y asigna entry/exit a cada nodo.
+        Se llama con el lock tomado; arma listas nuevas y las publica juntas.
+        """
+        order = []
+        entry = {}
+        exit = {}
+
+        if self.root is not None:
+            stack = [(self.root, False)]
+            while stack:
+                node, visited = stack.pop()
+                if visited:
+                    exit[node.name] = len(order) - 1
+                    continue
+                entry[node.name] = len(order)
+                order.append(node.name)
+                stack.append((node, True))
+                for child in reversed(node.children):
+                    stack.append((child, False))
+
+        self._euler = (self._version, order, entry, exit)
+
+    def _ensure_euler(self):
+        """Numeración (orden, entry, exit) al día, sin lock si no cambió nada"""
+        euler = self._euler
+        if euler[0] != self._version:
+            with self._lock:
+                if self._euler[0] != self._version:
+                    self._build_euler()
+                euler = self._euler
+        return euler[1:]
+
+    def interval(self, name):
+        """Retorna (entry, exit) de la categoría, o None si no está en el árbol"""
+        _, entry, exit = self._ensure_euler()
+        if name not in entry:
+            return None
+        return entry[name], exit[name]
+
+    def is_under(self, name, ancestor):
+        """
+        Indica si la categoría 'name' está dentro del subárbol de 'ancestor'
+        (una categoría está bajo sí misma). O(1) con la numeración Euler.
+        """
+        _, entry, exit = self._ensure_euler()
+        if name not in entry or ancestor not in entry:
+            return False
+        return entry[ancestor] <= entry[name] <= exit[ancestor]
+
+    def categories(self):
+        """
+        Pares (nombre, padre) en preorden: agregándolos en este orden con
+        add() se reconstruye el mismo árbol.
+        """
+        order, _, _ = self._ensure_euler()
+        result = []
+        for name in order:
+            parent = self.nodes[name].parent
+            result.append((name, parent.name if parent is not None else None))
+        return result
+
+    def ancestors(self, name):
+        """Lista de categorías desde 'name' hasta la raíz (incluida 'name')"""
+        node = self.search(name)
+        result = []
+        while node is not None:
+            result.append(node.name)
+            node = node.parent
+        return result
     
     def display(self, node=None, level=0):
         """
-        Muestra el árbol de forma jerárquica (recursivo).
+        Muestra el árbol de forma jerárquica.
         Usa indentación para mostrar los niveles.
         """
         if node is None:
@@ -70,32 +166,25 @@ class Tree:
                 return
             node = self.root
         
-        # Imprimir el nodo actual con indentación
-        indentation = "  " * level
-        print(f"{indentation}├─ {node.name}")
-        
-        # Mostrar recursivamente todos los hijos
-        for child in node.children:
-            self.display(child, level + 1)
+        # Pila explícita para no depender del límite de recursión
+        stack = [(node, level)]
+        while stack:
+            current, depth = stack.pop()
+            indentation = "  " * depth
+            print(f"{indentation}├─ {current.name}")
+            for child in reversed(current.children):
+                stack.append((child, depth + 1))
     
     def list_subcategories(self, category_name):
         """
-        Lista todas las subcategorías de una categoría dada.
+        Lista todas las subcategorías de una categoría dada (incluida ella).
         Útil para buscar todos los productos de una categoría y sus hijas.
+        El subárbol es un tramo contiguo del recorrido: O(k) sin recursión.
         """
-        node = self.search(category_name)
-        if node is None:
+        order, entry, exit = self._ensure_euler()
+        if category_name not in entry:
             return []
-        
-        subcategories = [node.name]
-        self._collect_children(node, subcategories)
-        return subcategories
-    
-    def _collect_children(self, node, list_result):
-        """Método auxiliar recursivo para recolectar todos los hijos"""
-        for child in node.children:
-            list_result.append(child.name)
-            self._collect_children(child, list_result)
+        return order[entry[category_name]:exit[category_name] + 1]
     
     def __str__(self):
         """Representación en string del árbol"""
@@ -126,4 +215,12 @@ if __name__ == "__main__":
     print(tree.list_subcategories("DC Comics"))
     
     print("\nSubcategorías de 'Cómics':")
-    print(tree.list_subcategories("Cómics"))
\ No newline at end of file
+    print(tree.list_subcategories("Cómics"))
+
+    print("\n¿Batman está bajo DC Comics?", tree.is_under("Batman", "DC Comics"))
+    print("¿Batman está bajo Marvel?", tree.is_under("Batman", "Marvel"))
+
+    # La numeración se recalcula sola después de agregar nodos
+    tree.add("Nightwing", "Batman")
+    print("\nSubcategorías de 'DC Comics' después de agregar Nightwing:")
+    print(tree.list_subcategories("DC Comics"))
\ No newline at end of file
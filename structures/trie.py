@@ -0,0 +1,144 @@
+class TrieNode:
+    """
+    Nodo de un trie: un hijo por letra siguiente.
+    count > 0 indica que una palabra termina en este nodo (y cuántas
+    veces se insertó).
+    """
+    __slots__ = ("children", "count")
+
+    def __init__(self):
+        self.children = {}
+        self.count = 0
+
+
+class Trie:
+    """
+    Árbol de prefijos sobre palabras.
+    - with_prefix: palabras que empiezan con un prefijo (autocompletar)
+    - fuzzy: palabras a distancia de edición <= k (tolerancia a errores),
+      recorriendo el trie con una fila de distancias de edición por nodo y podando
+      las ramas que ya superan k
+    Las palabras se cuentan: remove solo la quita cuando el contador llega a 0.
+    """
+
+    def __init__(self):
+        self.root = TrieNode()
+        self.words = 0
+
+    def insert(self, word):
+        node = self.root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = TrieNode()
+            node = child
+        if node.count == 0:
+            self.words += 1
+        node.count += 1
+
+    def remove(self, word):
+        """Descuenta una aparición de la palabra. Retorna True si existía."""
+        path = [self.root]
+        for char in word:
+            node = path[-1].children.get(char)
+            if node is None:
+                return False
+            path.append(node)
+        node = path[-1]
+        if node.count == 0:
+            return False
+        node.count -= 1
+        if node.count == 0:
+            self.words -= 1
+            # Podar los nodos que quedaron sin palabras ni hijos
+            for i in range(len(word), 0, -1):
+                if path[i].count or path[i].children:
+                    break
+                del path[i - 1].children[word[i - 1]]
+        return True
+
+    def contains(self, word):
+        node = self._find(word)
+        return node is not None and node.count > 0
+
+    def _find(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def with_prefix(self, prefix, limit=None):
+        """Palabras que empiezan con prefix, en orden alfabético (hasta limit)"""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        result = []
+        # Recorrido en profundidad con pila, hijos en orden inverso para
+        # sacar las palabras ordenadas
+        stack = [(node, prefix)]
+        while stack:
+            node, word = stack.pop()
+            if node.count:
+                result.append(word)
+                if limit is not None and len(result) >= limit:
+                    break
+            for char in sorted(node.children, reverse=True):
+                stack.append((node.children[char], word + char))
+        return result
+
+    def fuzzy(self, word, max_distance):
+        """
+        Palabras a distancia de edición <= max_distance, como (palabra, distancia).
+        Cuenta como un error cada letra de más, de menos, cambiada o dos
+        letras vecinas invertidas ("btaman" -> "batman").
+        """
+        result = []
+        first_row = list(range(len(word) + 1))
+        # Cada entrada: nodo, su letra, palabra hasta ahí, fila anterior,
+        # la fila de antes y la letra anterior (para las inversiones)
+        stack = [(child, char, char, first_row, None, None)
+                 for char, child in self.root.children.items()]
+        while stack:
+            node, char, prefix, previous, before, last_char = stack.pop()
+            row = [previous[0] + 1]
+            for i in range(1, len(word) + 1):
+                cost = min(row[i - 1] + 1, previous[i] + 1,
+                           previous[i - 1] + (word[i - 1] != char))
+                if (before is not None and i > 1 and word[i - 1] == last_char
+                        and word[i - 2] == char):
+                    cost = min(cost, before[i - 2] + 1)
+                row.append(cost)
+            if node.count and row[-1] <= max_distance:
+                result.append((prefix, row[-1]))
+            # Una inversión puede bajar la distancia desde la fila anterior
+            if min(row) <= max_distance or min(previous) < max_distance:
+                for next_char, child in node.children.items():
+                    stack.append((child, next_char, prefix + next_char, row, previous, char))
+        return result
+
+    def __len__(self):
+        return self.words
+
+    def __str__(self):
+        return f"Trie({self.words} palabras)"
+
+
+if __name__ == "__main__":
+    print("=== Prueba de Trie ===\n")
+
+    trie = Trie()
+    for word in ["batman", "batalla", "superman", "spider", "spawn", "batman"]:
+        trie.insert(word)
+
+    print(trie)
+    print("Empiezan con 'bat':", trie.with_prefix("bat"))
+    print("Empiezan con 'sp':", trie.with_prefix("sp"))
+    print("Parecidas a 'btaman':", trie.fuzzy("btaman", 2))
+
+    trie.remove("batman")
+    print("\n¿Sigue 'batman' después de quitar una vez?", trie.contains("batman"))
+    trie.remove("batman")
+    print("¿Y después de quitarla dos veces?", trie.contains("batman"))
+    print("Empiezan con 'bat':", trie.with_prefix("bat"))
@@ -0,0 +1,17 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Catálogo real de la tienda (los tests no dependen del directorio actual)
+CATALOG = os.path.join(ROOT, "products", "products.json")
+
+
+def state(store):
+    """Estado observable de un Store, para comparar antes y después de reiniciarlo"""
+    return ({p.code: (p.name, p.price, p.stock, p.category) for p in store.list_products()},
+            [(o.order_number, o.customer, [p.code for p in o.products], o.tier, o.priority)
+             for o in store.pending_order_list()],
+            store.order_counter, store.category_tree.categories())
@@ -0,0 +1,89 @@
+import random
+from collections import defaultdict
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from conftest import CATALOG
+from store import Store
+
+THRESHOLD = 8
+
+
+def totals(products):
+    return {"products": len(products), "units": sum(p.stock for p in products),
+            "value": pytest.approx(float(sum(p.price * p.stock for p in products))),
+            "low_stock": sum(1 for p in products if p.stock <= THRESHOLD)}
+
+
+def brute_by_category(store):
+    groups = defaultdict(list)
+    for product in store.list_products():
+        groups[product.category].append(product)
+    result = {}
+    for category, products in groups.items():
+        row = totals(products)
+        prices = [p.price for p in products]
+        for q in (50, 90, 99):
+            row[f"p{q}_price"] = pytest.approx(float(np.percentile(prices, q)))
+        result[category] = row
+    return result
+
+
+def brute_by_subtree(store):
+    products = store.list_products()
+    return {name: totals([p for p in products
+                          if p.category in store.category_tree.list_subcategories(name)])
+            for name, _ in store.category_tree.categories()}
+
+
+def brute_alerts(store, category=None):
+    names = store.category_tree.list_subcategories(category) if category else None
+    groups = defaultdict(list)
+    for product in store.list_products():
+        if product.stock <= THRESHOLD and (names is None or product.category in names):
+            groups[product.category].append((product.code, product.stock))
+    return groups
+
+
+def mutate(store, seed=7):
+    rng = random.Random(seed)
+    codes = [p.code for p in store.list_products()]
+    store.create_category("Vertigo", "DC Comics")
+    for i in range(20):
+        store.add_product(f"VRT{i:03}", f"Vertigo {i}", rng.randrange(1000, 9000, 50),
+                          rng.randrange(0, 15), "Vertigo")
+    for code in rng.sample(codes, 15):
+        store.update_product(code, new_price=rng.randrange(1000, 9000, 50),
+                             new_stock=rng.randrange(0, 15))
+    for code in rng.sample(codes, 5):
+        store.delete_product(code)
+    for _ in range(30):
+        chosen = [store.find_product(code) for code in rng.sample(codes, 2)]
+        chosen = [p for p in chosen if p is not None and p.stock > 0]
+        if chosen:
+            order = store.submit_order("Ana", chosen)
+            if rng.random() < 0.3:
+                store.cancel_order(order.order_number)
+
+
+def test_reports_match_a_brute_force_recount_after_changes():
+    store = Store(catalog_path=CATALOG)
+    analytics = store.analytics()
+    # Primer reporte: desde acá solo se copian las filas cambiadas
+    analytics.by_category(THRESHOLD)
+    mutate(store)
+
+    assert analytics.by_category(THRESHOLD) == brute_by_category(store)
+    assert analytics.by_subtree(THRESHOLD) == brute_by_subtree(store)
+
+    for category in (None, "DC Comics", "Vertigo"):
+        alerts = analytics.low_stock_alerts(THRESHOLD, category=category)
+        expected = brute_alerts(store, category)
+        assert {name: sorted(items) for name, items in alerts.items()} == \
+            {name: sorted(items) for name, items in expected.items()}
+        for items in alerts.values():
+            assert [stock for _, stock in items] == sorted(stock for _, stock in items)
+        firsts = [(items[0][1], name) for name, items in alerts.items()]
+        assert firsts == sorted(firsts)
@@ -0,0 +1,169 @@
+import os
+import random
+import sys
+from collections import Counter
+
+import pytest
+
+from conftest import CATALOG
+from persistence.archive import OrderArchive, SEGMENT_SUFFIX, INDEX_SUFFIX, MAX_CUSTOMER, \
+    MAX_QUANTITY, encode_order
+from store import Order, Product, Store
+
+DAY = 86400
+START = 1790000000  # 2026-09-20 UTC
+
+
+def make_orders(n=300, seed=3):
+    rng = random.Random(seed)
+    products = [Product(f"P{i:03}", f"Producto {i}", rng.choice([1500, 2999.5, 4200]), 10, "X")
+                for i in range(40)]
+    tiers = ["express", "preventa", "normal", "mayorista"]
+    return [Order(i + 1, f"cliente{rng.randrange(20)}",
+                  [rng.choice(products) for _ in range(rng.randint(1, 4))], rng.choice(tiers))
+            for i in range(n)]
+
+
+def as_rows(orders, times):
+    """Lo que el archivo tiene que devolver de cada pedido"""
+    rows = []
+    for order, completed in zip(orders, times):
+        quantities = Counter(p.code for p in order.products)
+        prices = {p.code: p.price for p in order.products}
+        rows.append((order.order_number, order.customer, order.tier, completed,
+                     [(code, quantity, prices[code]) for code, quantity in quantities.items()]))
+    return rows
+
+
+def archived(orders):
+    return [(o.order_number, o.customer, o.tier, o.completed, o.items) for o in orders]
+
+
+def fill(directory, orders):
+    """Pedidos repartidos en 3 días, de a uno y en lotes; retorna los instantes"""
+    archive = OrderArchive(directory)
+    times = []
+    for i, start in enumerate(range(0, len(orders), 50)):
+        batch = orders[start:start + 50]
+        completed = START + (i // 2) * DAY + i
+        if i % 2:
+            archive.append_many(batch, completed)
+        else:
+            for order in batch:
+                archive.append(order, completed)
+        times += [completed] * len(batch)
+    archive.close()
+    return times
+
+
+def test_round_trip_and_indexed_queries(tmp_path):
+    orders = make_orders()
+    times = fill(str(tmp_path), orders)
+    expected = as_rows(orders, times)
+
+    archive = OrderArchive(str(tmp_path))
+    assert len(archive.partitions()) == 3
+    assert archived(archive.iter_orders()) == expected
+    assert len(archive) == len(orders)
+    for customer in ("cliente3", "cliente7", "nadie"):
+        assert archived(archive.customer_orders(customer)) == \
+            [row for row in expected if row[1] == customer]
+    for code in ("P000", "P017"):
+        assert archived(archive.product_orders(code)) == \
+            [row for row in expected if any(item[0] == code for item in row[4])]
+    units, revenue = Counter(), Counter()
+    for row in expected:
+        for code, quantity, price in row[4]:
+            units[code] += quantity
+            revenue[code] += quantity * price
+    assert {code: (count, total) for code, count, total in archive.best_sellers(limit=None)} == \
+        {code: (units[code], revenue[code]) for code in units}
+    day = archive.partitions()[1]
+    assert archived(archive.iter_orders(day, day)) == \
+        [row for row in expected if START + DAY <= row[3] < START + 2 * DAY]
+
+
+def test_missing_index_and_damaged_tail_are_rebuilt(tmp_path):
+    orders = make_orders(120)
+    times = fill(str(tmp_path), orders)
+    day = OrderArchive(str(tmp_path)).partitions()[-1]
+    os.remove(os.path.join(tmp_path, day + INDEX_SUFFIX))
+    with open(os.path.join(tmp_path, day + SEGMENT_SUFFIX), "ab") as file:
+        file.write(b"\x40\x00\x00\x00cortado")
+
+    archive = OrderArchive(str(tmp_path))
+    expected = as_rows(orders, times)
+    assert archived(archive.iter_orders()) == expected
+    assert archived(archive.customer_orders("cliente3")) == \
+        [row for row in expected if row[1] == "cliente3"]
+
+    # Retomar el último día recorta la cola dañada y sigue agregando
+    extra = make_orders(5, seed=9)
+    for i, order in enumerate(extra):
+        order.order_number = 1000 + i
+    archive.append_many(extra, times[-1] + 1)
+    archive.close()
+    reopened = OrderArchive(str(tmp_path))
+    assert archived(reopened.iter_orders()) == expected + as_rows(extra, [times[-1] + 1] * 5)
+
+
+def test_queries_during_appends_to_the_current_day(tmp_path):
+    import threading
+
+    archive = OrderArchive(str(tmp_path))
+    orders = make_orders(n=2000, seed=5)
+    # Códigos nuevos en cada pedido: los índices del día crecen mientras se consultan
+    for order in orders:
+        order.products = [Product(f"N{order.order_number}", "Nuevo", 100, 1, "X")]
+    # Un día cerrado antes: al sumarle el día en curso, se recorren sus contadores
+    archive.append_many(make_orders(n=50), START - DAY)
+    errors = []
+
+    def reader():
+        try:
+            while writer.is_alive():
+                archive.best_sellers(limit=3)
+                archive.product_orders("P001")
+                len(archive)
+        except Exception as e:
+            errors.append(e)
+
+    def write():
+        for order in orders:
+            archive.append(order, START)
+
+    writer = threading.Thread(target=write)
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # cambios de hilo a mitad de cada consulta
+    try:
+        writer.start()
+        for thread in readers:
+            thread.start()
+        writer.join()
+        for thread in readers:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors
+    assert len(archive) == len(orders) + 50
+    archive.close()
+
+
+def test_orders_that_do_not_fit_are_rejected_before_reserving(tmp_path):
+    store = Store(catalog_path=CATALOG, archive_path=str(tmp_path))
+    product = store.find_product("BAT001")
+    stock = product.stock
+    with pytest.raises(ValueError):
+        store.create_order("x" * (MAX_CUSTOMER + 1), ["BAT001"])
+    with pytest.raises(ValueError):
+        store.create_orders_bulk([("Ana", ["BAT001"]), ("x" * (MAX_CUSTOMER + 1), ["BAT001"])])
+    assert product.stock == stock and not store.pending_order_list()
+
+    with pytest.raises(ValueError):
+        encode_order(1, "Ana", "normal", START, [("BAT001", MAX_QUANTITY + 1, 100)])
+
+    order = store.create_order("Ana", ["BAT001"])["order"]
+    assert store.process_next_order() is order
+    assert [o.order_number for o in store.archive.customer_orders("Ana")] == [order.order_number]
+    store.close()
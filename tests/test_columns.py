@@ -0,0 +1,28 @@
+import os
+
+from conftest import CATALOG
+from store import Store
+
+
+def test_prices_keep_their_type(tmp_path):
+    store = Store(catalog_path=CATALOG, snapshot_path=os.path.join(tmp_path, "store.snap"))
+    store.add_product("NEW001", "Nuevo", 1500.0, 5, "Batman")
+    store.add_product("NEW002", "Nuevo", 1500, 5, "Batman")
+    store.update_product("BAT001", new_price=2000.0)
+    for code, price in (("NEW001", 1500.0), ("NEW002", 1500), ("BAT001", 2000.0)):
+        assert type(store.find_product(code).price) is type(price)
+        assert store.find_product(code).price == price
+
+    store.update_product("NEW001", new_price=1499)
+    assert type(store.find_product("NEW001").price) is int
+    # El objeto eliminado se queda con una copia del mismo tipo
+    product = store.find_product("BAT001")
+    store.delete_product("BAT001")
+    assert type(product.price) is float
+
+    store.save_snapshot()
+    restored = Store(catalog_path=CATALOG, snapshot_path=os.path.join(tmp_path, "store.snap"))
+    assert type(restored.find_product("NEW002").price) is int
+    assert type(restored.find_product("NEW001").price) is int
+    store.update_product("NEW002", new_price=1500.0)
+    assert type(store.find_product("NEW002").price) is float
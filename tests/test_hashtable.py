@@ -0,0 +1,128 @@
+import random
+import sys
+import threading
+
+import pytest
+
+from structures.hashtable import HashTable
+
+ENGINES = ["chaining", "open", "persistent"]
+
+
+@pytest.fixture
+def fast_switching():
+    # Cambios de hilo muy seguidos: más intercalados entre lector y escritor
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.mark.parametrize("storage", ENGINES)
+def test_concurrent_searches_during_writes(storage, fast_switching):
+    """
+    Un escritor agrega y borra claves (con varios rehash en el medio)
+    mientras otros hilos buscan claves que nunca cambian: siempre tienen
+    que encontrarlas, y al final la tabla no tiene repetidos.
+    """
+    table = HashTable(size=8, storage=storage)
+    stable = [f"S{i}" for i in range(200)]
+    for i, key in enumerate(stable):
+        table.insert(key, i)
+    stop = threading.Event()
+    errors = []
+
+    def writer():
+        try:
+            for _ in range(3):
+                for i in range(3000):
+                    table.insert(f"W{i}", i)
+                for i in range(3000):
+                    table.delete(f"W{i}")
+        finally:
+            stop.set()
+
+    def reader():
+        while not stop.is_set():
+            for i, key in enumerate(stable):
+                if table.search(key) != i:
+                    errors.append(key)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader)
+                                                   for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    keys = [key for key, _ in table.iter_items()]
+    assert sorted(keys) == sorted(stable)
+    assert len(table) == len(stable)
+
+
+def test_search_does_not_advance_the_rehash():
+    table = HashTable(size=8)
+    for i in range(7):
+        table.insert(f"K{i}", i)
+    assert table.is_rehashing()
+    state = (table._rehash_index, [list(b) if b else b for b in table._old_table])
+    for i in range(7):
+        assert table.search(f"K{i}") == i
+    table.stats()
+    assert (table._rehash_index, [list(b) if b else b for b in table._old_table]) == state
+
+
+@pytest.mark.parametrize("storage", ENGINES)
+def test_counters_agree_with_stats(storage):
+    table = HashTable(size=8, storage=storage)
+    for i in range(500):
+        table.insert(f"K{i}", i)
+    for i in range(0, 500, 3):
+        table.delete(f"K{i}")
+    counters, stats = table.counters(), table.stats()
+    shared = counters.keys() & stats.keys()
+    assert shared and all(counters[name] == stats[name] for name in shared)
+    assert counters["elements"] == len(table)
+
+
+def test_counters_show_the_rehash_in_progress():
+    table = HashTable(size=8, rehash_step=1)
+    i = 0
+    while not table.is_rehashing():
+        table.insert(f"K{i}", i)
+        i += 1
+    pending = table.counters()["rehash_pending"]
+    assert pending > 0
+    table.insert("otra", 0)
+    assert table.counters()["rehash_pending"] < pending
+
+
+@pytest.mark.parametrize("storage", ENGINES)
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_a_dict_under_random_operations(storage, seed):
+    """
+    Inserciones, reemplazos, borrados y búsquedas al azar sobre pocas
+    claves (la tabla crece y se achica varias veces) comparados con un dict
+    """
+    rng = random.Random(seed)
+    table = HashTable(size=4, storage=storage)
+    model = {}
+    keys = [f"K{i}" for i in range(300)] + [i for i in range(50)] + [("t", 1), ("t", 2)]
+    for step in range(6000):
+        key = rng.choice(keys)
+        action = rng.random()
+        if action < 0.5:
+            table.insert(key, step)
+            model[key] = step
+        elif action < 0.8:
+            assert table.delete(key) == (model.pop(key, None) is not None)
+        else:
+            assert table.search(key) == model.get(key)
+        if step % 500 == 0:
+            assert dict(table.iter_items()) == model
+    assert len(table) == len(model)
+    assert dict(table.iter_items()) == model
+    assert sorted(table.list_all()) == sorted(model.values())
+    for key in keys:
+        assert table.search(key) == model.get(key)
@@ -0,0 +1,52 @@
+import random
+from collections import deque
+
+import pytest
+
+from structures.queue import Queue, BlockingQueue
+
+
+@pytest.mark.parametrize("cls", [Queue, BlockingQueue])
+@pytest.mark.parametrize("n", [-3, 0])
+def test_dequeue_many_without_a_positive_count_takes_nothing(cls, n):
+    queue = cls(capacity=4)
+    queue.enqueue_many([1, 2, 3])
+    queue.dequeue()
+    queue.enqueue_many([4, 5])  # el buffer da la vuelta
+    assert queue.dequeue_many(n) == []
+    assert queue.size() == 4
+    assert list(queue) == [2, 3, 4, 5]
+    assert queue.dequeue_many(10) == [2, 3, 4, 5]
+    assert queue.is_empty()
+
+
+def test_get_many_with_zero_does_not_wait():
+    queue = BlockingQueue()
+    assert queue.get_many(0, block=True) == []
+
+
+@pytest.mark.parametrize("cls", [Queue, BlockingQueue])
+@pytest.mark.parametrize("seed", range(3))
+def test_ring_matches_a_deque(cls, seed):
+    """Operaciones al azar con un buffer chico: el anillo da la vuelta y crece"""
+    rng = random.Random(seed)
+    queue = cls(capacity=2)
+    model = deque()
+    for step in range(3000):
+        action = rng.random()
+        if action < 0.35:
+            queue.enqueue(step)
+            model.append(step)
+        elif action < 0.5:
+            items = list(range(step, step + rng.randint(0, 6)))
+            queue.enqueue_many(items)
+            model.extend(items)
+        elif action < 0.8:
+            assert queue.dequeue() == (model.popleft() if model else None)
+        else:
+            n = rng.randint(-1, 6)
+            expected = [model.popleft() for _ in range(min(max(n, 0), len(model)))]
+            assert queue.dequeue_many(n) == expected
+        assert queue.size() == len(model)
+        assert queue.front() == (model[0] if model else None)
+    assert list(queue) == list(model)
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from conftest import CATALOG
+from server import StoreServer
+from store import Store
+
+
+async def exchange(request, store=None):
+    """Envía una solicitud cruda y retorna (estado, si el servidor cerró la conexión)"""
+    server = await StoreServer(store or Store(catalog_path=CATALOG), port=0).start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(request)
+        # Detrás de la primera, una solicitud válida por la misma conexión
+        writer.write(b"GET /products/BAT001 HTTP/1.1\r\nHost: x\r\n\r\n")
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+        await reader.readexactly(length)
+        closed = await asyncio.wait_for(reader.read(), 5) == b""
+        writer.close()
+        return int(head.split(b" ")[1]), closed
+    finally:
+        await server.close()
+
+
+@pytest.mark.parametrize("headers, status", [
+    (b"Content-Length: -5\r\n", 400),
+    (b"Content-Length: abc\r\n", 400),
+    (b"Transfer-Encoding: chunked\r\n", 501),
+])
+def test_rejected_body_closes_the_connection(headers, status):
+    request = (b"POST /orders HTTP/1.1\r\nHost: x\r\n" + headers + b"\r\n"
+               b"5\r\n{\"a\":}\r\n0\r\n\r\n")
+    assert asyncio.run(exchange(request)) == (status, True)
+
+
+async def statuses(request):
+    """Envía una solicitud cruda y una válida por la misma conexión; retorna ambos estados"""
+    server = await StoreServer(Store(catalog_path=CATALOG), port=0).start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(request + b"GET /products/BAT001 HTTP/1.1\r\nHost: x\r\n\r\n")
+        await writer.drain()
+        result = []
+        for _ in range(2):
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+            await reader.readexactly(length)
+            result.append(int(head.split(b" ")[1]))
+        writer.close()
+        return result
+    finally:
+        await server.close()
+
+
+@pytest.mark.parametrize("body", [
+    b'{"customer": "Ana", "codes": ["BAT001"], "tier": ["express"]}',
+    b'{"customer": "Ana", "codes": ["BAT001"], "tier": {}}',
+    b'{"customer": "Ana", "codes": [1, "BAT001"]}',
+    b'{"customer": "Ana", "codes": [null]}',
+])
+def test_invalid_order_fields_are_a_bad_request(body):
+    request = (b"POST /orders HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n" % len(body)
+               + body)
+    assert asyncio.run(statuses(request)) == [400, 200]
+
+
+def test_unexpected_errors_answer_500_and_close():
+    store = Store(catalog_path=CATALOG)
+
+    def broken(code):
+        raise RuntimeError("falla inesperada")
+
+    store.find_product = broken
+    request = b"GET /products/BAT001 HTTP/1.1\r\nHost: x\r\n\r\n"
+    assert asyncio.run(exchange(request, store)) == (500, True)
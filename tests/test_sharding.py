@@ -0,0 +1,76 @@
+import pytest
+
+from conftest import CATALOG
+from sharding import ShardedCatalog, ShardError
+from store import Store
+
+
+@pytest.fixture
+def catalog():
+    catalog = ShardedCatalog(shards=2)
+    yield catalog
+    catalog.close()
+
+
+def codes_per_shard(catalog, count=3):
+    """Códigos que caen en cada shard (count por shard)"""
+    codes = {shard: [] for shard in range(catalog.shards)}
+    i = 0
+    while any(len(found) < count for found in codes.values()):
+        code = f"A{i}"
+        if len(codes[catalog.shard_of(code)]) < count:
+            codes[catalog.shard_of(code)].append(code)
+        i += 1
+    return codes
+
+
+def test_error_in_one_shard_does_not_desync_the_others(catalog):
+    codes = codes_per_shard(catalog)
+    good = codes[0][0]
+    bad = codes[1][0]
+    # Una fila incompleta: el shard 2 falla al cargarla, el 1 responde bien
+    with pytest.raises(ShardError):
+        catalog.load([(good, "a", 1, 1, "X"), (bad,)])
+    assert catalog.find_product(good).name == "a"
+    assert catalog.shard_sizes() == [1, 0]
+    assert [p.code for p in catalog.find_many([good, codes[1][1]]) if p] == [good]
+
+
+def test_unencodable_request_sends_nothing(catalog):
+    codes = codes_per_shard(catalog)
+    with pytest.raises(ValueError):
+        # marshal no codifica objetos arbitrarios: falla antes de enviar
+        catalog.load([(codes[0][0], "a", 1, 1, "X"), (codes[1][0], object(), 1, 1, "X")])
+    assert catalog.shard_sizes() == [0, 0]
+    catalog.add_product(codes[1][0], "b", 2, 2, "X")
+    assert catalog.find_product(codes[1][0]).price == 2
+
+
+def test_round_trip_matches_the_store():
+    def rows(products):
+        return [(p.code, p.name, p.price, p.stock, p.category) for p in products]
+
+    store = Store(catalog_path=CATALOG)
+    with ShardedCatalog.from_store(store, shards=3) as catalog:
+        assert len(catalog) == len(store.products)
+        assert rows(catalog.list_products()) == rows(sorted(store.list_products(),
+                                                            key=lambda p: p.code))
+        codes = [p.code for p in store.list_products()][::3] + ["NOEXISTE"]
+        assert rows(p for p in catalog.find_many(codes) if p) == \
+            rows(store.find_product(code) for code in codes[:-1])
+        assert catalog.find_many(codes)[-1] is None
+        for category in ("Batman", "DC Comics", "Comics", "NoExiste"):
+            assert rows(catalog.products_in_category_tree(category)) == \
+                rows(store.products_in_category_tree(category))
+        assert rows(catalog.products_by_category("Batman")) == \
+            rows(sorted(store.products_by_category("Batman"), key=lambda p: p.code))
+
+        # Los cambios llegan solo al shard dueño y se ven en todas las consultas
+        catalog.add_product("ZZZ001", "Nuevo", 1000, 3, "Batman")
+        assert catalog.update_product("ZZZ001", new_stock=9).stock == 9
+        assert catalog.update_product("NOEXISTE", new_price=1) is None
+        assert catalog.find_product("ZZZ001").stock == 9
+        assert "ZZZ001" in [p.code for p in catalog.products_by_category("Batman")]
+        assert catalog.delete_product("ZZZ001") is True
+        assert catalog.delete_product("ZZZ001") is False
+        assert len(catalog) == len(store.products)
@@ -0,0 +1,54 @@
+import struct
+
+import pytest
+
+from conftest import CATALOG, state
+from persistence.snapshot import VERSION, SnapshotError, read_snapshot
+from store import Store
+
+
+def changed_store():
+    store = Store(catalog_path=CATALOG)
+    store.create_category("Vertigo", "DC Comics")
+    store.add_product("VRT001", "Sandman", 1999.5, 4, "Vertigo")
+    store.update_product("BAT001", new_price=4321, new_stock=2)
+    store.delete_product("SUP001")
+    store.create_order("Ana", ["BAT002", "VRT001"], tier="express")
+    cancelled = store.create_order("Beto", ["BAT002"])["order"]
+    store.create_order("Caro", ["BAT003"], tier="mayorista")
+    store.cancel_order(cancelled.order_number)
+    store.escalate_orders(max_wait=1e-9)
+    return store
+
+
+def test_snapshot_restores_the_same_state(tmp_path):
+    store = changed_store()
+    path = store.save_snapshot(str(tmp_path / "store.snap"))
+    restored = Store(catalog_path=CATALOG, snapshot_path=path)
+    assert state(restored) == state(store)
+    # El tipo del precio se conserva: los enteros siguen siendo int
+    assert isinstance(restored.find_product("VRT001").price, float)
+    assert isinstance(restored.find_product("BAT001").price, int)
+    # Y los índices se arman desde el snapshot
+    assert [p.code for p in restored.products_by_category("Vertigo")] == ["VRT001"]
+    assert "BAT001" in [p.code for p in restored.low_stock_products(2)]
+
+
+def test_damaged_snapshot_is_rejected_and_the_catalog_is_loaded(tmp_path):
+    path = changed_store().save_snapshot(str(tmp_path / "store.snap"))
+    with open(path, "r+b") as file:
+        file.seek(-3, 2)
+        file.write(b"\xff\xff\xff")
+    with pytest.raises(SnapshotError):
+        read_snapshot(path)
+    fresh = Store(catalog_path=CATALOG, snapshot_path=path)
+    assert state(fresh) == state(Store(catalog_path=CATALOG))
+
+
+def test_other_versions_are_rejected(tmp_path):
+    path = changed_store().save_snapshot(str(tmp_path / "store.snap"))
+    with open(path, "r+b") as file:
+        file.seek(struct.calcsize("<4s"))
+        file.write(struct.pack("<H", VERSION - 1))
+    with pytest.raises(SnapshotError):
+        read_snapshot(path)
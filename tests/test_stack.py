@@ -0,0 +1,31 @@
+import random
+from collections import deque
+
+import pytest
+
+from structures.stack import Stack
+
+
+@pytest.mark.parametrize("capacity", [None, 1, 3, 8])
+def test_stack_matches_a_deque(capacity):
+    """Pila acotada o no contra un deque con maxlen: descarta el más antiguo"""
+    rng = random.Random(capacity)
+    stack = Stack(capacity=capacity)
+    model = deque(maxlen=capacity)
+    for step in range(3000):
+        if rng.random() < 0.6:
+            evicted = model[0] if capacity is not None and len(model) == capacity else None
+            assert stack.push(step) == evicted
+            model.append(step)
+        else:
+            assert stack.pop() == (model.pop() if model else None)
+        assert stack.size() == len(model)
+        assert stack.peek() == (model[-1] if model else None)
+        assert stack.is_full() == (capacity is not None and len(model) == capacity)
+    assert stack.items == list(model)
+    assert list(stack) == list(reversed(model))
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        Stack(capacity=0)
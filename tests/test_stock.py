@@ -0,0 +1,98 @@
+import random
+import threading
+
+from conftest import CATALOG
+from store import Store, OutOfStockError
+
+
+def by_stock(products, threshold=None):
+    return [p.code for p in sorted(products, key=lambda p: (p.stock, p.code))
+            if threshold is None or p.stock <= threshold]
+
+
+def test_reservations_do_not_take_the_index_lock():
+    store = Store(catalog_path=CATALOG)
+    product = store.find_product("BAT001")
+    before = product.stock
+    with store._index_lock:
+        worker = threading.Thread(target=store.submit_order, args=("Ana", [product]))
+        worker.start()
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+    assert product.stock == before - 1
+    assert product.code in [p.code for p in store.low_stock_products(before - 1)]
+
+
+def test_stock_index_and_cache_follow_concurrent_orders():
+    store = Store(catalog_path=CATALOG, stock_stripes=8)
+    products = store.list_products()
+    for product in products:
+        store.update_product(product.code, new_stock=30)
+    # Consultas cacheadas antes de los cambios: tienen que invalidarse
+    for threshold in (0, 10, 25, 30):
+        store.low_stock_products(threshold)
+    errors = []
+
+    def customer(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(300):
+                chosen = rng.sample(products, 3)
+                try:
+                    order = store.submit_order(f"cliente{seed}", chosen)
+                except OutOfStockError:
+                    continue
+                if rng.random() < 0.3:
+                    store.cancel_order(order.order_number)
+                if rng.random() < 0.1:
+                    store.low_stock_products(rng.choice((0, 10, 25)))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=customer, args=(seed,)) for seed in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+    current = store.list_products()
+    for threshold in (0, 10, 25, 30):
+        assert [p.code for p in store.low_stock_products(threshold)] == \
+            by_stock(current, threshold)
+    page = store.catalog_page(sort="stock", limit=len(current))
+    assert [p.code for p in page["products"]] == by_stock(current)
+    assert store.inventory_stats()["units"] == sum(p.stock for p in current)
+    reserved = sum(len(order.products) for order in store.pending_order_list())
+    assert store.inventory_stats()["units"] == 30 * len(current) - reserved
+
+
+def test_deleted_product_leaves_the_stock_index():
+    store = Store(catalog_path=CATALOG)
+    product = store.find_product("BAT001")
+    store.submit_order("Ana", [product])
+    store.delete_product("BAT001")
+    assert "BAT001" not in [p.code for p in store.low_stock_products(10 ** 6)]
+    # El objeto que quedó en el pedido conserva sus valores
+    assert product.code == "BAT001" and product.stock >= 0
+
+
+def test_concurrent_adds_of_the_same_code_leave_one_entry():
+    store = Store(catalog_path=CATALOG)
+
+    def writer(seed):
+        for i in range(300):
+            store.add_product("NEW001", "Nuevo", 1000 + seed, i % 20, "Batman")
+
+    threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    product = store.find_product("NEW001")
+    low = [p.code for p in store.low_stock_products(10 ** 6)]
+    assert low.count("NEW001") == 1
+    assert [p for p in store.products_by_category("Batman") if p.code == "NEW001"] == [product]
+    assert [p.code for p in store.products_by_price_range(product.price, product.price)
+            if p.code == "NEW001"] == ["NEW001"]
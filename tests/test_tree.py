@@ -0,0 +1,81 @@
+import sys
+import threading
+
+from conftest import CATALOG
+from store import Store
+from structures.tree import Tree
+
+
+def test_add_with_a_missing_parent_returns_false():
+    tree = Tree()
+    assert tree.add("Comics") is True
+    assert tree.add("Batman", "DC Comics") is False
+    assert tree.search("Batman") is None
+    assert tree.categories() == [("Comics", None)]
+
+
+def test_readers_see_a_complete_numbering_while_categories_are_added():
+    tree = Tree()
+    tree.add("Comics")
+    tree.add("DC Comics", "Comics")
+    stable = ["DC Comics"] + [f"DC{i}" for i in range(50)]
+    for name in stable[1:]:
+        tree.add(name, "DC Comics")
+    stop = threading.Event()
+    errors = []
+
+    def writer():
+        try:
+            tree.add("Marvel", "Comics")
+            for i in range(20000):
+                tree.add(f"M{i}", "Marvel" if i % 2 else f"M{i - 1}" if i else "Marvel")
+        finally:
+            stop.set()
+
+    def reader():
+        try:
+            while not stop.is_set():
+                if tree.list_subcategories("DC Comics") != stable:
+                    errors.append("subárbol incompleto")
+                if not tree.is_under("DC7", "Comics"):
+                    errors.append("is_under")
+                if tree.interval("DC Comics") is None:
+                    errors.append("interval")
+        except Exception as e:
+            errors.append(e)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader)
+                                                       for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors
+    assert len(tree.list_subcategories("Marvel")) == 20001
+
+
+def test_duplicate_names_are_rejected():
+    tree = Tree()
+    tree.add("Comics")
+    tree.add("DC Comics", "Comics")
+    tree.add("Marvel", "Comics")
+    tree.add("Batman", "DC Comics")
+    assert tree.add("Batman", "Marvel") is False
+    assert tree.add("Comics") is False
+    assert tree.list_subcategories("Marvel") == ["Marvel"]
+    assert tree.list_subcategories("DC Comics") == ["DC Comics", "Batman"]
+    assert tree.categories() == [("Comics", None), ("DC Comics", "Comics"),
+                                 ("Batman", "DC Comics"), ("Marvel", "Comics")]
+
+
+def test_store_does_not_create_a_category_twice():
+    store = Store(catalog_path=CATALOG)
+    marvel = store.products_in_category_tree("Marvel")
+    assert store.create_category("Batman", "Marvel") is False
+    assert store.products_in_category_tree("Marvel") == marvel
+    assert store.category_tree.search("Batman").parent.name == "DC Comics"
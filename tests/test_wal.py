@@ -0,0 +1,134 @@
+import os
+
+import pytest
+
+from conftest import CATALOG, state
+from store import Store
+
+
+def open_store(directory, **kwargs):
+    kwargs.setdefault("fsync", "none")
+    return Store(catalog_path=CATALOG, wal_path=os.path.join(directory, "store.log"),
+                 **kwargs)
+
+
+def test_restart_replays_the_log(tmp_path):
+    store = open_store(tmp_path)
+    store.add_product("NEW001", "Nuevo", 1000, 5, "Batman")
+    store.update_product("BAT001", new_price=4321)
+    store.delete_product("SUP001")
+    store.create_category("Vertigo", "DC Comics")
+    first = store.create_order("Ana", ["BAT002", "NEW001"])["order"]
+    store.create_order("Beto", ["BAT002"], tier="express")
+    store.create_orders_bulk([("Caro", ["NEW001"]), ("Dani", ["BAT003"], "mayorista")])
+    store.cancel_order(first.order_number)
+    store.process_next_order()
+    expected = state(store)
+    store.close()
+
+    restarted = open_store(tmp_path)
+    assert state(restarted) == expected
+    restarted.close()
+
+
+@pytest.mark.parametrize("fsync", ["batch", "none"])
+def test_confirmed_changes_survive_a_crash(tmp_path, fsync):
+    # Sin close(): lo que se confirmó ya tiene que estar en el archivo
+    store = open_store(tmp_path, fsync=fsync)
+    store.update_product("BAT001", new_stock=11)
+    order = store.create_order("Ana", ["BAT002"])["order"]
+    if fsync == "batch":
+        assert store.wal._synced_lsn == store.wal.last_lsn
+
+    restarted = open_store(tmp_path)
+    assert restarted.find_product("BAT001").stock == 11
+    assert [o.order_number for o in restarted.pending_order_list()] == [order.order_number]
+
+
+def test_restart_after_compaction_on_every_change(tmp_path):
+    # compact_bytes=1: cada cambio dispara una compactación
+    store = open_store(tmp_path, compact_bytes=1)
+    stock = store.find_product("BAT002").stock
+    store.add_product("NEW001", "Nuevo", 1000, 5, "Batman")
+    order = store.create_order("Ana", ["BAT002"])["order"]
+    store.update_product("BAT001", new_stock=7)
+    expected = state(store)
+    store.close()
+
+    restarted = open_store(tmp_path, compact_bytes=1)
+    assert state(restarted) == expected
+    assert restarted.find_product("NEW001") is not None
+    assert restarted.find_product("BAT002").stock == stock - 1
+    assert [o.order_number for o in restarted.pending_order_list()] == [order.order_number]
+    restarted.close()
+
+
+def test_changes_do_not_wait_for_the_snapshot_encoding(tmp_path):
+    import threading
+
+    store = open_store(tmp_path)
+    encode_state = store._encode_state
+
+    def slow_encode(*args):
+        # Mientras se arma el snapshot, otro hilo puede seguir cambiando
+        writer = threading.Thread(target=store.update_product, args=("BAT001",),
+                                  kwargs={"new_stock": 99})
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+        return encode_state(*args)
+
+    store._encode_state = slow_encode
+    store.update_product("BAT001", new_stock=11)
+    store.compact_log(background=False)
+    assert store.find_product("BAT001").stock == 99
+    expected = state(store)
+    store.close()
+
+    restarted = open_store(tmp_path)
+    assert state(restarted) == expected
+    restarted.close()
+
+
+def test_restart_after_compaction_with_concurrent_writers(tmp_path):
+    import threading
+
+    store = open_store(tmp_path, compact_bytes=2048)
+    codes = [p.code for p in store.list_products()[:20]]
+    for code in codes:
+        store.update_product(code, new_stock=1000)
+
+    def producer(customer):
+        for i in range(100):
+            store.create_order(customer, [codes[i % len(codes)]])
+
+    def consumer():
+        for _ in range(150):
+            store.fulfill_next_order(block=True, timeout=0.5)
+
+    threads = [threading.Thread(target=producer, args=(f"c{i}",)) for i in range(4)]
+    threads += [threading.Thread(target=consumer) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    expected = state(store)
+    store.close()
+
+    restarted = open_store(tmp_path)
+    assert state(restarted) == expected
+    restarted.close()
+
+
+def test_damaged_tail_is_ignored(tmp_path):
+    store = open_store(tmp_path)
+    store.update_product("BAT001", new_stock=11)
+    store.close()
+    with open(os.path.join(tmp_path, "store.log"), "ab") as file:
+        file.write(b"\x10\x00\x00\x00basura")
+
+    restarted = open_store(tmp_path)
+    assert restarted.find_product("BAT001").stock == 11
+    restarted.update_product("BAT001", new_stock=12)
+    restarted.close()
+    assert open_store(tmp_path).find_product("BAT001").stock == 12
@@ -0,0 +1,68 @@
+"""
+Pool de workers que procesan la cola de pedidos del Store en paralelo.
+Cada worker toma pedidos de Store.order_queue (una cola de prioridad
+bloqueante: primero los de nivel más urgente) y los completa con
+Store.fulfill_next_order. El stock ya se reservó al crear cada pedido,
+así que los workers no compiten por el stock.
+"""
+import threading
+
+
+class OrderWorkerPool:
+    def __init__(self, store, workers=4, on_done=None, poll_interval=0.1):
+        """
+        on_done: función opcional que se llama con cada pedido procesado
+        (desde el hilo del worker).
+        """
+        self.store = store
+        self.workers = workers
+        self.on_done = on_done
+        self.poll_interval = poll_interval
+        self.processed = 0
+
+        self._threads = []
+        self._stop = threading.Event()
+        self._drain = True
+        self._counter_lock = threading.Lock()
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._run, name=f"order-worker-{i + 1}",
+                                          daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _run(self):
+        queue = self.store.order_queue
+        while True:
+            if self._stop.is_set() and (not self._drain or queue.is_empty()):
+                return
+            order = self.store.fulfill_next_order(block=True, timeout=self.poll_interval)
+            if order is None:
+                continue
+            with self._counter_lock:
+                self.processed += 1
+            if self.on_done is not None:
+                self.on_done(order)
+
+    def stop(self, drain=True):
+        """
+        Detiene los workers. Con drain=True primero terminan de procesar
+        los pedidos que quedan en la cola.
+        """
+        self._drain = drain
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def __str__(self):
+        return f"OrderWorkerPool({self.workers} workers, {self.processed} procesados)"